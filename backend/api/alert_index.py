@@ -0,0 +1,159 @@
+import base64
+import bisect
+import threading
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.config import ALERT_TIERS, LSTM_CONFIG
+
+
+# Threshold-crossing alert events per incident. An event is a run of consecutive rows with
+# risk_score at or above the warning tier. Events never overlap and are appended in time
+# order, so both their starts and ends are sorted and a time-range page is two bisects
+# plus a slice.
+
+THRESHOLD = ALERT_TIERS["warning"]
+_FEATURES = LSTM_CONFIG["features"]
+_FIRE_COL = _FEATURES.index("fire_pixels")
+_TEMP_COL = _FEATURES.index("temperature")
+_RISK_COL = len(_FEATURES)  # ring rows are features + risk_score
+
+_indexes = {}
+_lock    = threading.Lock()
+
+
+class AlertIndex:
+    def __init__(self, incident: str):
+        self.incident = incident
+        self._starts  = []
+        self._ends    = []
+        self._events  = []
+        self._open    = False  # the newest row indexed was above the threshold
+        self._last_ts = None
+        self._synced  = -1     # ring version last pulled in
+        self._lock    = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def extend(self, ts: np.ndarray, risk: np.ndarray, fire_pixels: np.ndarray, temperature: np.ndarray) -> None:
+        ts = np.asarray(ts, dtype=np.int64)
+        with self._lock:
+            if self._last_ts is not None:
+                new = ts > self._last_ts
+                ts, risk, fire_pixels, temperature = ts[new], risk[new], fire_pixels[new], temperature[new]
+            if not len(ts):
+                return
+
+            mask  = np.nan_to_num(np.asarray(risk, dtype=np.float64), nan=-1.0) >= THRESHOLD
+            edges = np.diff(mask.astype(np.int8), prepend=0, append=0)
+            for s, e in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1) - 1):
+                peak = s + int(np.argmax(risk[s:e + 1]))
+                run  = (int(ts[s]), int(ts[e]), e - s + 1, float(risk[peak]), int(ts[peak]),
+                        float(fire_pixels[peak]), float(temperature[peak]))
+                if s == 0 and self._open:
+                    self._merge(run)
+                else:
+                    self._append(run)
+            self._open    = bool(mask[-1])
+            self._last_ts = int(ts[-1])
+
+    def _append(self, run: tuple) -> None:
+        start, end, hours, peak_risk, peak_ts, fire_pixels, temperature = run
+        self._starts.append(start)
+        self._ends.append(end)
+        self._events.append(_event(self.incident, start, end, hours, peak_risk, peak_ts, fire_pixels, temperature))
+
+    def _merge(self, run: tuple) -> None:
+        # The newest event is still running: stretch it rather than opening a new one.
+        _, end, hours, peak_risk, peak_ts, fire_pixels, temperature = run
+        prev = self._events[-1]
+        if peak_risk > prev["risk_score"]:
+            peak = (peak_risk, peak_ts, fire_pixels, temperature)
+        else:
+            peak = (prev["risk_score"], pd.Timestamp(prev["timestamp"]).value, prev["fire_pixels"], prev["temperature"])
+        self._ends[-1]   = end
+        self._events[-1] = _event(self.incident, self._starts[-1], end, prev["hours"] + hours, *peak)
+
+    def query(
+        self,
+        start_ns:  Optional[int] = None,
+        end_ns:    Optional[int] = None,
+        cursor:    Optional[str] = None,
+        limit:     int = 10,
+    ) -> tuple[list[dict], Optional[str]]:
+        """Newest-first events overlapping [start_ns, end_ns], paged by an opaque cursor."""
+        with self._lock:
+            hi = len(self._starts) if end_ns is None else bisect.bisect_right(self._starts, end_ns)
+            lo = 0 if start_ns is None else bisect.bisect_left(self._ends, start_ns)
+            if cursor is not None:
+                hi = min(hi, bisect.bisect_left(self._starts, decode_cursor(cursor)))
+            first = max(lo, hi - limit)
+            page  = [dict(e) for e in reversed(self._events[first:hi])]
+            more  = first > lo
+            next_cursor = encode_cursor(self._starts[first]) if more else None
+        return page, next_cursor
+
+    def sync(self, ring) -> None:
+        # Catch up with rows ingested since the last call (possibly by another worker).
+        if ring.version == self._synced:
+            return
+        version = ring.version
+        if self._last_ts is None:
+            ts, rows = ring.window(ring.capacity - 1)
+        else:
+            ts, rows = ring.since(self._last_ts)
+        self.extend(ts, rows[:, _RISK_COL], rows[:, _FIRE_COL], rows[:, _TEMP_COL])
+        self._synced = version
+
+
+def _event(incident, start, end, hours, peak_risk, peak_ts, fire_pixels, temperature) -> dict:
+    from api.geo import _get_alert_tier
+    return {
+        "timestamp":   pd.Timestamp(peak_ts).isoformat(),
+        "incident":    incident,
+        "start":       pd.Timestamp(start).isoformat(),
+        "end":         pd.Timestamp(end).isoformat(),
+        "hours":       int(hours),
+        "risk_score":  round(float(peak_risk), 4),
+        "fire_pixels": int(fire_pixels),
+        "temperature": float(temperature),
+        "alert_tier":  _get_alert_tier(peak_risk),
+    }
+
+
+def encode_cursor(start_ns: int) -> str:
+    return base64.urlsafe_b64encode(str(start_ns).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+
+def index_for(incident: dict) -> AlertIndex:
+    import api.main as main
+    from api.ingest import buffer_for, incident_frame
+
+    dataset_version = main._get_dataset_version()
+    with _lock:
+        entry = _indexes.get(incident["name"])
+        if entry is None or entry[0] != dataset_version:
+            # Full history from the dataset once; the ring supplies everything after it.
+            index = AlertIndex(incident["name"])
+            df = incident_frame(main._get_dataset(), incident)
+            if "risk_score" in df.columns:
+                index.extend(
+                    pd.to_datetime(df["timestamp"]).to_numpy(dtype="datetime64[ns]").view(np.int64),
+                    df["risk_score"].to_numpy(dtype=np.float64),
+                    df["fire_pixels"].to_numpy(dtype=np.float64),
+                    df["temperature"].to_numpy(dtype=np.float64),
+                )
+            entry = _indexes[incident["name"]] = (dataset_version, index)
+    index = entry[1]
+    index.sync(buffer_for(incident))
+    return index
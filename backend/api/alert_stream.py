@@ -0,0 +1,115 @@
+import asyncio
+import json
+from typing import Optional
+
+from utils.config import ALERT_STREAM_CONFIG
+from utils.logger import logger
+from utils.metrics import Gauge
+
+
+# Fan-out of county alert changes to /ws/alerts subscribers. Each snapshot refresh is diffed
+# once against the last values sent, and the encoded message is queued for every subscriber,
+# so the cost of a cycle doesn't depend on how many dashboards are connected.
+
+_subscribers = {}  # asyncio.Queue -> (incident name, region)
+_state       = {}  # (incident name, region) -> {"counties": {county: (tier, score)}, "body": bytes, "data_version": str}
+_CLOSE       = None
+
+Gauge("pyrowatch_alert_subscribers", "Connected /ws/alerts subscribers", fn=lambda: len(_subscribers))
+
+
+def _encode(message: dict) -> str:
+    return json.dumps(message, separators=(",", ":"))
+
+
+def diff(prev: dict, alerts: dict, min_delta: float) -> list[dict]:
+    """Counties whose tier changed, or whose score moved by min_delta, relative to prev."""
+    changes = []
+    for c in alerts["counties"]:
+        old = prev.get(c["county"])
+        if old is not None and old[0] == c["alert_tier"] and abs(c["risk_score"] - old[1]) < min_delta:
+            continue
+        changes.append({
+            "county":     c["county"],
+            "fips":       c.get("fips"),
+            "alert_tier": c["alert_tier"],
+            "risk_score": c["risk_score"],
+            "prev_tier":  old[0] if old else None,
+            "prev_score": old[1] if old else None,
+        })
+    return changes
+
+
+def publish(snap) -> int:
+    """Diff a fresh snapshot against what subscribers last saw and queue the changes. Call on the event loop."""
+    sent = 0
+    for region, body in snap.alerts.items():
+        topic  = (snap.incident, region)
+        alerts = json.loads(body)
+        state  = _state.get(topic)
+        prev   = state["counties"] if state else {}
+        messages = []
+
+        changes = diff(prev, alerts, ALERT_STREAM_CONFIG["min_delta"])
+        if changes and state is not None:
+            messages.append(_encode({
+                "type":          "diff",
+                "region":        region,
+                "incident":      alerts["incident"],
+                "generated_at":  alerts["generated_at"],
+                "active_alerts": alerts["active_alerts"],
+                "highest_tier":  alerts["highest_tier"],
+                "changes":       changes,
+            }))
+        if state is not None and state["data_version"] != snap.dataset_version:
+            # Risk maps only change with the data; tell clients when to refetch instead of polling.
+            messages.append(_encode({
+                "type":         "risk_map",
+                "region":       region,
+                "incident":     snap.incident,
+                "generated_at": snap.generated_at,
+                "data_version": snap.dataset_version,
+            }))
+
+        counties = dict(prev)
+        counties.update((c["county"], (c["alert_tier"], c["risk_score"])) for c in changes)
+        _state[topic] = {"counties": counties, "body": body, "data_version": snap.dataset_version}
+
+        for message in messages:
+            sent += _broadcast(topic, message)
+    return sent
+
+
+def _broadcast(topic: tuple[str, str], message: str) -> int:
+    sent = 0
+    for queue, wanted in list(_subscribers.items()):
+        if wanted != topic:
+            continue
+        try:
+            queue.put_nowait(message)
+            sent += 1
+        except asyncio.QueueFull:
+            # Too far behind to catch up from diffs; drop it and let it resync on reconnect.
+            logger.warning(f"Dropping slow /ws/alerts subscriber for {topic[0]} / {topic[1]}")
+            _subscribers.pop(queue, None)
+            queue.get_nowait()
+            queue.put_nowait(_CLOSE)
+    return sent
+
+
+def subscribe(incident: str, region: str) -> asyncio.Queue:
+    queue = asyncio.Queue(maxsize=ALERT_STREAM_CONFIG["queue_size"])
+    _subscribers[queue] = (incident, region)
+    return queue
+
+
+def unsubscribe(queue: asyncio.Queue) -> None:
+    _subscribers.pop(queue, None)
+
+
+def initial_state(incident: str, region: str) -> Optional[str]:
+    """Full alerts for a new subscriber, as of the last published cycle."""
+    state = _state.get((incident, region))
+    if state is None:
+        return None
+    return _encode({"type": "snapshot", "region": region, "alerts": json.loads(state["body"])})
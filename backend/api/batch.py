@@ -0,0 +1,99 @@
+import io
+import json
+
+import numpy as np
+
+from utils.config import LSTM_CONFIG, BATCH_PREDICT_CONFIG
+
+
+# Request decoding for POST /predict/batch. Small batches can be JSON; large ones should be
+# a .npy array or an Arrow IPC stream, which decode without a Python object per number.
+
+NPY_TYPES   = {"application/x-npy", "application/octet-stream"}
+ARROW_TYPES = {"application/vnd.apache.arrow.stream", "application/vnd.apache.arrow.file"}
+
+
+class BatchError(ValueError):
+    def __init__(self, message: str, status_code: int = 422):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def decode(body: bytes, content_type: str) -> np.ndarray:
+    content_type = (content_type or "application/json").split(";")[0].strip().lower()
+    if content_type == "application/json":
+        arr = _from_json(body)
+    elif content_type in NPY_TYPES:
+        arr = _from_npy(body)
+    elif content_type in ARROW_TYPES:
+        arr = _from_arrow(body)
+    else:
+        raise BatchError(f"Unsupported content type {content_type!r}", status_code=415)
+    return validate(arr)
+
+
+def validate(arr: np.ndarray) -> np.ndarray:
+    seq_len, n_feat = LSTM_CONFIG["sequence_length"], LSTM_CONFIG["n_features"]
+    if arr.ndim != 3 or arr.shape[1:] != (seq_len, n_feat):
+        raise BatchError(f"Expected shape (n, {seq_len}, {n_feat}), got {arr.shape}")
+    if len(arr) == 0:
+        raise BatchError("Empty batch")
+    if len(arr) > BATCH_PREDICT_CONFIG["max_windows"]:
+        raise BatchError(f"At most {BATCH_PREDICT_CONFIG['max_windows']} windows per request", status_code=413)
+    if not np.isfinite(arr).all():
+        bad = np.flatnonzero(~np.isfinite(arr).all(axis=(1, 2)))
+        raise BatchError(f"Non-finite values in windows {bad[:10].tolist()}")
+    return arr
+
+
+def _from_json(body: bytes) -> np.ndarray:
+    try:
+        payload = json.loads(body)
+        data = payload["sequences"] if isinstance(payload, dict) else payload
+        return np.asarray(data, dtype=np.float32)
+    except (ValueError, KeyError, TypeError) as e:
+        raise BatchError(f"Bad JSON batch (expected {{\"sequences\": [[[...]]]}}): {e}")
+
+
+def _from_npy(body: bytes) -> np.ndarray:
+    try:
+        arr = np.load(io.BytesIO(body), allow_pickle=False)
+    except (ValueError, OSError, EOFError) as e:
+        raise BatchError(f"Bad .npy body: {e}")
+    if not np.issubdtype(arr.dtype, np.number):
+        raise BatchError(f"Expected a numeric array, got {arr.dtype}")
+    return arr.astype(np.float32, copy=False)
+
+
+def _from_arrow(body: bytes) -> np.ndarray:
+    # One row per window: a "sequence" (or only) column of fixed-size lists of
+    # sequence_length * n_features floats, row-major like the .npy layout.
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise BatchError("Arrow input needs pyarrow on the server", status_code=415)
+    try:
+        reader = pa.ipc.open_stream(body) if body[:6] != b"ARROW1" else pa.ipc.open_file(body)
+        table  = reader.read_all()
+    except pa.ArrowInvalid as e:
+        raise BatchError(f"Bad Arrow body: {e}")
+
+    if "sequence" in table.column_names:
+        column = table.column("sequence")
+    elif table.num_columns == 1:
+        column = table.column(0)
+    else:
+        raise BatchError("Arrow batch needs a 'sequence' column")
+    column = column.combine_chunks()
+    if not pa.types.is_list(column.type) and not pa.types.is_fixed_size_list(column.type):
+        raise BatchError(f"Expected a list column, got {column.type}")
+    if column.null_count:
+        raise BatchError("Null windows in Arrow batch")
+
+    width = LSTM_CONFIG["sequence_length"] * LSTM_CONFIG["n_features"]
+    lengths = (np.full(len(column), column.type.list_size) if pa.types.is_fixed_size_list(column.type)
+               else np.diff(column.offsets.to_numpy()))
+    if (lengths != width).any():
+        raise BatchError(f"Every window needs {width} values")
+    values = column.flatten().to_numpy(zero_copy_only=False).astype(np.float32, copy=False)
+    return values.reshape(len(column), LSTM_CONFIG["sequence_length"], LSTM_CONFIG["n_features"])
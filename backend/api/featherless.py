@@ -1,65 +1,295 @@
 
 
 import json
+import time
 import hashlib
-from utils.config import FEATHERLESS_API_KEY, FEATHERLESS_BASE_URL
+import threading
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from utils.config import FEATHERLESS_API_KEY, FEATHERLESS_BASE_URL, REPORT_KEY_BUCKETS, LLM_SLO_CONFIG
+from utils.config import ALERT_TIERS, RISK_THRESHOLDS
 from utils.cache import Cache
+from utils.circuit_breaker import CircuitBreaker
 from utils.logger import logger
+from utils.metrics import LLM_LATENCY, LLM_FALLBACKS, LLM_HEDGES, Gauge
 
 _cache = Cache("featherless", ttl_hours=168)
 
 LLM_MODEL = "mistralai/Mistral-7B-Instruct-v0.2"
 
-SYSTEM_PROMPT = 
+SYSTEM_PROMPT = """You are PyroWatch AI, a wildfire early-warning analyst writing for incident commanders.
+Write a concise situation report of 3-4 sentences in plain language.
+State the risk level, the main drivers (wind, humidity, temperature, active fire pixels),
+and one clear recommended action that matches the alert tier. Do not use bullet points."""
+
+
+_client = None
+_pool   = None
+_inflight = {}  # cache key -> Future of the upstream report
+_lock   = threading.Lock()
+_breaker = CircuitBreaker("featherless", LLM_SLO_CONFIG["breaker_failures"], LLM_SLO_CONFIG["breaker_cooldown_s"])
+
+Gauge("pyrowatch_llm_circuit_open", "1 while the Featherless circuit breaker is skipping the upstream",
+      fn=lambda: int(_breaker.state == CircuitBreaker.OPEN))
 
 
 def _get_client():
+    global _client
+    if _client is not None:
+        return _client
     try:
         from openai import OpenAI
-        return OpenAI(
-            api_key=FEATHERLESS_API_KEY,
-            base_url=FEATHERLESS_BASE_URL,
-        )
     except ImportError:
         raise ImportError("Run: pip install openai")
+    if not LLM_SLO_CONFIG["enabled"]:
+        return OpenAI(api_key=FEATHERLESS_API_KEY, base_url=FEATHERLESS_BASE_URL)
+    # Retries are ours (hedging), and every attempt is bounded.
+    _client = OpenAI(
+        api_key=FEATHERLESS_API_KEY,
+        base_url=FEATHERLESS_BASE_URL,
+        timeout=LLM_SLO_CONFIG["request_timeout_s"],
+        max_retries=0,
+    )
+    return _client
 
 
 def generate_situation_report(risk_data: dict) -> str:
-    cache_key = _make_key("report", risk_data)
-    cached = _cache.get(cache_key)
+    cached = cached_report(risk_data)
     if cached:
         logger.debug("Featherless: situation report from cache")
         return cached
 
     if not FEATHERLESS_API_KEY:
         logger.warning("No FEATHERLESS_API_KEY — using template report")
+        LLM_FALLBACKS.inc("no_key")
         return _template_report(risk_data)
 
-    prompt = _build_prompt(risk_data)
+    # The prompt uses the bucketed values too, so the cached report is true for every
+    # input that maps to its key.
+    cache_key = report_key(risk_data)
+    prompt = _build_prompt(quantize(risk_data))
+
+    if not LLM_SLO_CONFIG["enabled"]:
+        return _generate_blocking(cache_key, prompt, risk_data)
 
+    with _lock:
+        future = _inflight.get(cache_key)
+    if future is None:
+        if not _breaker.allow():
+            LLM_FALLBACKS.inc("circuit_open")
+            return _template_report(risk_data)
+        future = _request(cache_key, prompt)
     try:
-        client   = _get_client()
-        response = client.chat.completions.create(
-            model=LLM_MODEL,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user",   "content": prompt},
-            ],
-            max_tokens=200,
-            temperature=0.7,
-        )
-        report = response.choices[0].message.content.strip()
+        return future.result(timeout=LLM_SLO_CONFIG["deadline_s"])
+    except FutureTimeout:
+        logger.info(f"Featherless report past {LLM_SLO_CONFIG['deadline_s']}s deadline — template now, "
+                    "LLM report cached when it arrives")
+        LLM_FALLBACKS.inc("deadline")
+    except Exception as e:
+        logger.warning(f"Featherless API error: {e} — using template fallback")
+        LLM_FALLBACKS.inc("error")
+    return _template_report(risk_data)
+
+
+def prefetch_report(risk_data: dict) -> bool:
+    """Generate and cache the LLM report in the calling thread, waiting for the upstream
+    rather than the deadline. True once it is cached, False while the circuit is open.
+
+    For background callers, which bound their own concurrency: the call never goes through
+    _pool, so it cannot queue ahead of interactive requests there.
+    """
+    if cached_report(risk_data):
+        return True
+    if not FEATHERLESS_API_KEY:
+        return False
+    cache_key = report_key(risk_data)
+    if cache_key not in _inflight and not _breaker.allow():
+        return False
+    with _lock:
+        future = _inflight.get(cache_key)
+        owned  = future is None
+        if owned:
+            future = _inflight[cache_key] = Future()
+    if not owned:
+        future.result()  # an interactive request for this key is already upstream
+        return True
+    future.add_done_callback(lambda _: _inflight.pop(cache_key, None))
+
+    t0 = time.perf_counter()
+    try:
+        report = _complete(_build_prompt(quantize(risk_data)))
+    except Exception as e:
+        from openai import APITimeoutError
+        LLM_LATENCY.observe(time.perf_counter() - t0, "timeout" if isinstance(e, APITimeoutError) else "error")
+        if _breaker.record_failure():
+            logger.warning(f"Featherless circuit open for {_breaker.cooldown_s:.0f}s after repeated failures")
+        _settle(future, exception=e)
+        raise
+    LLM_LATENCY.observe(time.perf_counter() - t0, "ok")
+    _breaker.record_success()
+    _cache.set(cache_key, report)
+    _settle(future, result=report)
+    return True
+
+
+def _generate_blocking(cache_key: str, prompt: str, risk_data: dict) -> str:
+    t0 = time.perf_counter()
+    try:
+        report = _complete(prompt)
+        LLM_LATENCY.observe(time.perf_counter() - t0, "ok")
         _cache.set(cache_key, report)
         logger.info(f"Featherless LLM: report generated ({len(report)} chars)")
         return report
 
     except Exception as e:
         logger.warning(f"Featherless API error: {e} — using template fallback")
+        LLM_LATENCY.observe(time.perf_counter() - t0, "error")
+        LLM_FALLBACKS.inc("error")
         return _template_report(risk_data)
 
 
+def _complete(prompt: str) -> str:
+    client   = _get_client()
+    response = client.chat.completions.create(
+        model=LLM_MODEL,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user",   "content": prompt},
+        ],
+        max_tokens=200,
+        temperature=0.7,
+    )
+    return response.choices[0].message.content.strip()
+
+
+def _request(cache_key: str, prompt: str) -> Future:
+    # One upstream request per key at a time; callers arriving meanwhile share its future.
+    global _pool
+    with _lock:
+        if cache_key in _inflight:
+            return _inflight[cache_key]
+        if _pool is None:
+            _pool = ThreadPoolExecutor(LLM_SLO_CONFIG["max_in_flight"], thread_name_prefix="featherless")
+        future = _inflight[cache_key] = Future()
+    future.add_done_callback(lambda _: _inflight.pop(cache_key, None))
+
+    state = {"attempts": 0, "failed": 0, "hedged": False}
+    _attempt(cache_key, prompt, future, state)
+    hedge_after = LLM_SLO_CONFIG["hedge_after_s"]
+    if hedge_after:
+        timer = threading.Timer(hedge_after, _hedge, (cache_key, prompt, future, state, "slow"))
+        timer.daemon = True
+        timer.start()
+    return future
+
+
+def _attempt(cache_key: str, prompt: str, future: Future, state: dict) -> None:
+    with _lock:
+        state["attempts"] += 1
+    t0 = time.perf_counter()
+
+    def finished(attempt: Future) -> None:
+        try:
+            report = attempt.result()
+        except Exception as e:
+            from openai import APITimeoutError
+            LLM_LATENCY.observe(time.perf_counter() - t0, "timeout" if isinstance(e, APITimeoutError) else "error")
+            if _breaker.record_failure():
+                logger.warning(f"Featherless circuit open for {_breaker.cooldown_s:.0f}s after repeated failures")
+            with _lock:
+                state["failed"] += 1
+                last = state["failed"] == state["attempts"]
+            # A fast failure is retried straight away as the hedge, if hedging is on.
+            if last and not _hedge(cache_key, prompt, future, state, "failed") and not future.done():
+                _settle(future, exception=e)
+            return
+        LLM_LATENCY.observe(time.perf_counter() - t0, "ok")
+        _breaker.record_success()
+        if future.done():
+            return  # the other attempt got there first
+        # Cache before settling, so a caller arriving as the in-flight entry clears finds it.
+        _cache.set(cache_key, report)
+        if _settle(future, result=report):
+            logger.info(f"Featherless LLM: report generated ({len(report)} chars)")
+
+    _pool.submit(_complete, prompt).add_done_callback(finished)
+
+
+def _hedge(cache_key: str, prompt: str, future: Future, state: dict, reason: str) -> bool:
+    with _lock:
+        if not LLM_SLO_CONFIG["hedge_after_s"] or state["hedged"] or future.done():
+            return False
+        state["hedged"] = True
+    if not _breaker.allow():
+        return False
+    LLM_HEDGES.inc(reason)
+    _attempt(cache_key, prompt, future, state)
+    return True
+
+
+def _settle(future: Future, result=None, exception=None) -> bool:
+    try:
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+        return True
+    except InvalidStateError:  # the other attempt got there first
+        return False
+
+
+def quantize(risk_data: dict) -> dict:
+    """risk_data with numeric inputs snapped to REPORT_KEY_BUCKETS steps.
+
+    risk_score never snaps across a risk level or alert tier threshold, so the snapped score
+    still agrees with the caller's risk_level and alert_tier.
+    """
+    out = dict(risk_data)
+    for field, step in REPORT_KEY_BUCKETS.items():
+        value = out.get(field)
+        if value is None:
+            continue
+        snapped = round(float(value) / step) * step
+        if field == "wind_direction":
+            snapped %= 360
+        out[field] = int(snapped) if isinstance(step, int) else round(snapped, 4)
+        if field == "risk_score":
+            out[field] = _keep_band(float(value), out[field], step)
+    return out
+
+
+_SCORE_EDGES = sorted({*(lo for lo, _ in RISK_THRESHOLDS.values()), *ALERT_TIERS.values()})
+
+
+def _keep_band(score: float, snapped: float, step: float) -> float:
+    lo = max((e for e in _SCORE_EDGES if e <= score), default=float("-inf"))
+    hi = min((e for e in _SCORE_EDGES if e > score), default=float("inf"))
+    if snapped >= hi:
+        snapped = max(lo, round(snapped - step, 4))
+    return max(lo, snapped)
+
+
+def report_key(risk_data: dict) -> str:
+    d = quantize(risk_data)
+    return _make_key("report", *(d.get(f) for f in (
+        "region", "county", "alert_tier", "risk_level", "forecast_hours", *REPORT_KEY_BUCKETS,
+    )))
+
+
+def cached_report(risk_data: dict):
+    return _cache.get(report_key(risk_data))
+
+
 def _build_prompt(d: dict) -> str:
-    return f
+    return f"""Region: {d.get("county", "Plumas County")}, {d.get("region", "CA")}
+Risk score: {d.get("risk_score", 0):.2f} ({d.get("risk_level", "unknown")})
+Alert tier: {d.get("alert_tier", "none")}
+Forecast horizon: {d.get("forecast_hours", 6)} hours
+Active fire pixels: {d.get("fire_pixels", 0)}
+Wind: {d.get("wind_speed", 0):.1f} m/s from {d.get("wind_direction", 0):.0f}°
+Temperature: {d.get("temperature", 0):.1f}°C
+Relative humidity: {d.get("humidity", 0):.1f}%
+
+Write the situation report."""
 
 
 def _template_report(d: dict) -> str:
@@ -1,5 +1,7 @@
 
 
+import time
+import hashlib
 import numpy as np
 import pandas as pd
 from datetime import datetime
@@ -7,6 +9,8 @@ from typing import Optional
 
 from utils.config import DEMO_FIRE, LSTM_CONFIG, RISK_THRESHOLDS, ALERT_TIERS
 from utils.logger import logger
+from utils.metrics import GEOJSON_BUILD, GEOJSON_CELLS
+from utils.tracing import span
 
 
 RISK_COLORS = {
@@ -16,63 +20,305 @@ RISK_COLORS = {
     "extreme":  "#C0392B",
 }
 
+_LEVELS      = list(RISK_THRESHOLDS)
+_LEVEL_EDGES = np.array([lo for lo, _ in RISK_THRESHOLDS.values()][1:])  # np.digitize -> index into _LEVELS
+
 
 def build_risk_geojson(
     df_sequence: pd.DataFrame,
     grid_step: float = 0.08,
     bbox: Optional[dict] = None,
+    seed_key: Optional[str] = None,
+    center: Optional[tuple[float, float]] = None,
 ) -> dict:
+    return build_risk_geojsons([{
+        "df_sequence": df_sequence, "grid_step": grid_step, "bbox": bbox, "seed_key": seed_key, "center": center,
+    }])[0]
+
+
+def build_risk_geojsons(jobs: list[dict], mode: str = "cells", simplify: float = 0.0) -> list[dict]:
+    """One grid per job (build_risk_geojson's arguments), every cell of every job scored in one batch.
+
+    mode="cells" gives a square per grid cell; mode="contours" merges contiguous cells of the
+    same risk level into one polygon each, simplified by `simplify` degrees if non-zero.
+    """
+    if mode not in ("cells", "contours"):
+        raise ValueError(f"Unknown risk map mode {mode!r}")
+    label = "risk_map" if mode == "cells" else "risk_contours"
+    t0 = time.perf_counter()
+    grids = [_grid_sequences(**job) for job in jobs]
+    scores = _score_sequences(np.concatenate([seqs for _, _, seqs, _ in grids])) if grids else []
+
+    out, offset = [], 0
+    for lats, lons, seqs, grid_step in grids:
+        risks = scores[offset:offset + len(seqs)]
+        offset += len(seqs)
+        if mode == "contours":
+            features = _contour_features(lats, lons, risks, grid_step, simplify)
+        else:
+            features = _cell_features(lats, lons, risks, grid_step)
+        GEOJSON_CELLS.observe(len(features), label)
+        out.append({"type": "FeatureCollection", "features": features})
+
+    GEOJSON_BUILD.observe(time.perf_counter() - t0, label)
+    logger.debug(f"Built {len(out)} GeoJSON grid(s) as {mode}: {offset} cells scored in one batch")
+    return out
+
+
+def _cell_features(lats: np.ndarray, lons: np.ndarray, risks: np.ndarray, grid_step: float) -> list[dict]:
+    features = []
+    for (lat, lon), risk in zip(((lat, lon) for lat in lats for lon in lons), risks):
+        risk_level, color = _classify_risk(risk)
+        features.append({
+            "type": "Feature",
+            "geometry": {
+                "type": "Polygon",
+                "coordinates": [_cell_polygon(lat, lon, grid_step)],
+            },
+            "properties": {
+                "lat":        round(float(lat), 4),
+                "lon":        round(float(lon), 4),
+                "risk_score": round(float(risk), 4),
+                "risk_level": risk_level,
+                "alert_tier": _get_alert_tier(risk),
+                "color":      color,
+                "opacity":    _risk_opacity(risk),
+            },
+        })
+    return features
+
+
+def _contour_features(
+    lats: np.ndarray,
+    lons: np.ndarray,
+    risks: np.ndarray,
+    grid_step: float,
+    simplify: float = 0.0,
+) -> list[dict]:
+    # One Polygon (with holes) per 4-connected region of same-level cells. Properties carry
+    # the region's mean and max score; colour and level are the level's, as in cell mode.
+    grid   = np.asarray(risks, dtype=np.float64).reshape(len(lats), len(lons))
+    levels = np.digitize(grid, _LEVEL_EDGES)
+    labels = _label_regions(levels)
+    n      = int(labels.max()) + 1 if labels.size else 0
+    flat   = labels.ravel()
+    count  = np.bincount(flat, minlength=n)
+    mean   = np.bincount(flat, weights=grid.ravel(), minlength=n) / np.maximum(count, 1)
+    peak   = np.full(n, -np.inf)
+    np.maximum.at(peak, flat, grid.ravel())
+    region_level = np.zeros(n, dtype=np.int64)
+    region_level[flat] = levels.ravel()
+
+    origin = (float(lons[0]), float(lats[0])) if n else (0.0, 0.0)
+    features = []
+    for region, rings in sorted(_trace_rings(labels).items()):
+        exterior, holes = _to_lonlat(rings, origin, grid_step)
+        if simplify > 0:
+            exterior, holes = _simplify_polygon(exterior, holes, simplify)
+        risk_level = _LEVELS[region_level[region]]
+        features.append({
+            "type": "Feature",
+            "geometry": {
+                "type": "Polygon",
+                "coordinates": [exterior, *holes],
+            },
+            "properties": {
+                "risk_score": round(float(mean[region]), 4),
+                "max_risk":   round(float(peak[region]), 4),
+                "n_cells":    int(count[region]),
+                "risk_level": risk_level,
+                "alert_tier": _get_alert_tier(peak[region]),
+                "color":      RISK_COLORS[risk_level],
+                "opacity":    _risk_opacity(mean[region]),
+            },
+        })
+    return features
+
+
+def _label_regions(levels: np.ndarray) -> np.ndarray:
+    """Region id per cell: cells of equal level joined through shared edges (union of row runs)."""
+    h, w = levels.shape
+    labels = np.empty((h, w), dtype=np.int64)
+    parent = []
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    prev = []  # (start, end, level, run id) for the row below
+    for i in range(h):
+        row = levels[i]
+        starts = np.flatnonzero(np.r_[True, row[1:] != row[:-1]])
+        ends   = np.r_[starts[1:], w]
+        runs, k = [], 0
+        for a, b in zip(starts.tolist(), ends.tolist()):
+            run = len(parent)
+            parent.append(run)
+            level = row[a]
+            while k < len(prev) and prev[k][1] <= a:
+                k += 1
+            # Runs below that overlap [a, b); the last one may also overlap the next run.
+            j = k
+            while j < len(prev) and prev[j][0] < b:
+                if prev[j][2] == level:
+                    root_a, root_b = find(run), find(prev[j][3])
+                    if root_a != root_b:
+                        parent[max(root_a, root_b)] = min(root_a, root_b)
+                j += 1
+            runs.append((a, b, level, run))
+            labels[i, a:b] = run
+        prev = runs
+
+    roots = np.array([find(x) for x in range(len(parent))], dtype=np.int64)
+    _, dense = np.unique(roots, return_inverse=True)
+    return dense[labels]
+
+
+# Directions of boundary edges on the cell-corner lattice: +x (east), +y (north), -x, -y.
+_STEPS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+
+
+def _trace_rings(labels: np.ndarray) -> dict[int, list[list[tuple[int, int]]]]:
+    """Boundary rings per region, as corner (col, row) vertices with the region on their left.
+
+    Exteriors come out counter-clockwise and holes clockwise, the GeoJSON winding order.
+    """
+    h, w = labels.shape
+    padded = np.full((h + 2, w + 2), -1, dtype=np.int64)
+    padded[1:-1, 1:-1] = labels
+    inner = padded[1:-1, 1:-1]
+
+    edges = {}  # (x, y, direction) -> region on the edge's left
+    for direction, (neighbour, start) in enumerate((
+        (padded[:-2, 1:-1], (0, 0)),  # south side differs -> edge heading east along it
+        (padded[1:-1, 2:],  (1, 0)),  # east side -> heading north
+        (padded[2:, 1:-1],  (1, 1)),  # north side -> heading west
+        (padded[1:-1, :-2], (0, 1)),  # west side -> heading south
+    )):
+        rows, cols = np.nonzero(inner != neighbour)
+        for r, c in zip(rows.tolist(), cols.tolist()):
+            edges[(c + start[0], r + start[1], direction)] = int(inner[r, c])
+
+    rings  = {}
+    unused = dict(edges)
+    while unused:
+        start, region = next(iter(unused.items()))
+        x, y, d = start
+        ring = []
+        while True:
+            del unused[(x, y, d)]
+            ring.append((x, y))
+            x, y = x + _STEPS[d][0], y + _STEPS[d][1]
+            # Prefer turning left, so parts of a region touching only at a corner stay separate rings.
+            d = next(nd for nd in ((d + 1) % 4, d, (d + 3) % 4) if edges.get((x, y, nd)) == region)
+            if (x, y, d) == start:
+                break
+        rings.setdefault(region, []).append(_corners(ring))
+    return rings
+
+
+def _grid_sequences(
+    df_sequence: pd.DataFrame,
+    grid_step: float = 0.08,
+    bbox: Optional[dict] = None,
+    seed_key: Optional[str] = None,
+    center: Optional[tuple[float, float]] = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, float]:
+    # One input window per grid cell: the incident's window with fire_pixels attenuated by
+    # distance from the incident centre, plus seeded per-cell jitter.
     if bbox is None:
         bbox = DEMO_FIRE["bbox"]
+    if center is None:
+        center = (DEMO_FIRE["center_lat"], DEMO_FIRE["center_lon"])
+    if seed_key is None:
+        seed_key = _sequence_seed_key(df_sequence)
 
     lats = np.arange(bbox["min_lat"], bbox["max_lat"], grid_step)
     lons = np.arange(bbox["min_lon"], bbox["max_lon"], grid_step)
 
-    features = []
-
     feature_cols = LSTM_CONFIG["features"]
     if len(df_sequence) < 24:
         logger.warning(f"Only {len(df_sequence)} rows — padding to 24")
         pad = pd.DataFrame([df_sequence.iloc[0]] * (24 - len(df_sequence)))
         df_sequence = pd.concat([pad, df_sequence]).reset_index(drop=True)
-
     base_seq = df_sequence[feature_cols].tail(24).values.astype(np.float32)
 
-    center_lat = DEMO_FIRE["center_lat"]
-    center_lon = DEMO_FIRE["center_lon"]
+    grid_lat, grid_lon = np.meshgrid(lats, lons, indexing="ij")
+    attenuation = np.exp(-np.sqrt((grid_lat - center[0])**2 + (grid_lon - center[1])**2) * 1.8).ravel()
+    jitter = _grid_jitter(seed_key, lats, lons, grid_step, 1.0).ravel()
 
-    for lat in lats:
-        for lon in lons:
-            dist = np.sqrt((lat - center_lat)**2 + (lon - center_lon)**2)
-            attenuation = np.exp(-dist * 1.8)
-            seq = base_seq.copy()
-            seq[:, 0] = seq[:, 0] * attenuation
-            seq[:, 0] += np.random.normal(0, 1) * attenuation
+    seqs = np.repeat(base_seq[None], len(attenuation), axis=0)
+    seqs[:, :, 0] = base_seq[None, :, 0] * attenuation[:, None] + (jitter * attenuation)[:, None]
+    return lats, lons, seqs, grid_step
 
-            risk = _score_sequence(seq)
-            risk_level, color = _classify_risk(risk)
-            alert_tier = _get_alert_tier(risk)
 
-            features.append({
-                "type": "Feature",
-                "geometry": {
-                    "type": "Polygon",
-                    "coordinates": [_cell_polygon(lat, lon, grid_step)],
-                },
-                "properties": {
-                    "lat":        round(float(lat), 4),
-                    "lon":        round(float(lon), 4),
-                    "risk_score": round(float(risk), 4),
-                    "risk_level": risk_level,
-                    "alert_tier": alert_tier,
-                    "color":      color,
-                    "opacity":    _risk_opacity(risk),
-                },
-            })
+def _corners(ring: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    # Drop the vertices in the middle of straight runs; a merged region's outline is mostly those.
+    n = len(ring)
+    return [
+        ring[k] for k in range(n)
+        if (ring[k][0] - ring[k - 1][0], ring[k][1] - ring[k - 1][1])
+        != (ring[(k + 1) % n][0] - ring[k][0], ring[(k + 1) % n][1] - ring[k][1])
+    ]
+
+
+def _ring_area(ring: list) -> float:
+    x, y = np.asarray(ring, dtype=np.float64).T
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+
+def _to_lonlat(rings: list, origin: tuple[float, float], step: float) -> tuple[list, list]:
+    """(exterior, holes) as closed [lon, lat] rings; the exterior is the one wound counter-clockwise."""
+    exterior, holes = None, []
+    for ring in rings:
+        coords = [[round(origin[0] + x * step, 6), round(origin[1] + y * step, 6)] for x, y in ring]
+        coords.append(coords[0])
+        if exterior is None and _ring_area(ring) > 0:
+            exterior = coords
+        else:
+            holes.append(coords)
+    return exterior, holes
 
-    logger.info(f"Built GeoJSON: {len(features)} grid cells, "
-                f"step={grid_step}°, bbox={bbox['min_lat']:.1f}–{bbox['max_lat']:.1f}N")
-    return {"type": "FeatureCollection", "features": features}
+
+def _simplify_polygon(exterior: list, holes: list, tolerance: float) -> tuple[list, list]:
+    try:
+        from shapely.geometry import Polygon, mapping
+        from shapely.geometry.polygon import orient
+    except ImportError:
+        # Per-ring Douglas-Peucker: neighbouring regions may no longer meet exactly.
+        simplified = [_douglas_peucker(ring, tolerance) for ring in [exterior, *holes]]
+        return simplified[0], simplified[1:]
+    polygon = Polygon(exterior, holes).simplify(tolerance, preserve_topology=True)
+    if polygon.is_empty:
+        return exterior, holes
+    rings = [[[round(x, 6), round(y, 6)] for x, y in ring] for ring in mapping(orient(polygon))["coordinates"]]
+    return rings[0], rings[1:]
+
+
+def _douglas_peucker(ring: list, tolerance: float) -> list:
+    points = np.asarray(ring, dtype=np.float64)
+    keep = np.zeros(len(points), dtype=bool)
+    keep[[0, -1]] = True
+    # Closed ring: split at the vertex farthest from the first so both halves have distinct ends.
+    far = int(np.argmax(((points - points[0]) ** 2).sum(axis=1)))
+    keep[far] = True
+    stack = [(0, far), (far, len(points) - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        seg = points[b] - points[a]
+        rel = points[a + 1:b] - points[a]
+        dist = np.abs(seg[0] * rel[:, 1] - seg[1] * rel[:, 0]) / max(float(np.hypot(*seg)), 1e-12)
+        k = int(np.argmax(dist))
+        if dist[k] > tolerance:
+            keep[a + 1 + k] = True
+            stack += [(a, a + 1 + k), (a + 1 + k, b)]
+    if keep.sum() < 4:
+        return ring  # would collapse; keep the exact outline
+    return points[keep].round(6).tolist()
 
 
 def build_replay_frames(df: pd.DataFrame, n_frames: int = 48) -> list[dict]:
@@ -83,7 +329,7 @@ def build_replay_frames(df: pd.DataFrame, n_frames: int = 48) -> list[dict]:
     start_idx = SEQ
     end_idx   = min(start_idx + n_frames, len(df))
 
-    logger.info(f"Building {end_idx - start_idx} replay frames...")
+    logger.debug(f"Building {end_idx - start_idx} replay frames...")
 
     for i in range(start_idx, end_idx):
         window = df[feature_cols].iloc[i - SEQ : i].values.astype(np.float32)
@@ -93,7 +339,7 @@ def build_replay_frames(df: pd.DataFrame, n_frames: int = 48) -> list[dict]:
         fire_px   = int(df["fire_pixels"].iloc[i])
         hour_num  = i - start_idx
 
-        geojson = _build_frame_geojson(window, base_risk, fire_px)
+        geojson = _build_frame_geojson(window, base_risk, fire_px, seed_key=str(ts))
 
         frames.append({
             "frame":      hour_num,
@@ -111,11 +357,17 @@ def build_replay_frames(df: pd.DataFrame, n_frames: int = 48) -> list[dict]:
             },
         })
 
-    logger.info(f"Replay: {len(frames)} frames built")
+    logger.debug(f"Replay: {len(frames)} frames built")
     return frames
 
 
-def _build_frame_geojson(base_seq: np.ndarray, base_risk: float, fire_pixels: int) -> dict:
+def _build_frame_geojson(
+    base_seq: np.ndarray,
+    base_risk: float,
+    fire_pixels: int,
+    seed_key: str = "",
+) -> dict:
+    t0        = time.perf_counter()
     bbox      = DEMO_FIRE["bbox"]
     grid_step = 0.12
     lats      = np.arange(bbox["min_lat"], bbox["max_lat"], grid_step)
@@ -123,14 +375,17 @@ def _build_frame_geojson(base_seq: np.ndarray, base_risk: float, fire_pixels: in
     center_lat = DEMO_FIRE["center_lat"]
     center_lon = DEMO_FIRE["center_lon"]
 
+    jitter   = _grid_jitter(seed_key, lats, lons, grid_step, 0.03)
     features = []
-    for lat in lats:
-        for lon in lons:
+    for i, lat in enumerate(lats):
+        for j, lon in enumerate(lons):
             dist        = np.sqrt((lat - center_lat)**2 + (lon - center_lon)**2)
             attenuation = np.exp(-dist * 1.8)
             seq = base_seq.copy()
             seq[:, 0] = seq[:, 0] * attenuation
-            risk = float(np.clip(base_risk * attenuation + np.random.normal(0, 0.03), 0, 1))
+            risk = float(np.clip(
+                base_risk * attenuation + jitter[i, j], 0, 1
+            ))
             risk_level, color = _classify_risk(risk)
 
             features.append({
@@ -147,13 +402,57 @@ def _build_frame_geojson(base_seq: np.ndarray, base_risk: float, fire_pixels: in
                 },
             })
 
+    GEOJSON_BUILD.observe(time.perf_counter() - t0, "replay_frame")
+    GEOJSON_CELLS.observe(len(features), "replay_frame")
     return {"type": "FeatureCollection", "features": features}
 
 
+def _grid_jitter(seed_key: str, lats: np.ndarray, lons: np.ndarray, grid_step: float, scale: float) -> np.ndarray:
+    # (len(lats), len(lons)) normal jitter, seeded per (key, cell, step) so identical requests
+    # render identical grids. Cell coordinates are hashed as arrays rather than seeding one
+    # Generator per cell, which dominated a risk map's build time.
+    raw  = f"{seed_key}|{grid_step}".encode()
+    key  = np.uint64(int.from_bytes(hashlib.blake2b(raw, digest_size=8).digest(), "little"))
+    ilat = np.round(np.asarray(lats, dtype=np.float64) * 1e4).astype(np.int64).view(np.uint64)
+    ilon = np.round(np.asarray(lons, dtype=np.float64) * 1e4).astype(np.int64).view(np.uint64)
+    h  = _mix64(_mix64(key ^ _mix64(ilat))[:, None] ^ ilon[None, :])
+    u1 = ((h >> np.uint64(11)).astype(np.float64) + 0.5) / 2.0**53
+    u2 = (_mix64(h) >> np.uint64(11)).astype(np.float64) / 2.0**53
+    return scale * np.sqrt(-2.0 * np.log(u1)) * np.cos(2.0 * np.pi * u2)  # Box-Muller
+
+
+def _mix64(x: np.ndarray) -> np.ndarray:
+    # splitmix64's finaliser over uint64 arrays; the multiplications wrap, as they should.
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _sequence_seed_key(df_sequence: pd.DataFrame) -> str:
+    if "timestamp" in df_sequence.columns and len(df_sequence):
+        return str(df_sequence["timestamp"].iloc[-1])
+    return ""
+
+
+def _score_sequences(seqs: np.ndarray) -> np.ndarray:
+    try:
+        from ml.inference import score_batch
+        with span("inference"):
+            return score_batch(seqs, caller="risk_map")
+    except Exception:
+        last = seqs[:, -1, :]
+        fire_norm = np.minimum(1.0, last[:, 0] / 50.0)
+        wind_norm = np.minimum(1.0, np.abs(last[:, 2]) * 0.5 + np.abs(last[:, 3]) * 0.5)
+        dry_norm  = np.minimum(1.0, np.where(last[:, 4] > 1, 1 - last[:, 4] / 100, 0.7))
+        return np.clip(0.5 * fire_norm + 0.3 * wind_norm + 0.2 * dry_norm, 0, 1)
+
+
 def _score_sequence(seq: np.ndarray) -> float:
     try:
         from ml.inference import predict_risk
-        result = predict_risk(seq)
+        with span("inference"):
+            result = predict_risk(seq)
         return result["risk_score"]
     except Exception:
         last = seq[-1]
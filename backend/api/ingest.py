@@ -0,0 +1,177 @@
+import asyncio
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.config import LSTM_CONFIG, INGEST_CONFIG, get_incident, incident_id
+from utils.logger import logger
+from utils.metrics import INGEST_ROWS
+from utils.ring_buffer import FeatureRing
+
+
+# New hourly observations are appended to a per-incident ring of recent feature rows instead
+# of reloading the dataset. Rings are seeded from the processed dataset on first use.
+
+COLUMNS = LSTM_CONFIG["features"] + ["risk_score"]
+N_FEAT  = LSTM_CONFIG["n_features"]
+
+_buffers = {}
+_lock    = threading.Lock()
+_task    = None
+
+
+def buffer_for(incident: dict) -> FeatureRing:
+    import api.main as main
+    dataset_version = main._get_dataset_version()
+    with _lock:
+        entry = _buffers.get(incident["name"])
+        if entry is None or entry[0] != dataset_version:
+            ring = FeatureRing(COLUMNS, INGEST_CONFIG["capacity"])
+            _seed(ring, incident_frame(main._get_dataset(), incident))
+            entry = _buffers[incident["name"]] = (dataset_version, ring)
+    return entry[1]
+
+
+def data_version(incident: dict) -> str:
+    import api.main as main
+    return f"{main._get_dataset_version()}.{buffer_for(incident).version}"
+
+
+def incident_frame(df: pd.DataFrame, incident: dict) -> pd.DataFrame:
+    # A dataset covering several fires tags rows with an incident (name or id) column.
+    if "incident" not in df.columns:
+        return df
+    tags = df["incident"].astype(str)
+    return df[(tags == incident["name"]) | (tags == incident_id(incident))]
+
+
+def _seed(ring: FeatureRing, df: pd.DataFrame) -> None:
+    # One slot short of capacity so the oldest row of any window is never being overwritten.
+    tail = df.tail(ring.capacity - 1)
+    rows = np.full((len(tail), len(COLUMNS)), np.nan, dtype=np.float32)
+    for j, col in enumerate(COLUMNS):
+        if col in tail.columns:
+            rows[:, j] = tail[col].to_numpy(dtype=np.float32)
+    ring.extend(pd.to_datetime(tail["timestamp"]).to_numpy(dtype="datetime64[ns]").view(np.int64), rows)
+
+
+def derive_rows(df: pd.DataFrame, prev: Optional[np.ndarray] = None) -> np.ndarray:
+    """Feature rows for new observations, computed from the new rows and the previous one only."""
+    ts   = pd.to_datetime(df["timestamp"])
+    hour = ts.dt.hour + ts.dt.minute / 60
+    df   = df.assign(hour_sin=np.sin(2 * np.pi * hour / 24), hour_cos=np.cos(2 * np.pi * hour / 24))
+    if "wind_direction" in df.columns:
+        rad = np.deg2rad(df["wind_direction"].astype(float))
+        df  = df.assign(wind_dir_sin=np.sin(rad), wind_dir_cos=np.cos(rad))
+
+    feats = pd.DataFrame({col: df[col].astype(float) if col in df.columns else np.nan
+                          for col in COLUMNS[:N_FEAT]}, index=df.index)
+    # Slow-moving inputs (NDVI/NDWI, occasionally weather) aren't in every hourly drop:
+    # carry the last known value forward, starting from the ring's newest row.
+    if prev is not None:
+        feats = pd.concat([pd.DataFrame([prev[:N_FEAT]], columns=feats.columns), feats])
+        feats = feats.ffill().iloc[1:]
+    feats = feats.ffill().fillna(0.0)
+
+    risk = df["risk_score"].astype(float) if "risk_score" in df.columns else np.nan
+    out  = np.empty((len(df), len(COLUMNS)), dtype=np.float32)
+    out[:, :N_FEAT] = feats.to_numpy(dtype=np.float32)
+    out[:, N_FEAT]  = risk
+    return out
+
+
+def ingest_frame(df: pd.DataFrame, incident: dict) -> dict:
+    if "timestamp" not in df.columns:
+        raise ValueError("rows need a timestamp")
+    ts = pd.to_datetime(df["timestamp"], utc=True).dt.tz_localize(None)
+    df = df.assign(timestamp=ts).sort_values("timestamp", kind="stable")
+
+    ring = buffer_for(incident)
+    rows = derive_rows(df, ring.last_row())
+    appended = ring.extend(df["timestamp"].to_numpy(dtype="datetime64[ns]").view(np.int64), rows)
+    skipped  = len(df) - appended
+
+    INGEST_ROWS.inc("appended", amount=appended)
+    INGEST_ROWS.inc("skipped", amount=skipped)
+    if appended:
+        from api import snapshots
+        from api.alert_index import index_for
+        index_for(incident)  # fold the new rows into the alert events now, not on the next read
+        snapshots.request_refresh()
+        logger.info(f"Ingested {appended} rows for {incident['name']} ({skipped} skipped as not newer)")
+    last = ring.last_timestamp()
+    return {
+        "incident": incident["name"],
+        "appended": appended,
+        "skipped":  skipped,
+        "rows":     len(ring),
+        "latest":   pd.Timestamp(last).isoformat() if last is not None else None,
+        "version":  ring.version,
+    }
+
+
+def ingest_records(records: list[dict], incident: dict) -> dict:
+    return ingest_frame(pd.DataFrame.from_records(records), incident)
+
+
+def process_drop_dir(drop_dir: Path = None) -> int:
+    drop_dir = drop_dir or INGEST_CONFIG["drop_dir"]
+    if not drop_dir.exists():
+        return 0
+    files = sorted(drop_dir.glob("*.csv")) + sorted(drop_dir.glob("*.jsonl"))
+    for path in files:
+        # Rename is atomic, so with several workers polling exactly one claims each file.
+        claimed = path.with_name(f"{path.name}.{os.getpid()}.claimed")
+        try:
+            path.rename(claimed)
+        except FileNotFoundError:
+            continue
+        try:
+            df = pd.read_csv(claimed) if path.suffix == ".csv" else pd.read_json(claimed, lines=True)
+            groups = df.groupby("incident") if "incident" in df.columns else [(None, df)]
+            for name, part in groups:
+                try:
+                    incident = get_incident(None if name is None else str(name))
+                except KeyError:
+                    # A ring for it would never be readable, and would only live in this worker.
+                    logger.warning(f"Skipping {len(part)} rows in {path.name} for untracked incident {name!r}")
+                    INGEST_ROWS.inc("untracked", amount=len(part))
+                    continue
+                ingest_frame(part.drop(columns=["incident"], errors="ignore"), incident)
+            target = drop_dir / "done"
+        except Exception as e:
+            logger.warning(f"Ingest of {path.name} failed: {e}")
+            target = drop_dir / "failed"
+        target.mkdir(exist_ok=True)
+        claimed.rename(target / path.name)
+    return len(files)
+
+
+async def _poll() -> None:
+    while True:
+        try:
+            await asyncio.to_thread(process_drop_dir)
+        except Exception as e:
+            logger.warning(f"Drop-dir poll failed: {e}")
+        await asyncio.sleep(INGEST_CONFIG["poll_s"])
+
+
+def start() -> None:
+    global _task
+    if _task is None or _task.done():
+        _task = asyncio.get_running_loop().create_task(_poll())
+
+
+async def stop() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+    _task = None
@@ -1,15 +1,24 @@
 
-import sys, os
+import sys, os, json, time, asyncio, hashlib, hmac, uuid
+import contextvars
+from collections import OrderedDict
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
+from typing import Optional
 import numpy as np
 import pandas as pd
 
-from utils.config import validate_keys, APP_ENV, DEMO_FIRE, LSTM_CONFIG, get_active_incident
+from utils.config import (validate_keys, APP_ENV, DEMO_FIRE, LSTM_CONFIG, PROFILE_TOKEN, PROFILES_DIR,
+                          BATCH_PREDICT_CONFIG, SNAPSHOT_CONFIG, INGEST_CONFIG, UNCERTAINTY_CONFIG, get_active_incident,
+                          get_incident, get_tracked_incidents, incident_id as _incident_id, is_leader_worker)
 from utils.logger import logger
+from utils.metrics import HTTP_LATENCY, LOAD_SECONDS, CACHE_REQUESTS, CACHE_EVICTIONS, Gauge, render_all
+from utils.tracing import span, start_trace, end_trace, server_timing
+from api import snapshots
 
 app = FastAPI(
     title="PyroWatch AI",
@@ -31,22 +40,154 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-_dataset      = None
-_replay_cache = {}
+_dataset         = None
+_dataset_version = None
+_replay_cache    = {}
+_risk_map_cache  = OrderedDict()
+_RISK_MAP_CACHE_SIZE = 64
+_in_flight       = 0
+_profile_session = contextvars.ContextVar("profile_session", default=None)  # this request's profilers
+
+Gauge("pyrowatch_replay_cache_entries", "Entries in the /replay result cache", fn=lambda: len(_replay_cache))
+Gauge("pyrowatch_risk_map_cache_entries", "Entries in the /risk-map result cache", fn=lambda: len(_risk_map_cache))
+
+
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    t0 = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    HTTP_LATENCY.observe(
+        time.perf_counter() - t0,
+        getattr(route, "path", "unmatched"), request.method, response.status_code,
+    )
+    return response
+
+
+@app.middleware("http")
+async def trace_request(request: Request, call_next):
+    global _in_flight
+    profiler = _start_profiler(request)
+    session, session_token = None, None
+    if profiler is not None:
+        session = [profiler]
+        session_token = _profile_session.set(session)
+        overlap = _in_flight
+    _in_flight += 1
+    token = start_trace()
+    t0 = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        _in_flight -= 1
+        spans = end_trace(token)
+        if profiler is not None:
+            profiler.disable()
+            _profile_session.reset(session_token)
+    response.headers["Server-Timing"]      = server_timing(spans, time.perf_counter() - t0)
+    response.headers["Timing-Allow-Origin"] = "*"
+    if session is not None:
+        response.headers["X-Profile-Id"]      = _save_profile(session, request)
+        response.headers["X-Profile-Overlap"] = str(max(overlap, _in_flight))
+    return response
+
+
+def _is_admin(supplied: str) -> bool:
+    return bool(PROFILE_TOKEN) and bool(supplied) and hmac.compare_digest(supplied, PROFILE_TOKEN)
+
+
+def _start_profiler(request: Request):
+    # Header only: a query token would be written to the access log with the URL. /admin/
+    # requests (reading a profile needs the token too) would only profile the profiler.
+    supplied = request.headers.get("x-profile")
+    if not supplied or not _is_admin(supplied) or request.url.path.startswith("/admin/"):
+        return None
+    import cProfile
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Only one profiler can be active per interpreter; concurrent profiled requests run unprofiled.
+        logger.warning(f"Profiling skipped for {request.url.path}: another profile is in progress")
+        return None
+    return profiler
+
+
+async def _to_thread(fn, *args, **kwargs):
+    """asyncio.to_thread, with the thread's work added to the request's profile if it has one.
+
+    The request's own profiler only sees the event-loop thread (Python < 3.12), and with it
+    any other request's coroutines that ran meanwhile — X-Profile-Overlap says how many.
+    """
+    if _profile_session.get() is None:
+        return await asyncio.to_thread(fn, *args, **kwargs)
+    return await asyncio.to_thread(_run_profiled, fn, *args, **kwargs)
+
+
+def _run_profiled(fn, *args, **kwargs):
+    import cProfile
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        return fn(*args, **kwargs)  # 3.12+: the request's profiler already covers every thread
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        profiler.disable()
+        _profile_session.get().append(profiler)  # to_thread copied the request's context
+
+
+def _save_profile(profilers: list, request: Request) -> str:
+    import pstats
+    route = request.url.path.strip("/").replace("/", "_") or "root"
+    profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{route}-{uuid.uuid4().hex[:6]}"
+    PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+    stats = pstats.Stats(profilers[0])
+    for profiler in profilers[1:]:
+        stats.add(profiler)
+    stats.dump_stats(PROFILES_DIR / f"{profile_id}.prof")
+    logger.info(f"Request profile saved: {profile_id} ({len(profilers) - 1} worker-thread profile(s) merged)")
+    return profile_id
+
 
 def _get_dataset() -> pd.DataFrame:
-    global _dataset
+    global _dataset, _dataset_version
     if _dataset is None:
-        from data.feature_builder import load_dataset
-        _dataset = load_dataset()
+        from utils.dataset_store import load_processed
+        t0 = time.perf_counter()
+        _dataset = load_processed()
+        LOAD_SECONDS.set(time.perf_counter() - t0, "dataset")
+        _dataset_version = None
     return _dataset
 
 
+def _get_dataset_version() -> str:
+    global _dataset_version
+    if _dataset_version is None:
+        df = _get_dataset()
+        digest = pd.util.hash_pandas_object(df, index=False).values.tobytes()
+        _dataset_version = hashlib.md5(digest).hexdigest()[:12]
+    return _dataset_version
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in header.split(",")]
+    return "*" in tags or etag in tags
+
+
 @app.on_event("startup")
 async def startup():
     logger.info("=== PyroWatch AI Phase 3 starting ===")
     logger.info(f"  Environment: {APP_ENV}")
     validate_keys()
+    # Under `uvicorn --workers N` each worker gets cpus / N threads (a no-op under api/serve.py,
+    # whose workers have already applied theirs).
+    from utils.threads import apply as apply_threads
+    apply_threads("serve", processes=int(os.getenv("WEB_CONCURRENCY", "1")))
     try:
         from ml.inference import get_model_info, predict_risk
         info = get_model_info()
@@ -58,10 +199,28 @@ async def startup():
             logger.warning(f"  Model not ready: {info}")
     except Exception as e:
         logger.warning(f"  Model warmup skipped: {e}")
+    from api import ingest, report_prefetch
+    leader = is_leader_worker()
+    if leader:
+        ingest.start()
+    report_prefetch.start()
+    logger.info("  Ingest: POST /ingest" + (f" or drop files into {INGEST_CONFIG['drop_dir']}" if leader else ""))
+    if SNAPSHOT_CONFIG["enabled"]:
+        snapshots.start()
+        logger.info(f"  Snapshot scheduler: every {SNAPSHOT_CONFIG['interval_s']:.0f}s or on new data"
+                    if leader else "  Snapshots: loaded from the leader worker")
     logger.info("  Swagger UI: http://localhost:8000/docs")
     logger.info("  Ready to serve requests")
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    from api import ingest, report_prefetch
+    await ingest.stop()
+    report_prefetch.stop()
+    await snapshots.stop()
+
+
 @app.get("/health", tags=["System"])
 async def health():
     return {"status": "ok", "service": "PyroWatch AI", "version": "1.0.0", "phase": 3}
@@ -69,75 +228,256 @@ async def health():
 
 @app.get("/status", tags=["System"])
 async def status():
-    from utils.config import PROCESSED_DIR
+    from utils.dataset_store import dataset_ready
     from ml.inference import get_model_info
     incident = get_active_incident()
     return {
-        "dataset_ready": (PROCESSED_DIR / "dataset.csv").exists(),
+        "dataset_ready": dataset_ready(),
         "model_info":    get_model_info(),
         "demo_fire":     incident["name"],
         "is_realtime":   incident["name"] != "Dixie Fire",
+        "incidents":     [_incident_id(i) for i in get_tracked_incidents()],
         "api_ready":     True,
     }
 
 
+@app.get("/incidents", tags=["System"])
+async def incidents():
+    out = []
+    for incident in get_tracked_incidents():
+        snap = snapshots.latest(incident)
+        out.append({
+            "id":           _incident_id(incident),
+            "name":         incident["name"],
+            "center":       {"lat": incident["center_lat"], "lon": incident["center_lon"]},
+            "bbox":         incident["bbox"],
+            "generated_at": snap.generated_at if snap else None,
+        })
+    return {"incidents": out}
+
+
+def _resolve_incident(incident_id: Optional[str]) -> dict:
+    try:
+        return get_incident(incident_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+
+@app.get("/metrics", tags=["System"], response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(render_all(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/model-info", tags=["System"])
 async def model_info():
     from ml.inference import get_model_info
     return get_model_info()
 
 
+@app.get("/admin/profiles/{profile_id}", tags=["System"], response_class=PlainTextResponse)
+async def get_profile(
+    profile_id: str,
+    request:    Request,
+    sort:       str = Query(default="cumulative", description="pstats sort key"),
+    limit:      int = Query(default=40),
+):
+    if not _is_admin(request.headers.get("x-profile")):
+        raise HTTPException(status_code=403, detail="Profiling is disabled or the token is wrong")
+    path = PROFILES_DIR / f"{os.path.basename(profile_id)}.prof"
+    if not path.exists():
+        raise HTTPException(status_code=404, detail=f"No profile {profile_id}")
+
+    # Raw .prof files stay on disk for snakeviz/pstats; this is the quick text view.
+    import io, pstats
+    out = io.StringIO()
+    try:
+        pstats.Stats(str(path), stream=out).sort_stats(sort).print_stats(limit)
+    except KeyError:
+        raise HTTPException(status_code=400, detail=f"Unknown sort key: {sort}")
+    return PlainTextResponse(out.getvalue())
+
+
+def _get_data_version(incident: dict) -> str:
+    from api.ingest import data_version
+    with span("dataset"):
+        return data_version(incident)
+
+
+def _latest_sequence(incident: dict) -> np.ndarray:
+    # Zero-copy view of the newest rows in the incident's ring buffer.
+    from api.ingest import buffer_for
+    with span("dataset"):
+        _, rows = buffer_for(incident).window(LSTM_CONFIG["sequence_length"])
+    return rows[:, :LSTM_CONFIG["n_features"]]
+
+
+def _risk_map_key(date: str, region: str, grid_step: float, incident: dict,
+                  mode: str = "cells", simplify: float = 0.0) -> str:
+    from ml.inference import get_model_version
+    bbox = incident["bbox"]
+    key = [
+        date, region, grid_step,
+        [bbox["min_lat"], bbox["max_lat"], bbox["min_lon"], bbox["max_lon"]],
+        incident["name"], _get_data_version(incident), get_model_version(),
+    ]
+    if mode != "cells":
+        key += [mode, simplify]
+    return json.dumps(key)
+
+
+def _build_risk_map(date: str, region: str, grid_step: float, incident: dict, generated_at: str = None,
+                    mode: str = "cells", simplify: float = 0.0) -> bytes:
+    return _build_risk_maps([(date, region, grid_step, incident)], generated_at, mode, simplify)[0]
+
+
+def _build_risk_maps(jobs: list[tuple], generated_at: str = None,
+                     mode: str = "cells", simplify: float = 0.0) -> list[bytes]:
+    """Serialized /risk-map bodies for (date, region, grid_step, incident) jobs, scored in one batch."""
+    from api.geo import build_risk_geojsons, _get_alert_tier, _classify_risk
+    with span("dataset"):
+        frames = [_risk_map_frame(date, incident) for date, _, _, incident in jobs]
+    with span("geojson"):
+        geojsons = build_risk_geojsons([
+            {"df_sequence": frame, "grid_step": grid_step, "bbox": incident["bbox"], "seed_key": date,
+             "center": (incident["center_lat"], incident["center_lon"])}
+            for frame, (date, _, grid_step, incident) in zip(frames, jobs)
+        ], mode=mode, simplify=simplify)
+
+    bodies = []
+    for geojson, (date, region, _, incident) in zip(geojsons, jobs):
+        risks    = [f["properties"].get("max_risk", f["properties"]["risk_score"]) for f in geojson["features"]]
+        max_risk = max(risks) if risks else 0
+        alert    = _get_alert_tier(max_risk)
+        level, _ = _classify_risk(max_risk)
+        with span("serialize"):
+            bodies.append(json.dumps({
+                "date": date, "region": region, "incident": incident["name"],
+                "n_cells": sum(f["properties"].get("n_cells", 1) for f in geojson["features"]),
+                "n_features": len(geojson["features"]),
+                "mode": mode,
+                "max_risk": round(max_risk, 4),
+                "risk_level": level, "alert_tier": alert,
+                "generated_at": generated_at or snapshots.utc_now(),
+                "geojson": geojson,
+            }, separators=(",", ":")).encode())
+    return bodies
+
+
+def _risk_map_frame(date: str, incident: dict) -> pd.DataFrame:
+    from api.ingest import buffer_for, COLUMNS
+    ring = buffer_for(incident)
+    ts, rows = ring.window(24)
+    if incident["name"] == "Dixie Fire":
+        # Last 24 rows up to the end of `date`, found by binary search on the timestamps.
+        until = (pd.Timestamp(date) + pd.Timedelta(days=1)).value
+        day_ts, day_rows = ring.window(24, until_ns=until)
+        if len(day_ts):
+            ts, rows = day_ts, day_rows
+    day_df = pd.DataFrame(rows, columns=COLUMNS, copy=False)
+    day_df.insert(0, "timestamp", pd.to_datetime(ts))
+    return day_df
+
+
 @app.get("/risk-map", tags=["Prediction"])
 async def risk_map(
+    request:   Request,
     date:      str   = Query(default="2021-07-15", description="YYYY-MM-DD"),
     region:    str   = Query(default="CA"),
     grid_step: float = Query(default=0.08,         description="Grid resolution in degrees"),
+    incident_id: Optional[str] = Query(default=None, description="Tracked incident id (see /incidents)"),
+    mode:      str   = Query(default="cells",      pattern="^(cells|contours)$",
+                             description="cells: one square per grid cell; contours: same-level cells merged"),
+    simplify:  float = Query(default=0.0, ge=0.0,  description="Contour simplification tolerance in degrees"),
 ):
+    with span("incident"):
+        incident = _resolve_incident(incident_id)
     try:
-        incident = get_active_incident()
-        df = _get_dataset()
-        df = df.copy()
-        
-        if incident["name"] == "Dixie Fire":
-            df["date_str"] = pd.to_datetime(df["timestamp"]).dt.strftime("%Y-%m-%d")
-            day_df = df[df["date_str"] <= date].tail(24)
-        else:
-            day_df = df.tail(24)
-            
-        if len(day_df) == 0:
-            day_df = df.tail(24)
-
-        from api.geo import build_risk_geojson, _get_alert_tier, _classify_risk
-        geojson = build_risk_geojson(day_df, grid_step=grid_step, bbox=incident["bbox"])
-        risks   = [f["properties"]["risk_score"] for f in geojson["features"]]
-        max_risk = max(risks) if risks else 0
-        alert    = _get_alert_tier(max_risk)
-        level, _ = _classify_risk(max_risk)
-
-        return {
-            "date": date, "region": region, "incident": incident["name"],
-            "n_cells": len(geojson["features"]),
-            "max_risk": round(max_risk, 4),
-            "risk_level": level, "alert_tier": alert,
-            "geojson": geojson,
-        }
+        cache_key = _risk_map_key(date, region, grid_step, incident, mode, simplify)
+        etag      = '"' + hashlib.md5(cache_key.encode()).hexdigest() + '"'
+        headers   = {"ETag": etag, "Cache-Control": "public, no-cache"}
+
+        if _etag_matches(request, etag):
+            CACHE_REQUESTS.inc("risk_map", "not_modified")
+            return Response(status_code=304, headers=headers)
+
+        snap = snapshots.latest(incident)
+        if snap is not None and cache_key in snap.risk_maps:
+            CACHE_REQUESTS.inc("risk_map", "snapshot")
+            return Response(content=snap.risk_maps[cache_key], media_type="application/json", headers=headers)
+
+        body = _risk_map_cache.get(cache_key)
+        if body is not None:
+            CACHE_REQUESTS.inc("risk_map", "hit")
+            _risk_map_cache.move_to_end(cache_key)
+            return Response(content=body, media_type="application/json", headers=headers)
+        CACHE_REQUESTS.inc("risk_map", "miss")
+
+        body = _build_risk_map(date, region, grid_step, incident, mode=mode, simplify=simplify)
+        _risk_map_cache[cache_key] = body
+        while len(_risk_map_cache) > _RISK_MAP_CACHE_SIZE:
+            _risk_map_cache.popitem(last=False)
+            CACHE_EVICTIONS.inc("risk_map")
+        return Response(content=body, media_type="application/json", headers=headers)
     except Exception as e:
         logger.error(f"/risk-map error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _latest_prediction(incident: dict) -> dict:
+    seq = _latest_sequence(incident)
+    from ml.inference import predict_risk
+    with span("inference"):
+        return predict_risk(seq)
+
+
+def _latest_predictions(incidents: list[dict]) -> list[dict]:
+    from ml.inference import score_batch, _format_prediction
+    seqs = np.stack([_latest_sequence(incident) for incident in incidents])
+    with span("inference"):
+        scores = score_batch(seqs, caller="forecast")
+    return [_format_prediction(float(score)) for score in scores]
+
+
+def _forecast_uncertainty(incident: dict, budget_ms: float = None) -> dict:
+    from ml.inference import predict_uncertainty, uncertainty_confidence
+    with span("inference"):
+        u = predict_uncertainty(_latest_sequence(incident)[None], budget_ms=budget_ms)
+    return {
+        "confidence":  uncertainty_confidence(u["lo"], u["hi"])[0],
+        "uncertainty": {
+            "mean":     round(float(u["mean"][0]), 4),
+            "std":      round(float(u["std"][0]), 4),
+            "interval": [round(float(u["lo"][0]), 4), round(float(u["hi"][0]), 4)],
+            "level":    UNCERTAINTY_CONFIG["interval"],
+            "k":        u["k"],
+        },
+    }
+
+
 @app.get("/forecast", tags=["Prediction"])
 async def forecast(
     lat:   float = Query(default=40.0),
     lon:   float = Query(default=-121.2),
     hours: int   = Query(default=6),
+    incident_id: Optional[str] = Query(default=None),
+    uncertainty: bool  = Query(default=False, description="Add an MC dropout interval; confidence comes from it"),
+    budget_ms:   float = Query(default=None, gt=0, le=5000, description="Latency budget for the MC passes"),
 ):
+    incident = _resolve_incident(incident_id)
     try:
-        df  = _get_dataset()
-        seq = df[LSTM_CONFIG["features"]].tail(LSTM_CONFIG["sequence_length"]).values.astype(np.float32)
-        from ml.inference import predict_risk
-        result = predict_risk(seq)
-        return {"lat": lat, "lon": lon, "forecast_hours": hours, **result, "model_auc": 0.9727}
+        # The prediction only depends on the latest sequence; lat/lon/hours are echoed back.
+        snap = snapshots.current(incident)
+        if snap is not None:
+            CACHE_REQUESTS.inc("forecast", "snapshot")
+            result, generated_at = snap.forecast, snap.generated_at
+        else:
+            CACHE_REQUESTS.inc("forecast", "miss")
+            result, generated_at = _latest_prediction(incident), snapshots.utc_now()
+        extra = {}
+        if uncertainty:
+            extra = await _to_thread(_forecast_uncertainty, incident, budget_ms)
+        return {"lat": lat, "lon": lon, "forecast_hours": hours, **result, **extra, "model_auc": 0.9727,
+                "incident": incident["name"], "generated_at": generated_at}
     except Exception as e:
         logger.error(f"/forecast error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -156,11 +496,71 @@ class SituationReportRequest(BaseModel):
     fire_pixels:    int   = 180
     forecast_hours: int   = 6
 
+
+async def _read_body(request: Request, max_mb: int) -> bytes:
+    # Content-Length is missing on chunked uploads, so count the bytes as they arrive.
+    limit = max_mb << 20
+    too_big = HTTPException(status_code=413, detail=f"Body over {max_mb} MB")
+    if int(request.headers.get("content-length") or 0) > limit:
+        raise too_big
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise too_big
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+@app.post("/predict/batch", tags=["Prediction"])
+async def predict_batch(
+    request:     Request,
+    uncertainty: bool  = Query(default=False, description="Add MC dropout mean/std/interval columns"),
+    budget_ms:   float = Query(default=None, gt=0, le=60000, description="Latency budget for the MC passes"),
+):
+    """Score many (sequence_length, n_features) windows in one call.
+
+    Body: JSON {"sequences": [...]}, a .npy array (application/x-npy) or an Arrow IPC stream
+    (application/vnd.apache.arrow.stream) with one fixed-size-list "sequence" column.
+    """
+    from api.batch import BatchError, decode
+    from ml.inference import predict_batch as _predict_batch, get_model_version, predict_uncertainty, \
+        uncertainty_confidence, _format_batch
+
+    body = await _read_body(request, BATCH_PREDICT_CONFIG["max_body_mb"])
+    try:
+        with span("decode"):
+            sequences = await _to_thread(decode, body, request.headers.get("content-type"))
+    except BatchError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    try:
+        with span("inference"):
+            if not uncertainty:
+                result = await _to_thread(_predict_batch, sequences, BATCH_PREDICT_CONFIG["chunk_size"])
+            else:
+                u = await _to_thread(predict_uncertainty, sequences, budget_ms,
+                                     chunk_size=BATCH_PREDICT_CONFIG["chunk_size"])
+                result = {
+                    **_format_batch(u["risk_score"]),
+                    "risk_mean":  np.round(u["mean"], 4).tolist(),
+                    "risk_std":   np.round(u["std"], 4).tolist(),
+                    "risk_lo":    np.round(u["lo"], 4).tolist(),
+                    "risk_hi":    np.round(u["hi"], 4).tolist(),
+                    "confidence": uncertainty_confidence(u["lo"], u["hi"]).tolist(),
+                    "k":          u["k"],
+                }
+    except Exception as e:
+        logger.error(f"/predict/batch error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"n": len(sequences), "model_version": get_model_version(), **result}
+
+
 @app.post("/situation-report", tags=["AI"])
 async def situation_report(data: SituationReportRequest):
     try:
         from api.featherless import generate_situation_report
-        report = generate_situation_report(data.model_dump())
+        # Waits up to the LLM deadline; off the loop, so other requests keep being served.
+        report = await _to_thread(generate_situation_report, data.model_dump())
         return {"report": report, "model": "Mistral-7B (Featherless)",
                 "risk_score": data.risk_score, "alert_tier": data.alert_tier}
     except Exception as e:
@@ -174,15 +574,21 @@ async def replay(
     n_frames: int = Query(default=48),
 ):
     # For demo, keeping replay locked to Dixie unless fire_id is 'live'
-    incident = get_active_incident() if fire_id == "live" else DEMO_FIRE
+    with span("incident"):
+        incident = get_active_incident() if fire_id == "live" else DEMO_FIRE
     
+    # Cached as serialized bytes: re-encoding hundreds of frames per hit cost more than building them.
     cache_key = f"{fire_id}_{n_frames}"
     if cache_key in _replay_cache:
-        return _replay_cache[cache_key]
+        CACHE_REQUESTS.inc("replay", "hit")
+        return Response(content=_replay_cache[cache_key], media_type="application/json")
+    CACHE_REQUESTS.inc("replay", "miss")
     try:
-        df = _get_dataset()
+        with span("dataset"):
+            df = _get_dataset()
         from api.geo import build_replay_frames, _get_alert_tier
-        frames = build_replay_frames(df, n_frames=n_frames)
+        with span("geojson"):
+            frames = build_replay_frames(df, n_frames=n_frames)
         alert_frame = next(
             (f["frame"] for f in frames if f["alert_tier"] in ("warning", "emergency")), None
         )
@@ -197,14 +603,41 @@ async def replay(
                 "start_date": incident["start_date"],
             },
         }
-        _replay_cache[cache_key] = result
+        with span("serialize"):
+            body = json.dumps(result, separators=(",", ":")).encode()
+        _replay_cache[cache_key] = body
         logger.info(f"Replay ready: {len(frames)} frames, alert fires at frame {alert_frame}")
-        return result
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         logger.error(f"/replay error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+class IngestRequest(BaseModel):
+    incident: Optional[str] = None
+    rows:     list[dict]
+
+
+@app.post("/ingest", tags=["Ingest"])
+async def ingest_rows(data: IngestRequest, request: Request):
+    # A shared token, not the peer address: behind a local reverse proxy every client is loopback.
+    token    = INGEST_CONFIG["token"]
+    supplied = request.headers.get("x-ingest-token")
+    if not token:
+        raise HTTPException(status_code=403, detail="Ingest over HTTP is disabled — set PYROWATCH_INGEST_TOKEN")
+    if not supplied or not hmac.compare_digest(supplied, token):
+        raise HTTPException(status_code=403, detail="Missing or wrong X-Ingest-Token")
+    from api.ingest import ingest_records
+    try:
+        incident = get_incident(data.incident)
+    except KeyError as e:
+        raise HTTPException(status_code=422, detail=f"{e.args[0]} — ingest accepts tracked incidents only (see /incidents)")
+    try:
+        return ingest_records(data.rows, incident)
+    except (ValueError, KeyError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
 _DEMO_COUNTIES = [
     {"county": "Plumas County",  "lat": 40.00, "lon": -121.00, "fips": "06063"},
     {"county": "Butte County",   "lat": 39.70, "lon": -121.60, "fips": "06007"},
@@ -215,66 +648,135 @@ _DEMO_COUNTIES = [
 ]
 
 @app.get("/alert-history", tags=["Prediction"])
-async def alert_history():
+async def alert_history(
+    start:  Optional[str] = Query(None, description="Only events still running at or after this time (ISO 8601)"),
+    end:    Optional[str] = Query(None, description="Only events that started at or before this time (ISO 8601)"),
+    limit:  int = Query(10, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    incident_id: Optional[str] = Query(None),
+):
+    from api.alert_index import index_for
+    incident = _resolve_incident(incident_id)
     try:
-        incident = get_active_incident()
-        df = _get_dataset()
-        
-        # Heuristic: Find frames where risk crossed 'warning' threshold (0.6)
-        alerts_df = df[df["risk_score"] >= 0.6].copy()
-        alerts_df = alerts_df.sort_values("timestamp", ascending=False).head(10)
-        
-        history = []
-        for _, row in alerts_df.iterrows():
-            history.append({
-                "timestamp": row["timestamp"].isoformat(),
-                "incident": incident["name"],
-                "risk_score": float(round(float(row["risk_score"]), 4)),
-                "fire_pixels": int(row["fire_pixels"]),
-                "temperature": float(row["temperature"]),
-                "alert_tier": "warning" if row["risk_score"] < 0.75 else "emergency"
-            })
-            
-        return {"history": history}
+        start_ns, end_ns = _parse_ns(start), _parse_ns(end)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    try:
+        index = index_for(incident)
+        history, next_cursor = index.query(start_ns, end_ns, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         logger.error(f"/alert-history error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "incident":     incident["name"],
+        "history":      history,
+        "next_cursor":  next_cursor,
+        "total_events": len(index),
+    }
 
 
-@app.get("/alerts", tags=["Prediction"])
-async def alerts(region: str = Query(default="CA")):
+def _parse_ns(value: Optional[str]) -> Optional[int]:
+    if value is None:
+        return None
     try:
-        incident = get_active_incident()
-        
-        # If it's the demo fire, use the pre-built dataset
-        df = _get_dataset()
-            
-        seq = df[LSTM_CONFIG["features"]].tail(LSTM_CONFIG["sequence_length"]).values.astype(np.float32)
-        from ml.inference import predict_risk
-        from api.geo import _get_alert_tier, _classify_risk
-        center_lat, center_lon = incident["center_lat"], incident["center_lon"]
-
-        county_alerts = []
-        for c in _DEMO_COUNTIES:
-            name = c.get("county") or c.get("proxy_county")
-            dist        = np.sqrt((c["lat"] - center_lat)**2 + (c["lon"] - center_lon)**2)
-            attenuation = np.exp(-dist * 1.5)
-            mod_seq     = seq.copy()
-            mod_seq[:, 0] = seq[:, 0] * attenuation
-            result = predict_risk(mod_seq)
-            county_alerts.append({**c, "county": name, **result})
-
+        ts = pd.Timestamp(value)
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid timestamp: {value!r}")
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return ts.value
+
+
+def _compute_alerts(region: str, incident: dict, generated_at: str = None) -> dict:
+    return _compute_alerts_many(region, [incident], generated_at)[0]
+
+
+def _compute_alerts_many(region: str, incidents: list[dict], generated_at: str = None) -> list[dict]:
+    """County alerts for several incidents from one batched pass over every (incident, county) window."""
+    from ml.inference import score_batch, _format_prediction
+    names = [c.get("county") or c.get("proxy_county") for c in _DEMO_COUNTIES]
+    lats  = np.array([c["lat"] for c in _DEMO_COUNTIES])
+    lons  = np.array([c["lon"] for c in _DEMO_COUNTIES])
+
+    seqs, latest_rows = [], []
+    for incident in incidents:
+        seq = _latest_sequence(incident)
+        latest_rows.append(seq[-1])
+        dist        = np.sqrt((lats - incident["center_lat"])**2 + (lons - incident["center_lon"])**2)
+        attenuation = np.exp(-dist * 1.5).astype(np.float32)
+        mod_seqs    = np.repeat(seq[None], len(_DEMO_COUNTIES), axis=0)
+        mod_seqs[:, :, 0] = seq[None, :, 0] * attenuation[:, None]
+        seqs.append(mod_seqs)
+    with span("inference"):
+        scores = score_batch(np.concatenate(seqs), caller="alerts").reshape(len(incidents), len(_DEMO_COUNTIES))
+
+    out = []
+    for incident, row in zip(incidents, scores):
+        county_alerts = [{**c, "county": name, **_format_prediction(float(score))}
+                         for c, name, score in zip(_DEMO_COUNTIES, names, row)]
         county_alerts.sort(key=lambda x: x["risk_score"], reverse=True)
         active = [c for c in county_alerts if c["alert_tier"] != "none"]
-
-        return {
+        out.append({
             "region": region,
             "incident": incident["name"],
-            "center": {"lat": center_lat, "lon": center_lon},
+            "center": {"lat": incident["center_lat"], "lon": incident["center_lon"]},
             "counties": county_alerts,
             "active_alerts": len(active),
             "highest_tier": county_alerts[0]["alert_tier"] if county_alerts else "none",
-        }
+            "generated_at": generated_at or snapshots.utc_now(),
+        })
+
+    from api import report_prefetch
+    for alerts_, row in zip(out, latest_rows):
+        report_prefetch.submit(report_prefetch.report_inputs(alerts_, row))
+    return out
+
+
+@app.get("/alerts", tags=["Prediction"])
+async def alerts(
+    region:      str = Query(default="CA"),
+    incident_id: Optional[str] = Query(default=None),
+):
+    incident = _resolve_incident(incident_id)
+    try:
+        snap = snapshots.current(incident)
+        if snap is not None and region in snap.alerts:
+            CACHE_REQUESTS.inc("alerts", "snapshot")
+            return Response(content=snap.alerts[region], media_type="application/json")
+        CACHE_REQUESTS.inc("alerts", "miss")
+        return _compute_alerts(region, incident)
     except Exception as e:
         logger.error(f"/alerts error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.websocket("/ws/alerts")
+async def ws_alerts(websocket: WebSocket, region: str = "CA", incident_id: Optional[str] = None):
+    """Full county alerts on connect, then only changes, pushed once per snapshot refresh."""
+    from api import alert_stream
+    try:
+        incident = get_incident(incident_id)
+    except KeyError as e:
+        await websocket.close(code=1008, reason=str(e.args[0]))
+        return
+    await websocket.accept()
+    queue = alert_stream.subscribe(incident["name"], region)
+    try:
+        initial = alert_stream.initial_state(incident["name"], region)
+        if initial is None:
+            # No cycle published yet (or the scheduler is off): start from a computed state.
+            alerts_ = await _to_thread(_compute_alerts, region, incident)
+            initial = json.dumps({"type": "snapshot", "region": region, "alerts": alerts_}, separators=(",", ":"))
+        await websocket.send_text(initial)
+        while True:
+            message = await queue.get()
+            if message is None:
+                await websocket.close(code=1013)  # try again later: reconnect to resync
+                break
+            await websocket.send_text(message)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        alert_stream.unsubscribe(queue)
@@ -0,0 +1,112 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from utils.config import ALERT_TIERS, LSTM_CONFIG, REPORT_PREFETCH_CONFIG
+from utils.logger import logger
+from utils.metrics import REPORT_PREFETCH
+
+
+# Warms the situation report cache for counties with an active alert, so /situation-report
+# for them is a cache hit. Submissions are fire-and-forget: a bounded pool makes the LLM
+# calls, a key already cached or in flight is skipped, and past max_pending work is dropped.
+# Each call waits for the upstream itself (featherless.prefetch_report) rather than for the
+# interactive deadline, so `concurrency` bounds the upstream calls prefetch has open.
+
+_executor = None
+_inflight = set()
+_pending  = 0
+_lock     = threading.Lock()
+
+_FEATURES = LSTM_CONFIG["features"]
+
+
+def start() -> None:
+    global _executor, _pending
+    # Started by the app rather than on import: threads made before a pre-fork would not
+    # exist in the workers.
+    if REPORT_PREFETCH_CONFIG["enabled"] and _executor is None:
+        with _lock:
+            _inflight.clear()
+            _pending = 0
+        _executor = ThreadPoolExecutor(REPORT_PREFETCH_CONFIG["concurrency"], thread_name_prefix="report-prefetch")
+
+
+def stop() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def report_inputs(alerts: dict, latest_row: np.ndarray) -> list[dict]:
+    """/situation-report payloads for the counties in `alerts` at min_tier or above."""
+    min_score = ALERT_TIERS[REPORT_PREFETCH_CONFIG["min_tier"]]
+    row = dict(zip(_FEATURES, (float(v) for v in latest_row[:len(_FEATURES)])))
+    weather = {
+        "wind_speed":     row["wind_speed"],
+        "wind_direction": float(np.degrees(np.arctan2(row["wind_dir_sin"], row["wind_dir_cos"])) % 360),
+        "temperature":    row["temperature"],
+        "humidity":       row["humidity"],
+        "fire_pixels":    int(row["fire_pixels"]),
+    }
+    return [
+        {"region": alerts["region"], "county": c["county"], "risk_score": c["risk_score"],
+         "risk_level": c["risk_level"], "alert_tier": c["alert_tier"],
+         "forecast_hours": c["forecast_hours"], **weather}
+        for c in alerts["counties"] if c["risk_score"] >= min_score
+    ]
+
+
+def submit(inputs: list[dict]) -> int:
+    """Queue report generation for each input not already cached or in flight; returns how many."""
+    global _pending
+    if _executor is None or not inputs:
+        return 0
+    from api.featherless import report_key, cached_report, FEATHERLESS_API_KEY
+    if not FEATHERLESS_API_KEY:
+        return 0  # template reports are instant and never cached
+
+    queued = 0
+    for risk_data in inputs:
+        key = report_key(risk_data)
+        with _lock:
+            if key in _inflight:
+                REPORT_PREFETCH.inc("inflight")
+                continue
+            if _pending >= REPORT_PREFETCH_CONFIG["max_pending"]:
+                REPORT_PREFETCH.inc("dropped")
+                continue
+            _inflight.add(key)
+            _pending += 1
+        if cached_report(risk_data):
+            REPORT_PREFETCH.inc("cached")
+            _done(key)
+            continue
+        try:
+            _executor.submit(_generate, key, risk_data)
+        except RuntimeError:  # shut down meanwhile
+            _done(key)
+            break
+        REPORT_PREFETCH.inc("submitted")
+        queued += 1
+    return queued
+
+
+def _generate(key: str, risk_data: dict) -> None:
+    from api.featherless import prefetch_report
+    try:
+        REPORT_PREFETCH.inc("done" if prefetch_report(risk_data) else "circuit_open")
+    except Exception as e:
+        REPORT_PREFETCH.inc("error")
+        logger.warning(f"Report prefetch for {risk_data.get('county')} failed: {e}")
+    finally:
+        _done(key)
+
+
+def _done(key: str) -> None:
+    global _pending
+    with _lock:
+        _inflight.discard(key)
+        _pending -= 1
@@ -0,0 +1,231 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import gc
+import shutil
+import signal
+import socket
+import tempfile
+import time
+
+from utils.config import LSTM_CONFIG, SNAPSHOT_CONFIG
+from utils.logger import logger
+
+
+# Pre-fork serving: the parent loads the model, scaler and dataset once, then forks N uvicorn
+# workers that accept on one shared socket. Read-only pages stay shared between workers via
+# copy-on-write, so memory grows with per-request working sets rather than with N copies of
+# everything. `uvicorn --workers` can't do this: it spawns fresh interpreters.
+# Worker 0 is the leader: only it polls the ingest drop dir and rebuilds snapshots, and the
+# others load its snapshots from a shared directory. The rings it ingests into are shared only
+# when they were created before the fork, i.e. not under --no-preload.
+
+
+def preload() -> dict:
+    import numpy as np
+    import api.main as main
+    from ml.inference import get_model_info, predict_risk
+
+    t0 = time.perf_counter()
+    main._dataset = _cow_friendly(main._get_dataset())
+    main._get_dataset_version()
+
+    info = get_model_info()
+    if info["status"] == "ready":
+        predict_risk(np.zeros((LSTM_CONFIG["sequence_length"], LSTM_CONFIG["n_features"]), dtype=np.float32))
+
+    # Handlers import these on first use; do it once here instead of once per worker.
+    import api.geo, api.featherless  # noqa: F401
+
+    # Created before the fork so every worker shares one ring per incident and sees each other's ingests.
+    from api.ingest import buffer_for
+    from utils.config import get_tracked_incidents
+    for incident in get_tracked_incidents():
+        buffer_for(incident)
+
+    # Workers start with a ready snapshot and only rebuild once it goes stale.
+    if SNAPSHOT_CONFIG["enabled"]:
+        from api import snapshots
+        try:
+            snapshots.refresh()
+        except Exception as e:
+            logger.warning(f"Initial snapshot failed, the leader worker will build it: {e}")
+
+    # Move everything allocated so far out of the collector's reach: a GC pass in a worker
+    # would otherwise write to every object header and un-share those pages.
+    gc.collect()
+    gc.freeze()
+    stats = {
+        "seconds":      round(time.perf_counter() - t0, 2),
+        "dataset_rows": len(main._dataset),
+        "model":        info["status"],
+        "frozen_objs":  gc.get_freeze_count(),
+    }
+    logger.info(f"Preloaded in {stats['seconds']}s — {stats['dataset_rows']} rows, model {stats['model']}, "
+                f"{stats['frozen_objs']:,} objects frozen")
+    return stats
+
+
+def _cow_friendly(df):
+    # Object columns hold one PyObject per cell, and reading them bumps refcounts — each read
+    # dirties a page and forces a private copy. Categoricals keep the data in an int codes array.
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].astype("category")
+    return df
+
+
+def _smaps_rollup(pid: int) -> dict:
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1])
+    except FileNotFoundError:
+        # Kernels before 4.14 have no smaps_rollup; fall back to RSS only.
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    fields["Rss"] = int(line.split()[1])
+    return fields
+
+
+def memory_report(pids: dict) -> list[dict]:
+    rows = []
+    for pid, role in pids.items():
+        try:
+            f = _smaps_rollup(pid)
+        except (FileNotFoundError, ProcessLookupError):
+            continue
+        rows.append({
+            "pid":        pid,
+            "role":       role,
+            "rss_mb":     round(f.get("Rss", 0) / 1024, 1),
+            "pss_mb":     round(f["Pss"] / 1024, 1) if "Pss" in f else None,
+            "shared_mb":  round((f.get("Shared_Clean", 0) + f.get("Shared_Dirty", 0)) / 1024, 1),
+            "private_mb": round((f.get("Private_Clean", 0) + f.get("Private_Dirty", 0)) / 1024, 1),
+        })
+    return rows
+
+
+def print_memory_report(rows: list[dict]) -> None:
+    print(f"\n{'role':<10}{'pid':>8}{'RSS MB':>10}{'PSS MB':>10}{'shared MB':>11}{'private MB':>12}")
+    print("─" * 61)
+    for r in rows:
+        pss = f"{r['pss_mb']:>10.1f}" if r["pss_mb"] is not None else f"{'n/a':>10}"
+        print(f"{r['role']:<10}{r['pid']:>8}{r['rss_mb']:>10.1f}{pss}{r['shared_mb']:>11.1f}{r['private_mb']:>12.1f}")
+    print("─" * 61)
+    total_rss = sum(r["rss_mb"] for r in rows)
+    total_pss = sum(r["pss_mb"] or 0 for r in rows)
+    # Summed RSS double-counts shared pages; summed PSS is the real footprint.
+    print(f"{'total':<18}{total_rss:>10.1f}{total_pss:>10.1f}\n", flush=True)
+
+
+def _worker(sock: socket.socket, threads: int, idx: int, workers: int) -> None:
+    import uvicorn
+    import api.main as main
+    from utils.threads import apply as apply_threads
+
+    apply_threads("serve", processes=workers, rank=idx, intra_op=threads)
+    config = uvicorn.Config(main.app, log_level="warning", access_log=False)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve(
+    host:          str   = "0.0.0.0",
+    port:          int   = 8000,
+    workers:       int   = 2,
+    threads:       int   = None,
+    preload_state: bool  = True,
+    report_after:  float = None,
+) -> None:
+    from utils.threads import settings_for
+    threads_label = threads or settings_for("serve", workers)["intra_op"]
+    # Set before preload, whose snapshots become the followers' first shared copy.
+    shared_dir = tempfile.mkdtemp(prefix="pyrowatch_snapshots_")
+    os.environ["PYROWATCH_SNAPSHOT_DIR"] = shared_dir
+    if preload_state:
+        preload()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    children = {}
+
+    def spawn(idx: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            os.environ["PYROWATCH_WORKER_ROLE"] = "leader" if idx == 0 else "follower"
+            code = 0
+            try:
+                _worker(sock, threads, idx, workers)
+            except BaseException as e:
+                logger.error(f"Worker {idx} crashed: {e}")
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = idx
+
+    for i in range(workers):
+        spawn(i)
+    logger.info(f"Serving on http://{host}:{port} — {workers} workers × {threads_label} threads, "
+                f"preload={'on' if preload_state else 'off'}")
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def report(signum, frame):
+        pids = {os.getpid(): "parent", **{pid: f"worker-{i}" for pid, i in children.items()}}
+        print_memory_report(memory_report(pids))
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGUSR1, report)  # kill -USR1 <parent> prints the report on demand
+    if report_after:
+        signal.signal(signal.SIGALRM, report)
+        signal.alarm(max(1, int(report_after)))
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        idx = children.pop(pid, None)
+        if idx is not None and not stopping:
+            logger.warning(f"Worker {idx} (pid {pid}) exited with status {status} — restarting")
+            spawn(idx)
+    sock.close()
+    shutil.rmtree(shared_dir, ignore_errors=True)
+    logger.info("All workers stopped")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Pre-fork PyroWatch API server with shared model and dataset")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=None, help="torch threads per worker (default: tuned settings, else cpus / workers)")
+    parser.add_argument("--no-preload", action="store_true",
+                        help="Fork before loading anything; each worker loads its own copy (for comparison)")
+    parser.add_argument("--memory-report-after", type=float, default=None, metavar="SECONDS",
+                        help="Print per-worker RSS/PSS after this many seconds (also on SIGUSR1)")
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.workers, args.threads,
+          preload_state=not args.no_preload, report_after=args.memory_report_after)
@@ -0,0 +1,228 @@
+import asyncio
+import json
+import os
+import pickle
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional
+
+from utils.config import SNAPSHOT_CONFIG, get_tracked_incidents, is_leader_worker
+from utils.logger import logger
+from utils.metrics import SNAPSHOT_BUILD, Gauge
+
+
+# Precomputed responses for the latest data, one snapshot per tracked incident. Snapshots are
+# never mutated: refresh builds new ones off the event loop and swaps the module mapping, so a
+# handler sees either the old snapshot or the new one, never a mix. Handlers compute on demand
+# when none matches. Under api/serve.py only the leader worker builds; it writes each refresh
+# to PYROWATCH_SNAPSHOT_DIR and the other workers load it from there.
+
+class Snapshot(NamedTuple):
+    generated_at:    str
+    built_at:        float                # time.monotonic(), for age checks
+    dataset_version: str
+    model_version:   str
+    incident:        str
+    risk_maps:       Mapping[str, bytes]  # keyed like the /risk-map cache
+    alerts:          Mapping[str, bytes]  # serialized /alerts body per region
+    forecast:        Mapping              # predict_risk() on the latest sequence
+
+
+_snapshots: Mapping[str, Snapshot] = MappingProxyType({})  # incident name -> snapshot
+_task    = None
+_wakeup  = None
+_seen    = None  # (inode, mtime) of the shared file a follower last loaded
+
+Gauge("pyrowatch_snapshot_age_seconds", "Age of the oldest precomputed incident snapshot",
+      fn=lambda: max((time.monotonic() - s.built_at for s in _snapshots.values()), default=-1))
+
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def latest(incident: dict) -> Optional[Snapshot]:
+    return _snapshots.get(incident["name"])
+
+
+def current(incident: dict) -> Optional[Snapshot]:
+    # Only valid while it matches the data and model it was built from.
+    snap = _snapshots.get(incident["name"])
+    if snap is None:
+        return None
+    import api.main as main
+    from ml.inference import get_model_version
+    if snap.dataset_version != main._get_data_version(incident) or snap.model_version != get_model_version():
+        return None
+    return snap
+
+
+def build(incidents: list[dict] = None) -> dict[str, Snapshot]:
+    """Snapshots for several incidents; grids, county alerts and forecasts each take one batched pass."""
+    import pandas as pd
+    import api.main as main
+    from api.ingest import buffer_for
+    from ml.inference import get_model_version
+
+    generated_at = utc_now()
+    incidents = incidents if incidents is not None else get_tracked_incidents()
+    model_version = get_model_version()
+    data_versions = [main._get_data_version(incident) for incident in incidents]
+
+    jobs = []
+    for incident in incidents:
+        dates = list(SNAPSHOT_CONFIG["risk_map_dates"])
+        last = buffer_for(incident).last_timestamp()
+        if last is not None:
+            dates.append(pd.Timestamp(last).strftime("%Y-%m-%d"))
+        for region in SNAPSHOT_CONFIG["regions"]:
+            for step in SNAPSHOT_CONFIG["grid_steps"]:
+                jobs.extend((date, region, step, incident) for date in dict.fromkeys(dates))
+    bodies = main._build_risk_maps(jobs, generated_at)
+
+    risk_maps = {incident["name"]: {} for incident in incidents}
+    for (date, region, step, incident), body in zip(jobs, bodies):
+        risk_maps[incident["name"]][main._risk_map_key(date, region, step, incident)] = body
+
+    alerts = {incident["name"]: {} for incident in incidents}
+    for region in SNAPSHOT_CONFIG["regions"]:
+        for incident, result in zip(incidents, main._compute_alerts_many(region, incidents, generated_at)):
+            alerts[incident["name"]][region] = json.dumps(result, separators=(",", ":")).encode()
+
+    forecasts = main._latest_predictions(incidents)
+    built_at = time.monotonic()
+    return {
+        incident["name"]: Snapshot(
+            generated_at    = generated_at,
+            built_at        = built_at,
+            dataset_version = data_version,
+            model_version   = model_version,
+            incident        = incident["name"],
+            risk_maps       = MappingProxyType(risk_maps[incident["name"]]),
+            alerts          = MappingProxyType(alerts[incident["name"]]),
+            forecast        = MappingProxyType(forecast),
+        )
+        for incident, data_version, forecast in zip(incidents, data_versions, forecasts)
+    }
+
+
+def refresh(incidents: list[dict] = None) -> Mapping[str, Snapshot]:
+    """Rebuild the given incidents (default: all tracked) and swap them in; others are kept."""
+    global _snapshots
+    t0 = time.perf_counter()
+    try:
+        built = build(incidents)
+    except Exception:
+        SNAPSHOT_BUILD.observe(time.perf_counter() - t0, "error")
+        raise
+    SNAPSHOT_BUILD.observe(time.perf_counter() - t0, "ok")
+    tracked = {incident["name"] for incident in get_tracked_incidents()}
+    _snapshots = MappingProxyType({
+        **{name: snap for name, snap in _snapshots.items() if name in tracked},
+        **built,
+    })
+    _write_shared(_snapshots)
+    logger.info(f"Snapshots refreshed in {time.perf_counter() - t0:.2f}s — {len(built)} incident(s), "
+                f"{sum(len(s.risk_maps) for s in built.values())} risk maps")
+    return _snapshots
+
+
+def _shared_file() -> Optional[Path]:
+    shared_dir = os.getenv("PYROWATCH_SNAPSHOT_DIR")
+    return Path(shared_dir) / "snapshots.pkl" if shared_dir else None
+
+
+def _write_shared(snapshots: Mapping[str, Snapshot]) -> None:
+    path = _shared_file()
+    if path is None:
+        return
+    plain = {name: s._replace(risk_maps=dict(s.risk_maps), alerts=dict(s.alerts), forecast=dict(s.forecast))
+             for name, s in snapshots.items()}
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(pickle.dumps(plain, protocol=pickle.HIGHEST_PROTOCOL))
+    os.replace(tmp, path)
+
+
+def load_shared() -> bool:
+    """Swap in the leader's latest snapshots if they changed since the last load."""
+    global _snapshots, _seen
+    path = _shared_file()
+    try:
+        st = path.stat() if path else None
+    except FileNotFoundError:
+        return False
+    if st is None or (st.st_ino, st.st_mtime_ns) == _seen:
+        return False
+    plain = pickle.loads(path.read_bytes())
+    _snapshots = MappingProxyType({
+        name: s._replace(risk_maps=MappingProxyType(s.risk_maps), alerts=MappingProxyType(s.alerts),
+                         forecast=MappingProxyType(s.forecast))
+        for name, s in plain.items()
+    })
+    _seen = (st.st_ino, st.st_mtime_ns)
+    return True
+
+
+def _stale_incidents() -> list[dict]:
+    stale = []
+    for incident in get_tracked_incidents():
+        snap = _snapshots.get(incident["name"])
+        if (snap is None or time.monotonic() - snap.built_at >= SNAPSHOT_CONFIG["interval_s"]
+                or current(incident) is None):
+            stale.append(incident)
+    return stale
+
+
+def request_refresh() -> None:
+    # Safe from any thread, e.g. after new data lands.
+    if _wakeup is not None:
+        _wakeup[0].call_soon_threadsafe(_wakeup[1].set)
+
+
+async def _run() -> None:
+    global _wakeup
+    from api import alert_stream
+    loop   = asyncio.get_running_loop()
+    event  = asyncio.Event()
+    _wakeup = (loop, event)
+    leader = is_leader_worker()
+    published = {}
+    while True:
+        try:
+            if leader:
+                stale = await asyncio.to_thread(_stale_incidents)
+                if stale:
+                    await asyncio.to_thread(refresh, stale)
+            else:
+                await asyncio.to_thread(load_shared)
+        except Exception as e:
+            logger.warning(f"Snapshot refresh failed, serving on demand: {e}")
+        # Also covers snapshots built before the fork, which this loop didn't build itself.
+        for name, snap in _snapshots.items():
+            if published.get(name) is not snap:
+                alert_stream.publish(snap)
+                published[name] = snap
+        try:
+            await asyncio.wait_for(event.wait(), timeout=SNAPSHOT_CONFIG["poll_s" if leader else "follow_poll_s"])
+        except asyncio.TimeoutError:
+            pass
+        event.clear()
+
+
+def start() -> None:
+    global _task
+    if _task is None or _task.done():
+        _task = asyncio.get_running_loop().create_task(_run())
+
+
+async def stop() -> None:
+    global _task, _wakeup
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+    _task, _wakeup = None, None
@@ -0,0 +1,79 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+
+from api import geo
+
+
+# Checks /risk-map contour mode (api/geo.py) on random grids: every cell centre must fall in
+# exactly one polygon, of that cell's risk level, and every exterior ring must wind
+# counter-clockwise with clockwise holes. Exits non-zero on the first failing grid.
+
+_SCORES = [0.1, 0.4, 0.6, 0.9]  # one per risk level, jittered below the next edge
+
+
+def _inside(x: float, y: float, ring: list) -> bool:
+    inside = False
+    for (x1, y1), (x2, y2) in zip(ring[:-1], ring[1:]):
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+    return inside
+
+
+def check_grid(h: int, w: int, rng: np.random.Generator, step: float = 0.1) -> list[str]:
+    risks = rng.choice(_SCORES, size=h * w, p=[0.4, 0.3, 0.2, 0.1]) + rng.uniform(0, 0.04, h * w)
+    lats  = 38.0 + np.arange(h) * step
+    lons  = -121.0 + np.arange(w) * step
+    grid  = risks.reshape(h, w)
+    feats = geo._contour_features(lats, lons, risks, step)
+
+    problems = []
+    n_cells = sum(f["properties"]["n_cells"] for f in feats)
+    if n_cells != h * w:
+        problems.append(f"n_cells sums to {n_cells}, grid has {h * w}")
+    for f in feats:
+        exterior, *holes = f["geometry"]["coordinates"]
+        if geo._ring_area(exterior) <= 0 or any(geo._ring_area(hole) >= 0 for hole in holes):
+            problems.append(f"{f['properties']['risk_level']} polygon winds the wrong way")
+    for i in range(h):
+        for j in range(w):
+            x, y = lons[j] + step / 2, lats[i] + step / 2
+            hits = [
+                f for f in feats
+                if _inside(x, y, f["geometry"]["coordinates"][0])
+                and not any(_inside(x, y, hole) for hole in f["geometry"]["coordinates"][1:])
+            ]
+            if len(hits) != 1:
+                problems.append(f"cell ({i}, {j}) is in {len(hits)} polygons")
+            elif hits[0]["properties"]["risk_level"] != geo._classify_risk(grid[i, j])[0]:
+                problems.append(f"cell ({i}, {j}) is in a {hits[0]['properties']['risk_level']} polygon, "
+                                f"its level is {geo._classify_risk(grid[i, j])[0]}")
+    return problems
+
+
+def check(trials: int = 200, max_side: int = 13, seed: int = 0) -> list[str]:
+    rng = np.random.default_rng(seed)
+    for trial in range(trials):
+        h, w = (int(n) for n in rng.integers(1, max_side + 1, 2))
+        problems = check_grid(h, w, rng)
+        if problems:
+            return [f"grid {trial} ({h}x{w}, seed {seed}): {p}" for p in problems]
+    return []
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Check contour polygons against the cells they merge")
+    parser.add_argument("--trials", type=int, default=200)
+    parser.add_argument("--max-side", type=int, default=13, help="Largest grid height / width")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    failures = check(args.trials, args.max_side, args.seed)
+    for f in failures:
+        print(f"  ✗ {f}")
+    if not failures:
+        print(f"{args.trials} random grids: every cell in exactly one polygon of its level, rings wound correctly")
+    sys.exit(1 if failures else 0)
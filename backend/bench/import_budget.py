@@ -0,0 +1,94 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import subprocess
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Cumulative import time per module (ms), roughly 2x what a cold import takes on a laptop.
+# A module blowing its budget usually means something heavy moved back to module level.
+IMPORT_BUDGETS_MS = {
+    "utils.config":  30,
+    "utils.logger":  250,
+    "utils.metrics": 30,
+    "ml.inference":  400,
+    "ml.train":      900,
+    "api.main":      1500,
+}
+
+# Modules that must stay deferred until first use.
+FORBIDDEN = {
+    "utils.config": ["dotenv"] if not (BACKEND_DIR.parent / ".env").exists() else [],
+    "utils.logger": ["torch", "sklearn", "pandas"],
+    "ml.inference": ["torch", "sklearn", "joblib"],
+    "ml.train":     ["torch", "sklearn", "joblib"],
+    "api.main":     ["torch", "sklearn", "joblib", "openai"],
+}
+
+_PROBE = (
+    "import sys, json; sys.path.insert(0, {backend!r}); import {module}; "
+    "print(json.dumps(sorted(m for m in {forbidden!r} if m in sys.modules)))"
+)
+
+
+def measure(module: str, runs: int = 3) -> dict:
+    best, loaded, breakdown = None, [], []
+    for _ in range(runs):
+        code = _PROBE.format(backend=str(BACKEND_DIR), module=module, forbidden=FORBIDDEN.get(module, []))
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True, text=True, cwd=BACKEND_DIR, check=True,
+        )
+        rows = []
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, cumulative, name = line.split("|")
+            try:
+                rows.append((int(cumulative), name.strip()))
+            except ValueError:
+                continue  # header row
+        total = next(us for us, name in rows if name == module)
+        if best is None or total < best:
+            best, breakdown = total, rows
+        loaded = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    top = sorted((r for r in breakdown if r[1] != module), reverse=True)[:8]
+    return {"ms": round(best / 1000, 1), "forbidden_loaded": loaded, "top": [(n, round(us / 1000, 1)) for us, n in top]}
+
+
+def check(runs: int = 3, verbose: bool = False) -> list[str]:
+    failures = []
+    print(f"\n{'module':<16}{'import ms':>11}{'budget':>9}  status")
+    print("─" * 48)
+    for module, budget in IMPORT_BUDGETS_MS.items():
+        r = measure(module, runs)
+        problems = []
+        if r["ms"] > budget:
+            problems.append(f"{module}: {r['ms']:.0f} ms > {budget} ms budget")
+        if r["forbidden_loaded"]:
+            problems.append(f"{module}: imports {', '.join(r['forbidden_loaded'])} eagerly")
+        print(f"{module:<16}{r['ms']:>11.1f}{budget:>9}  {'FAIL' if problems else 'ok'}")
+        if problems or verbose:
+            for name, ms in r["top"]:
+                print(f"    {ms:>8.1f} ms  {name}")
+        failures.extend(problems)
+    print()
+    return failures
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Fail if module import times exceed their budget")
+    parser.add_argument("--runs", type=int, default=3, help="Best-of-N cold imports per module")
+    parser.add_argument("--verbose", action="store_true", help="Show the slowest sub-imports for every module")
+    args = parser.parse_args()
+
+    failures = check(args.runs, args.verbose)
+    for f in failures:
+        print(f"  ✗ {f}")
+    sys.exit(1 if failures else 0)
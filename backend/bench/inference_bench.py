@@ -0,0 +1,181 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import gc
+import json
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from utils.config import LSTM_CONFIG
+from utils.logger import logger
+from bench.synthetic import make_dataset, make_checkpoint, install_checkpoint
+
+
+BASELINES_DIR    = Path(__file__).resolve().parent / "baselines"
+DEFAULT_BASELINE = BASELINES_DIR / "inference.json"
+
+GRID_BATCH_SIZES = [1, 16, 256, 1024, 4096]
+GEO_GRID_STEPS   = [0.08, 0.04, 0.02]
+REPLAY_FRAMES    = [48, 240, 720]
+
+
+def _measure(fn, repeats: int, warmup: int = 1) -> dict:
+    for _ in range(warmup):
+        fn()
+
+    # Like timeit: collect once, then keep the collector out of the timed calls.
+    times = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            fn()
+            times.append((time.perf_counter() - t0) * 1000)
+    finally:
+        gc.enable()
+
+    # Separate pass so tracemalloc overhead never lands in the timings.
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times.sort()
+    return {
+        "median_ms":  round(statistics.median(times), 3),
+        "p95_ms":     round(times[min(len(times) - 1, int(len(times) * 0.95))], 3),
+        "min_ms":     round(times[0], 3),
+        "repeats":    repeats,
+        "py_peak_kb": round(peak / 1024, 1),
+    }
+
+
+def run_suite(quick: bool = False) -> dict:
+    from ml.inference import predict_risk, predict_grid, predict_uncertainty
+    from api.geo import build_risk_geojson, build_replay_frames
+    import utils.config as config
+
+    tmp = Path(tempfile.mkdtemp(prefix="pyrowatch_bench_"))
+    seq_len, n_feat = LSTM_CONFIG["sequence_length"], LSTM_CONFIG["n_features"]
+
+    df = make_dataset(n_rows=seq_len + max(REPLAY_FRAMES) + 8)
+    install_checkpoint(make_checkpoint(tmp / "models", df))
+    config.CACHE_DIR = tmp / "cache"
+
+    rng  = np.random.default_rng(0)
+    seqs = df[LSTM_CONFIG["features"]].to_numpy(dtype=np.float32)
+    results = {}
+
+    def bench(name: str, fn, repeats: int):
+        results[name] = _measure(fn, max(1, repeats // 5) if quick else repeats)
+        r = results[name]
+        logger.info(f"  {name:<32} median {r['median_ms']:>10.3f} ms | p95 {r['p95_ms']:>10.3f} ms | "
+                    f"py peak {r['py_peak_kb']:>10.1f} KiB")
+
+    logger.info("═══ PyroWatch inference/geo benchmarks ═══")
+
+    single = seqs[:seq_len].copy()
+    bench("predict_risk", lambda: predict_risk(single), repeats=200)
+
+    for bs in GRID_BATCH_SIZES:
+        batch = rng.standard_normal((bs, seq_len, n_feat)).astype(np.float32)
+        lats  = rng.uniform(39.5, 40.6, bs)
+        lons  = rng.uniform(-121.8, -120.5, bs)
+        bench(f"predict_grid[batch={bs}]", lambda: predict_grid(batch, lats, lons),
+              repeats=max(5, 200 // max(1, bs // 64)))
+
+    # Fixed K so the timing doesn't depend on the latency budget.
+    for bs in (1, 256, 4096):
+        batch = rng.standard_normal((bs, seq_len, n_feat)).astype(np.float32)
+        bench(f"predict_uncertainty[batch={bs},k=32]",
+              lambda: predict_uncertainty(batch, budget_ms=0, k_min=32, k_max=32),
+              repeats=max(5, 100 // max(1, bs // 64)))
+
+    day_df = df.tail(seq_len)
+    for step in GEO_GRID_STEPS:
+        bench(f"build_risk_geojson[step={step}]",
+              lambda: build_risk_geojson(day_df, grid_step=step, seed_key="bench"),
+              repeats=10 if step >= 0.04 else 3)
+
+    for n in REPLAY_FRAMES:
+        bench(f"build_replay_frames[n={n}]", lambda: build_replay_frames(df, n_frames=n),
+              repeats=5 if n <= 48 else 2)
+
+    from utils.cache import Cache
+    cache = Cache("bench", ttl_hours=1)
+    payload = {"report": "x" * 600, "risk_score": 0.75}
+    cache.set("bench_key", payload)
+    counter = iter(range(10**9))
+    bench("Cache.get[hit]",  lambda: cache.get("bench_key"), repeats=500)
+    bench("Cache.get[miss]", lambda: cache.get("missing_key"), repeats=500)
+    bench("Cache.set",       lambda: cache.set(f"k{next(counter)}", payload), repeats=500)
+
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "machine": {
+            "python":    platform.python_version(),
+            "platform":  platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, time_threshold: float, mem_threshold: float) -> list[str]:
+    regressions = []
+    for name, base in baseline["results"].items():
+        cur = current["results"].get(name)
+        if cur is None:
+            continue
+        if cur["median_ms"] > base["median_ms"] * (1 + time_threshold):
+            regressions.append(
+                f"{name}: median {cur['median_ms']:.3f} ms vs baseline {base['median_ms']:.3f} ms "
+                f"(+{cur['median_ms'] / base['median_ms'] - 1:.0%})"
+            )
+        if base["py_peak_kb"] > 0 and cur["py_peak_kb"] > base["py_peak_kb"] * (1 + mem_threshold):
+            regressions.append(
+                f"{name}: py peak {cur['py_peak_kb']:.1f} KiB vs baseline {base['py_peak_kb']:.1f} KiB "
+                f"(+{cur['py_peak_kb'] / base['py_peak_kb'] - 1:.0%})"
+            )
+    return regressions
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark inference, GeoJSON building and the cache")
+    parser.add_argument("--save", nargs="?", const=str(DEFAULT_BASELINE), default=None,
+                        help="Write results as a JSON baseline")
+    parser.add_argument("--compare", nargs="?", const=str(DEFAULT_BASELINE), default=None,
+                        help="Fail if results regress against this baseline")
+    parser.add_argument("--time-threshold", type=float, default=0.20, help="Allowed median latency increase")
+    parser.add_argument("--mem-threshold", type=float, default=0.20, help="Allowed peak memory increase")
+    parser.add_argument("--quick", action="store_true", help="Fewer repeats (smoke run)")
+    args = parser.parse_args()
+
+    current = run_suite(quick=args.quick)
+
+    if args.save:
+        path = Path(args.save)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(current, indent=2))
+        logger.info(f"Baseline saved: {path}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare(current, baseline, args.time_threshold, args.mem_threshold)
+        if regressions:
+            logger.error(f"{len(regressions)} regression(s) vs {args.compare}:")
+            for r in regressions:
+                logger.error(f"  ✗ {r}")
+            sys.exit(1)
+        logger.info(f"✅ No regressions vs {args.compare}")
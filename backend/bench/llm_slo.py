@@ -0,0 +1,226 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import json
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+
+
+# Situation-report latency against the mock Featherless upstream in healthy, slow, hanging
+# and failing modes. Each scenario sends distinct (uncached) report requests and records how
+# long the caller waited and whether it got the LLM report or the template. With --http the
+# requests go through POST /situation-report on a served app instead, and /health is probed
+# meanwhile: a report call that blocked the event loop shows up as /health latency.
+
+SCENARIOS = {
+    "healthy": {"latency_ms": 200,  "jitter_ms": 50},
+    "slow":    {"latency_ms": 6000, "jitter_ms": 500},
+    "hanging": {"latency_ms": 200,  "jitter_ms": 50, "hang_rate": 0.3},
+    "failing": {"latency_ms": 50,   "jitter_ms": 10, "error_rate": 1.0},
+}
+
+
+_MOCK_REPORT = "Mock situation report"  # how bench/mock_upstreams.py's completions start
+
+
+def _risk_data(i: int) -> dict:
+    return {
+        "region": "CA", "county": f"County {i}", "risk_score": 0.62 + (i % 7) * 0.05,
+        "risk_level": "high", "alert_tier": "warning", "wind_speed": 12.0, "wind_direction": 45.0,
+        "temperature": 38.0, "humidity": 12.0, "fire_pixels": 180, "forecast_hours": 6,
+    }
+
+
+def run_scenario(name: str, mock_url: str, requests: int, concurrency: int) -> dict:
+    import httpx
+    import api.featherless as featherless
+    from utils.circuit_breaker import CircuitBreaker
+    from utils.config import LLM_SLO_CONFIG
+
+    httpx.post(f"{mock_url}/admin/config", json=SCENARIOS[name]).raise_for_status()
+    calls_before = httpx.get(f"{mock_url}/admin/config").json()["calls"]["llm"]
+    featherless._cache.clear()
+    featherless._client  = None
+    featherless._breaker = CircuitBreaker("featherless", LLM_SLO_CONFIG["breaker_failures"],
+                                          LLM_SLO_CONFIG["breaker_cooldown_s"])
+
+    def one(i: int) -> tuple[float, bool]:
+        d  = _risk_data(i)
+        t0 = time.perf_counter()
+        report = featherless.generate_situation_report(d)
+        return (time.perf_counter() - t0) * 1000, report == featherless._template_report(d)
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(one, range(requests)))
+    lat = np.array([ms for ms, _ in results])
+    # Let attempts that outlived the deadline finish, so they don't land in the next scenario.
+    drain_until = time.monotonic() + 2 * LLM_SLO_CONFIG["request_timeout_s"]
+    while featherless._inflight and time.monotonic() < drain_until:
+        time.sleep(0.1)
+    cached = sum(1 for i in range(requests) if featherless.cached_report(_risk_data(i)))
+    calls_after = httpx.get(f"{mock_url}/admin/config").json()["calls"]["llm"]
+    return {
+        "requests":     requests,
+        "llm_reports":  sum(1 for _, template in results if not template),
+        "templates":    sum(1 for _, template in results if template),
+        "p50_ms":       round(float(np.percentile(lat, 50)), 1),
+        "p95_ms":       round(float(np.percentile(lat, 95)), 1),
+        "max_ms":       round(float(lat.max()), 1),
+        "cached_after": cached,
+        "upstream_calls": calls_after - calls_before,
+        "breaker":      featherless._breaker.state,
+    }
+
+
+async def _drive_http(app_url: str, inputs: list[dict], concurrency: int) -> tuple[list, list]:
+    import httpx
+
+    results, probes = [], []
+    gate, done = asyncio.Semaphore(concurrency), asyncio.Event()
+
+    async def one(client, d: dict) -> None:
+        async with gate:
+            t0 = time.perf_counter()
+            resp = await client.post("/situation-report", json=d)
+            ms = (time.perf_counter() - t0) * 1000
+        results.append((ms, resp.status_code != 200 or not resp.json()["report"].startswith(_MOCK_REPORT)))
+
+    async def probe(client) -> None:
+        while not done.is_set():
+            t0 = time.perf_counter()
+            await client.get("/health")
+            probes.append((time.perf_counter() - t0) * 1000)
+            await asyncio.sleep(0.05)
+
+    async with httpx.AsyncClient(base_url=app_url, timeout=120.0) as client:
+        prober = asyncio.create_task(probe(client))
+        await asyncio.gather(*(one(client, d) for d in inputs))
+        done.set()
+        await prober
+    return results, probes
+
+
+def run_http_scenario(name: str, mock_url: str, app_url: str, requests: int, concurrency: int, offset: int) -> dict:
+    import httpx
+
+    httpx.post(f"{mock_url}/admin/config", json=SCENARIOS[name]).raise_for_status()
+    calls_before = httpx.get(f"{mock_url}/admin/config").json()["calls"]["llm"]
+    # The app's cache and breaker live on across scenarios; distinct counties keep each one uncached.
+    results, probes = asyncio.run(_drive_http(app_url, [_risk_data(offset + i) for i in range(requests)], concurrency))
+    lat, health = np.array([ms for ms, _ in results]), np.array(probes or [0.0])
+    calls_after = httpx.get(f"{mock_url}/admin/config").json()["calls"]["llm"]
+    return {
+        "requests":       requests,
+        "llm_reports":    sum(1 for _, template in results if not template),
+        "templates":      sum(1 for _, template in results if template),
+        "p50_ms":         round(float(np.percentile(lat, 50)), 1),
+        "p95_ms":         round(float(np.percentile(lat, 95)), 1),
+        "max_ms":         round(float(lat.max()), 1),
+        "health_p99_ms":  round(float(np.percentile(health, 99)), 1),
+        "health_max_ms":  round(float(health.max()), 1),
+        "upstream_calls": calls_after - calls_before,
+    }
+
+
+def run(requests: int = 20, concurrency: int = 4, scenarios: list[str] = None, http: bool = False) -> dict:
+    from bench.loadtest import _free_port, _serve_mock, _wait_ready
+
+    port = _free_port()
+    mock_url = f"http://127.0.0.1:{port}"
+    # featherless binds these at import; point it at the mock and keep its cache out of the real one.
+    import utils.config as config
+    config.CACHE_DIR = Path(tempfile.mkdtemp(prefix="pyrowatch_llm_slo_"))
+    import api.featherless as featherless
+    featherless.FEATHERLESS_API_KEY  = "bench"
+    featherless.FEATHERLESS_BASE_URL = f"{mock_url}/v1"
+
+    mock = get_context("spawn").Process(target=_serve_mock, args=(port, 200, 50, 0.0), daemon=True)
+    mock.start()
+    try:
+        asyncio.run(_wait_ready(f"{mock_url}/health"))
+        if http:
+            return _run_http(mock_url, requests, concurrency, scenarios or list(SCENARIOS))
+        return {name: run_scenario(name, mock_url, requests, concurrency) for name in (scenarios or SCENARIOS)}
+    finally:
+        # uvicorn's graceful shutdown waits on the connections the hang mode never answers.
+        mock.terminate()
+        mock.join(5)
+        if mock.is_alive():
+            mock.kill()
+
+
+def _run_http(mock_url: str, requests: int, concurrency: int, scenarios: list[str]) -> dict:
+    from bench.loadtest import _free_port, _serve_app, _wait_ready
+
+    ctx = get_context("spawn")
+    port, stop = _free_port(), ctx.Event()
+    app_url = f"http://127.0.0.1:{port}"
+    workdir = tempfile.mkdtemp(prefix="pyrowatch_llm_slo_http_")
+    app = ctx.Process(target=_serve_app, args=(port, mock_url, workdir, stop, 0.01), daemon=True)
+    app.start()
+    try:
+        asyncio.run(_wait_ready(f"{app_url}/health"))
+        return {name: run_http_scenario(name, mock_url, app_url, requests, concurrency, i * requests)
+                for i, name in enumerate(scenarios)}
+    finally:
+        stop.set()
+        app.join(15)
+        if app.is_alive():
+            app.kill()
+
+
+def print_report(report: dict) -> None:
+    if any("health_p99_ms" in r for r in report.values()):
+        print(f"\n{'scenario':<10}{'reqs':>6}{'llm':>6}{'tmpl':>6}{'p50':>9}{'p95':>9}{'max':>9}"
+              f"{'/health p99':>13}{'max':>9}{'calls':>7}")
+        print("─" * 84)
+        for name, r in report.items():
+            print(f"{name:<10}{r['requests']:>6}{r['llm_reports']:>6}{r['templates']:>6}{r['p50_ms']:>9.1f}"
+                  f"{r['p95_ms']:>9.1f}{r['max_ms']:>9.1f}{r['health_p99_ms']:>13.1f}{r['health_max_ms']:>9.1f}"
+                  f"{r['upstream_calls']:>7}")
+        print("─" * 84)
+        print("/health: probed every 50 ms during the scenario; stays low unless report calls block the loop\n")
+        return
+    print(f"\n{'scenario':<10}{'reqs':>6}{'llm':>6}{'tmpl':>6}{'p50':>9}{'p95':>9}{'max':>9}{'cached':>8}{'calls':>7}  breaker")
+    print("─" * 84)
+    for name, r in report.items():
+        print(f"{name:<10}{r['requests']:>6}{r['llm_reports']:>6}{r['templates']:>6}{r['p50_ms']:>9.1f}"
+              f"{r['p95_ms']:>9.1f}{r['max_ms']:>9.1f}{r['cached_after']:>8}{r['upstream_calls']:>7}  {r['breaker']}")
+    print("─" * 84)
+    print("calls: upstream requests that got past the mock's injected latency and errors\n")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Situation report latency against a slow or failing mock LLM")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="Repeatable; default all")
+    parser.add_argument("--deadline-s", type=float, default=None)
+    parser.add_argument("--timeout-s", type=float, default=5.0, help="Per-attempt upstream timeout")
+    parser.add_argument("--hedge-after-s", type=float, default=None)
+    parser.add_argument("--no-slo", action="store_true", help="Legacy blocking calls, for comparison")
+    parser.add_argument("--http", action="store_true",
+                        help="Go through POST /situation-report on a served app, probing /health meanwhile")
+    parser.add_argument("--out", type=Path, default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    # Through the environment, so the served app's process (--http) reads the same settings.
+    os.environ["PYROWATCH_LLM_SLO"]       = "0" if args.no_slo else "1"
+    os.environ["PYROWATCH_LLM_TIMEOUT_S"] = str(args.timeout_s)
+    if args.deadline_s is not None:
+        os.environ["PYROWATCH_LLM_DEADLINE_S"] = str(args.deadline_s)
+    if args.hedge_after_s is not None:
+        os.environ["PYROWATCH_LLM_HEDGE_AFTER_S"] = str(args.hedge_after_s)
+
+    report = run(args.requests, args.concurrency, args.scenario, http=args.http)
+    print_report(report)
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2))
@@ -0,0 +1,249 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import json
+import random
+import socket
+import tempfile
+import time
+from collections import defaultdict
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+
+
+# Weighted request mix — roughly what the dashboard and alerts pages generate.
+DEFAULT_MIX = {
+    "/risk-map":         3,
+    "/alerts":           3,
+    "/forecast":         3,
+    "/replay":           1,
+    "/situation-report": 1,
+}
+
+_DATES = [f"2021-07-{d}" for d in range(13, 21)]
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _serve_mock(port: int, latency_ms: float, jitter_ms: float, error_rate: float, hang_rate: float = 0.0) -> None:
+    from bench.mock_upstreams import serve, UpstreamConfig
+    serve(port, UpstreamConfig(latency_ms=latency_ms, jitter_ms=jitter_ms, error_rate=error_rate, hang_rate=hang_rate))
+
+
+def _serve_app(port: int, mock_url: str, workdir: str, stop_event, lag_interval: float) -> None:
+    # Upstream URLs and keys must be in the environment before utils.config is imported.
+    os.environ["FEATHERLESS_BASE_URL"] = f"{mock_url}/v1"
+    os.environ["FEATHERLESS_API_KEY"]  = "loadtest"
+    os.environ["FIRMS_BASE_URL"]       = f"{mock_url}/api/area/csv"
+    os.environ["NASA_FIRMS_API_KEY"]   = "loadtest"
+
+    import uvicorn
+    import utils.config as config
+    from bench.synthetic import make_dataset, make_checkpoint, install_checkpoint
+
+    work = Path(workdir)
+    config.CACHE_DIR = work / "cache"
+    install_checkpoint(make_checkpoint(work / "models"))
+
+    import api.main as main
+    main._dataset = make_dataset(n_rows=1000)
+
+    lags = []
+
+    async def lag_monitor():
+        loop = asyncio.get_running_loop()
+        while True:
+            t0 = loop.time()
+            await asyncio.sleep(lag_interval)
+            lags.append((loop.time() - t0 - lag_interval) * 1000)
+
+    async def run():
+        server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+
+        async def watch_stop():
+            while not stop_event.is_set():
+                await asyncio.sleep(0.1)
+            server.should_exit = True
+
+        monitor = asyncio.create_task(lag_monitor())
+        watcher = asyncio.create_task(watch_stop())
+        await server.serve()
+        monitor.cancel()
+        watcher.cancel()
+
+    asyncio.run(run())
+    (work / "loop_lag.json").write_text(json.dumps(lags))
+
+
+async def _wait_ready(url: str, timeout: float = 60.0) -> None:
+    import httpx
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(url, timeout=1.0)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise TimeoutError(f"{url} not ready after {timeout:.0f}s")
+
+
+def _build_request(endpoint: str, rng: random.Random) -> tuple[str, str, dict]:
+    if endpoint == "/risk-map":
+        return "GET", endpoint, {"params": {"date": rng.choice(_DATES), "grid_step": rng.choice([0.08, 0.08, 0.04])}}
+    if endpoint == "/forecast":
+        return "GET", endpoint, {"params": {"lat": round(rng.uniform(39.5, 40.6), 2), "lon": round(rng.uniform(-121.8, -120.5), 2)}}
+    if endpoint == "/replay":
+        return "GET", endpoint, {"params": {"fire_id": "dixie_2021", "n_frames": rng.choice([48, 48, 96])}}
+    if endpoint == "/situation-report":
+        risk = round(rng.uniform(0.3, 0.95), 4)
+        return "POST", endpoint, {"json": {
+            "risk_score": risk,
+            "alert_tier": "emergency" if risk >= 0.75 else "warning" if risk >= 0.6 else "watch",
+            "wind_speed": round(rng.uniform(2, 20), 1),
+            "humidity":   round(rng.uniform(5, 40), 1),
+        }}
+    return "GET", endpoint, {"params": {"region": "CA"}}
+
+
+async def drive(base_url: str, users: int, duration: float, mix: dict, seed: int = 0) -> list[tuple]:
+    import httpx
+
+    samples = []
+    endpoints, weights = zip(*mix.items())
+    deadline = time.monotonic() + duration
+
+    async def user(uid: int, client):
+        rng = random.Random(seed * 1000 + uid)
+        while time.monotonic() < deadline:
+            endpoint = rng.choices(endpoints, weights)[0]
+            method, path, kwargs = _build_request(endpoint, rng)
+            t0 = time.perf_counter()
+            try:
+                resp = await client.request(method, path, **kwargs)
+                status = resp.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            samples.append((endpoint, status, (time.perf_counter() - t0) * 1000))
+
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=limits) as client:
+        await asyncio.gather(*(user(i, client) for i in range(users)))
+    return samples
+
+
+def summarize(samples: list[tuple], duration: float, lags: list[float]) -> dict:
+    by_endpoint = defaultdict(list)
+    for endpoint, status, ms in samples:
+        by_endpoint[endpoint].append((status, ms))
+
+    endpoints = {}
+    for endpoint, rows in sorted(by_endpoint.items()):
+        lat    = np.array([ms for _, ms in rows])
+        errors = sum(1 for status, _ in rows if not (isinstance(status, int) and status < 400))
+        endpoints[endpoint] = {
+            "requests":   len(rows),
+            "rps":        round(len(rows) / duration, 2),
+            "error_rate": round(errors / len(rows), 4),
+            "p50_ms":     round(float(np.percentile(lat, 50)), 2),
+            "p90_ms":     round(float(np.percentile(lat, 90)), 2),
+            "p99_ms":     round(float(np.percentile(lat, 99)), 2),
+            "max_ms":     round(float(lat.max()), 2),
+        }
+
+    lag = np.array(lags) if lags else np.zeros(1)
+    return {
+        "duration_s":     duration,
+        "total_requests": len(samples),
+        "total_rps":      round(len(samples) / duration, 2),
+        "endpoints":      endpoints,
+        "event_loop_lag": {
+            "p50_ms": round(float(np.percentile(lag, 50)), 2),
+            "p99_ms": round(float(np.percentile(lag, 99)), 2),
+            "max_ms": round(float(lag.max()), 2),
+        },
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"\n{'endpoint':<20}{'reqs':>7}{'rps':>8}{'err%':>7}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}  (ms)")
+    print("─" * 80)
+    for endpoint, r in report["endpoints"].items():
+        print(f"{endpoint:<20}{r['requests']:>7}{r['rps']:>8.1f}{r['error_rate'] * 100:>6.1f}%"
+              f"{r['p50_ms']:>9.1f}{r['p90_ms']:>9.1f}{r['p99_ms']:>9.1f}{r['max_ms']:>9.1f}")
+    print("─" * 80)
+    lag = report["event_loop_lag"]
+    print(f"total: {report['total_requests']} requests, {report['total_rps']:.1f} req/s")
+    print(f"event-loop lag: p50 {lag['p50_ms']:.1f} ms | p99 {lag['p99_ms']:.1f} ms | max {lag['max_ms']:.1f} ms\n")
+
+
+def run(
+    users:       int   = 16,
+    duration:    float = 30.0,
+    latency_ms:  float = 50.0,
+    jitter_ms:   float = 10.0,
+    error_rate:  float = 0.0,
+    hang_rate:   float = 0.0,
+    mix:         dict  = None,
+    seed:        int   = 0,
+) -> dict:
+    ctx = get_context("spawn")
+    workdir = tempfile.mkdtemp(prefix="pyrowatch_load_")
+    mock_port, app_port = _free_port(), _free_port()
+    mock_url, app_url = f"http://127.0.0.1:{mock_port}", f"http://127.0.0.1:{app_port}"
+
+    stop = ctx.Event()
+    mock = ctx.Process(target=_serve_mock, args=(mock_port, latency_ms, jitter_ms, error_rate, hang_rate), daemon=True)
+    app  = ctx.Process(target=_serve_app, args=(app_port, mock_url, workdir, stop, 0.01), daemon=True)
+    mock.start()
+    app.start()
+    try:
+        asyncio.run(_wait_ready(f"{mock_url}/health"))
+        asyncio.run(_wait_ready(f"{app_url}/health"))
+        # One request per endpoint so lazy model/dataset loading stays out of the numbers.
+        for endpoint in (mix or DEFAULT_MIX):
+            asyncio.run(drive(app_url, users=1, duration=0.01, mix={endpoint: 1}, seed=seed))
+
+        samples = asyncio.run(drive(app_url, users, duration, mix or DEFAULT_MIX, seed))
+    finally:
+        stop.set()
+        app.join(timeout=15)
+        mock.terminate()
+
+    lag_path = Path(workdir) / "loop_lag.json"
+    lags = json.loads(lag_path.read_text()) if lag_path.exists() else []
+    return summarize(samples, duration, lags)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Load-test the PyroWatch API against local mock upstreams")
+    parser.add_argument("--users", type=int, default=16, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of measured load")
+    parser.add_argument("--upstream-latency-ms", type=float, default=50.0)
+    parser.add_argument("--upstream-jitter-ms", type=float, default=10.0)
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0)
+    parser.add_argument("--upstream-hang-rate", type=float, default=0.0)
+    parser.add_argument("--mix", type=json.loads, default=None,
+                        help='Endpoint weights as JSON, e.g. \'{"/risk-map": 5, "/alerts": 1}\'')
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    report = run(
+        users=args.users, duration=args.duration,
+        latency_ms=args.upstream_latency_ms, jitter_ms=args.upstream_jitter_ms,
+        error_rate=args.upstream_error_rate, hang_rate=args.upstream_hang_rate, mix=args.mix, seed=args.seed,
+    )
+    print_report(report)
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2))
@@ -0,0 +1,95 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from utils.logger import logger, configure_logging, shutdown_logging
+
+
+# Log calls one request makes on the hot path today: a cache lookup on each of the two
+# cache layers, the GeoJSON build summary and the replay summary.
+def _request_logs(i: int) -> None:
+    key = f"report_{i % 7:04d}_0.75_warning"
+    logger.debug(f"Cache HIT: {key[:60]}")
+    logger.debug(f"Cache SET: {key[:60]}")
+    logger.debug(f"Built GeoJSON: {238} grid cells, step=0.08°, bbox=39.5–40.6N")
+    logger.info(f"Replay ready: {48} frames, alert fires at frame {i % 48}")
+
+
+CONFIGS = {
+    # What utils.logger did before: DEBUG everywhere, synchronous colorized console + file.
+    "legacy":     dict(level="DEBUG", serialize=False, enqueue=False, rate_limit=None),
+    "queued":     dict(level="DEBUG", serialize=False, enqueue=True,  rate_limit=None),
+    "dev":        dict(level="DEBUG", serialize=False, enqueue=True,
+                       rate_limit={"burst": 20, "window_s": 10.0}),
+    "production": dict(level="INFO",  serialize=True,  enqueue=True,
+                       rate_limit={"burst": 20, "window_s": 10.0}),
+}
+
+
+def _time_requests(n: int) -> list[float]:
+    times = []
+    for i in range(n):
+        t0 = time.perf_counter()
+        _request_logs(i)
+        times.append((time.perf_counter() - t0) * 1e6)
+    return times
+
+
+def run(n_requests: int = 5000) -> dict:
+    tmp = Path(tempfile.mkdtemp(prefix="pyrowatch_logbench_"))
+    results = {}
+
+    logger.remove()
+    baseline = statistics.median(_time_requests(n_requests))
+
+    for name, cfg in CONFIGS.items():
+        console  = tmp / f"{name}.console"
+        log_file = tmp / f"{name}.log"
+        with open(console, "w") as stream:
+            configure_logging(stream=stream, log_file=log_file, **cfg)
+            _time_requests(200)  # warm the handler and writer thread
+
+            t0 = time.perf_counter()
+            times = _time_requests(n_requests)
+            caller_s = time.perf_counter() - t0
+            logger.remove()
+            shutdown_logging()  # wait for the writer threads to drain
+            drained_s = time.perf_counter() - t0
+
+        lines = sum(1 for _ in open(log_file))
+        times.sort()
+        results[name] = {
+            "median_us":       round(times[len(times) // 2] - baseline, 2),
+            "p99_us":          round(times[int(len(times) * 0.99)] - baseline, 2),
+            "caller_total_ms": round(caller_s * 1000, 1),
+            "drained_ms":      round(drained_s * 1000, 1),
+            "lines_written":   lines,
+        }
+
+    configure_logging()
+    return {"requests": n_requests, "no_sink_median_us": round(baseline, 2), "overhead": results}
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Measure per-request logging overhead for each logger setup")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--out", type=Path, default=None, help="Write the results as JSON")
+    args = parser.parse_args()
+
+    report = run(args.requests)
+    print(f"\n{'config':<12}{'median µs':>11}{'p99 µs':>10}{'caller ms':>11}{'drained ms':>12}{'lines':>8}")
+    print("─" * 64)
+    for name, r in report["overhead"].items():
+        print(f"{name:<12}{r['median_us']:>11.1f}{r['p99_us']:>10.1f}{r['caller_total_ms']:>11.1f}"
+              f"{r['drained_ms']:>12.1f}{r['lines_written']:>8}")
+    print(f"\nper-request overhead above a sink-less logger ({report['no_sink_median_us']:.1f} µs), "
+          f"{report['requests']} requests\n")
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2))
@@ -0,0 +1,126 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel
+
+
+# Local stand-ins for NASA FIRMS and the Featherless (OpenAI-compatible) API. Latency and
+# error rate are set at startup and can be changed live through POST /admin/config.
+
+FIRMS_COLUMNS = (
+    "latitude,longitude,bright_ti4,scan,track,acq_date,acq_time,satellite,"
+    "instrument,confidence,version,bright_ti5,frp,daynight"
+)
+
+
+class UpstreamConfig(BaseModel):
+    latency_ms: float = 50.0
+    jitter_ms:  float = 10.0
+    error_rate: float = 0.0
+    hang_rate:  float = 0.0
+
+
+def create_app(config: UpstreamConfig = None, seed: int = 0) -> FastAPI:
+    app = FastAPI(title="PyroWatch mock upstreams")
+    app.state.config = config or UpstreamConfig()
+    app.state.calls  = {"firms": 0, "llm": 0, "errors": 0}
+    rng = random.Random(seed)
+
+    @app.middleware("http")
+    async def inject_faults(request: Request, call_next):
+        path = request.url.path
+        if path.startswith("/admin") or path == "/health":
+            return await call_next(request)
+
+        cfg = app.state.config
+        if cfg.hang_rate and rng.random() < cfg.hang_rate:
+            await asyncio.sleep(3600)
+        delay = max(0.0, rng.gauss(cfg.latency_ms, cfg.jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+        if cfg.error_rate and rng.random() < cfg.error_rate:
+            app.state.calls["errors"] += 1
+            return JSONResponse({"error": "injected upstream failure"}, status_code=503)
+        return await call_next(request)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/admin/config")
+    async def get_config():
+        return {"config": app.state.config.model_dump(), "calls": app.state.calls}
+
+    @app.post("/admin/config")
+    async def set_config(cfg: UpstreamConfig):
+        app.state.config = cfg
+        return {"config": cfg.model_dump()}
+
+    @app.get("/api/area/csv/{map_key}/{source}/{area}/{days}")
+    async def firms_area(map_key: str, source: str, area: str, days: int):
+        app.state.calls["firms"] += 1
+        min_lon, min_lat, max_lon, max_lat = (float(v) for v in area.split(","))
+        today = date.today()
+        rows = [FIRMS_COLUMNS]
+        for i in range(40):
+            lat = rng.uniform(min_lat, max_lat)
+            lon = rng.uniform(min_lon, max_lon)
+            acq = today - timedelta(days=rng.randrange(max(1, days)))
+            rows.append(
+                f"{lat:.5f},{lon:.5f},{rng.uniform(300, 367):.2f},0.39,0.36,{acq.isoformat()},"
+                f"{rng.randrange(2400):04d},N,VIIRS,n,2.0NRT,{rng.uniform(270, 300):.2f},"
+                f"{rng.uniform(1, 60):.2f},D"
+            )
+        return PlainTextResponse("\n".join(rows), media_type="text/csv")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        app.state.calls["llm"] += 1
+        body = await request.json()
+        prompt = body["messages"][-1]["content"]
+        text = (
+            "Mock situation report. Conditions summarised from the request: "
+            + " ".join(prompt.split()[:24])
+            + " Recommended action: follow the issued alert tier."
+        )
+        return {
+            "id":      f"chatcmpl-mock-{app.state.calls['llm']}",
+            "object":  "chat.completion",
+            "created": int(time.time()),
+            "model":   body.get("model", "mock"),
+            "choices": [{
+                "index":         0,
+                "message":       {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": 40, "total_tokens": 0},
+        }
+
+    return app
+
+
+def serve(port: int, config: UpstreamConfig = None) -> None:
+    import uvicorn
+    uvicorn.run(create_app(config), host="127.0.0.1", port=port, log_level="warning")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Mock FIRMS + Featherless upstreams")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    serve(args.port, UpstreamConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, hang_rate=args.hang_rate,
+    ))
@@ -0,0 +1,75 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.config import LSTM_CONFIG, DEMO_FIRE
+
+
+def make_dataset(n_rows: int = 1000, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    ts  = pd.date_range(DEMO_FIRE["start_date"], periods=n_rows, freq="h")
+    hour = ts.hour.to_numpy()
+    wind_dir = rng.uniform(0, 2 * np.pi, n_rows)
+
+    fire_pixels = rng.poisson(20, n_rows).astype(np.float32)
+    humidity    = rng.uniform(5, 60, n_rows).astype(np.float32)
+    df = pd.DataFrame({
+        "timestamp":    ts,
+        "fire_pixels":  fire_pixels,
+        "wind_speed":   rng.gamma(2.0, 3.0, n_rows),
+        "wind_dir_sin": np.sin(wind_dir),
+        "wind_dir_cos": np.cos(wind_dir),
+        "temperature":  rng.normal(32, 5, n_rows),
+        "humidity":     humidity,
+        "ndvi":         rng.uniform(0, 1, n_rows),
+        "ndwi":         rng.uniform(-1, 1, n_rows),
+        "hour_sin":     np.sin(2 * np.pi * hour / 24),
+        "hour_cos":     np.cos(2 * np.pi * hour / 24),
+    })
+    df["risk_score"] = np.clip(fire_pixels / 40 + (1 - humidity / 100) * 0.3 + rng.normal(0, 0.05, n_rows), 0, 1)
+    for col in LSTM_CONFIG["features"] + ["risk_score"]:
+        df[col] = df[col].astype(np.float32)
+    return df
+
+
+def make_checkpoint(out_dir: Path, df: pd.DataFrame = None, seed: int = 0) -> Path:
+    # An untrained PyroWatchLSTM plus a scaler fitted on the synthetic rows — same file layout
+    # as ml/train.py writes, so ml.inference loads it unchanged.
+    import joblib
+    import torch
+    from sklearn.preprocessing import StandardScaler
+    from ml.model import build_model
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    df = make_dataset(seed=seed) if df is None else df
+
+    torch.manual_seed(seed)
+    model = build_model(LSTM_CONFIG)
+    model.eval()
+    torch.save({
+        "epoch":       0,
+        "model_state": model.state_dict(),
+        "val_loss":    0.0,
+        "val_auc":     0.5,
+        "config":      LSTM_CONFIG,
+    }, out_dir / "pyrowatch_lstm_best.pt")
+
+    scaler = StandardScaler().fit(df[LSTM_CONFIG["features"]].to_numpy(dtype=np.float32))
+    joblib.dump(scaler, out_dir / "scaler.joblib")
+    return out_dir
+
+
+def install_checkpoint(model_dir: Path) -> None:
+    # Point ml.inference at model_dir and drop whatever it had loaded.
+    import ml.inference as inference
+    inference.MODELS_DIR = model_dir
+    inference._model  = None
+    inference._scaler = None
+    inference._model_meta    = None
+    inference._model_version = None
+    inference._model_marker  = None
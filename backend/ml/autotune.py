@@ -0,0 +1,202 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import queue
+import statistics
+import time
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+
+from utils.config import DEMO_FIRE, LSTM_CONFIG, THREAD_CONFIG
+from utils.logger import logger
+from utils.threads import ROLES, cpu_count
+
+
+# Sweeps torch intra-op / inter-op threads (and core pinning with several processes) for the
+# API and the trainer, and writes the fastest settings to THREAD_CONFIG["settings_file"],
+# which utils.threads.apply() reads at startup. Every candidate runs in fresh spawned
+# processes, `processes` of them at once, so contention between workers is part of the
+# measurement and inter-op threads (fixed per process once used) can be varied.
+
+_GRID_CELLS = int(
+    np.ceil((DEMO_FIRE["bbox"]["max_lat"] - DEMO_FIRE["bbox"]["min_lat"]) / 0.08)
+    * np.ceil((DEMO_FIRE["bbox"]["max_lon"] - DEMO_FIRE["bbox"]["min_lon"]) / 0.08)
+)
+
+# (workload, batch size, timed repeats) per role; the batches are what predict_risk,
+# a /risk-map grid at the default step, and a training step see.
+WORKLOADS = {
+    "serve": [("predict_risk", 1, 200), ("predict_grid", _GRID_CELLS, 20)],
+    "train": [("train_step", LSTM_CONFIG["batch_size"], 20)],
+}
+
+
+def candidates(processes: int) -> list[dict]:
+    per_process = max(1, cpu_count() // processes)
+    intra = sorted({1, per_process, *(2 ** i for i in range(per_process.bit_length()) if 2 ** i <= per_process)})
+    inter = [1, 2] if per_process > 1 else [1]
+    pin   = [False, True] if processes > 1 and hasattr(os, "sched_setaffinity") else [False]
+    return [{"intra_op": i, "inter_op": j, "pin_cores": p} for i in intra for j in inter for p in pin]
+
+
+def _step_fn(model, workload: str, batch: int):
+    import torch
+    from torch import nn
+
+    X = torch.randn(batch, LSTM_CONFIG["sequence_length"], LSTM_CONFIG["n_features"])
+    if workload != "train_step":
+        model.eval()
+
+        def infer():
+            with torch.no_grad():
+                model(X)
+        return infer
+
+    model.train()
+    y = torch.rand(batch, 1).round()
+    criterion = nn.BCELoss()
+    optimizer = torch.optim.Adam(model.parameters(), lr=LSTM_CONFIG["learning_rate"])
+
+    def train_step():
+        optimizer.zero_grad()
+        loss = criterion(model(X).reshape(-1, 1), y)
+        loss.backward()
+        nn.utils.clip_grad_norm_(model.parameters(), max_norm=1.0)
+        optimizer.step()
+    return train_step
+
+
+def _run_candidate(role: str, processes: int, rank: int, candidate: dict, quick: bool, barrier, results) -> None:
+    from utils.threads import apply as apply_threads
+    import torch
+    from ml.model import build_model
+
+    logger.disable("utils")
+    apply_threads(role, processes, rank, **candidate)
+    torch.manual_seed(0)
+    model = build_model(LSTM_CONFIG)
+
+    out = {}
+    for workload, batch, repeats in WORKLOADS[role]:
+        step = _step_fn(model, workload, batch)
+        step()
+        barrier.wait()  # all processes time the same workload at the same time
+        times = []
+        for _ in range(max(3, repeats // 5) if quick else repeats):
+            t0 = time.perf_counter()
+            step()
+            times.append((time.perf_counter() - t0) * 1000)
+        out[workload] = times
+    results.put(out)
+
+
+def measure(role: str, processes: int, candidate: dict, quick: bool = False) -> dict:
+    ctx = get_context("spawn")
+    barrier, results = ctx.Barrier(processes), ctx.Queue()
+    procs = [
+        ctx.Process(target=_run_candidate, args=(role, processes, rank, candidate, quick, barrier, results))
+        for rank in range(processes)
+    ]
+    for p in procs:
+        p.start()
+    outs = []
+    while len(outs) < processes:
+        try:
+            outs.append(results.get(timeout=1.0))
+        except queue.Empty:
+            failed = [p.exitcode for p in procs if p.exitcode not in (None, 0)]
+            if failed:
+                for p in procs:
+                    p.terminate()  # the others would wait at the barrier forever
+                raise RuntimeError(f"Autotune process exited with {failed[0]} for {role} {candidate}")
+    for p in procs:
+        p.join()
+
+    row = {"role": role, "processes": processes, **candidate}
+    for workload, _, _ in WORKLOADS[role]:
+        times = sorted(t for out in outs for t in out[workload])
+        row[f"{workload}_median_ms"] = round(statistics.median(times), 3)
+        row[f"{workload}_p95_ms"]    = round(times[min(len(times) - 1, int(len(times) * 0.95))], 3)
+    return row
+
+
+def _best(rows: list[dict], role: str) -> dict:
+    # Serving cares about single-window tail latency and grid time alike, so each is scored
+    # relative to the best candidate's; training about step time.
+    if role == "train":
+        return min(rows, key=lambda r: r["train_step_median_ms"])
+    best_risk = min(r["predict_risk_p95_ms"] for r in rows)
+    best_grid = min(r["predict_grid_median_ms"] for r in rows)
+    return min(rows, key=lambda r: r["predict_risk_p95_ms"] / best_risk + r["predict_grid_median_ms"] / best_grid)
+
+
+def autotune(serve_workers: list[int], train_processes: list[int], quick: bool = False) -> dict:
+    import torch
+
+    settings = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "cpus":         cpu_count(),
+        "torch":        torch.__version__,
+        "serve":        {},
+        "train":        {},
+        "results":      [],
+    }
+    for role, counts in (("serve", serve_workers), ("train", train_processes)):
+        for processes in counts:
+            rows = []
+            for candidate in candidates(processes):
+                row = measure(role, processes, candidate, quick)
+                logger.info(f"  {role} ×{processes} {candidate}: " + ", ".join(
+                    f"{k}={v}" for k, v in row.items() if k.endswith("_ms")))
+                rows.append(row)
+            best = _best(rows, role)
+            settings[role][str(processes)] = {k: best[k] for k in ("intra_op", "inter_op", "pin_cores")}
+            settings["results"].extend(rows)
+    return settings
+
+
+def print_report(settings: dict) -> None:
+    print(f"\n{'role':<7}{'procs':>6}{'intra':>7}{'inter':>7}{'pin':>6}   timings (ms)")
+    print("─" * 92)
+    for r in settings["results"]:
+        chosen = settings[r["role"]][str(r["processes"])]
+        mark = "*" if all(chosen[k] == r[k] for k in chosen) else " "
+        timings = "  ".join(f"{k.removesuffix('_ms')}={v:.2f}" for k, v in r.items() if k.endswith("_ms"))
+        print(f"{r['role']:<7}{r['processes']:>6}{r['intra_op']:>7}{r['inter_op']:>7}{str(r['pin_cores']):>6} {mark} {timings}")
+    print("─" * 92)
+    print("* recommended\n")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Tune torch CPU threads for the API workers and the trainer")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2],
+                        help="API worker counts to tune for (uvicorn --workers / serve.py --workers)")
+    parser.add_argument("--train-processes", type=int, nargs="+", default=[1],
+                        help="Trainer process counts to tune for (1, or the DDP world size)")
+    parser.add_argument("--role", choices=ROLES, default=None, help="Only tune this role")
+    parser.add_argument("--quick", action="store_true", help="Fewer repeats per candidate")
+    parser.add_argument("--out", type=Path, default=THREAD_CONFIG["settings_file"])
+    parser.add_argument("--dry-run", action="store_true", help="Print the recommendation without writing it")
+    args = parser.parse_args()
+
+    settings = autotune(
+        args.workers if args.role in (None, "serve") else [],
+        args.train_processes if args.role in (None, "train") else [],
+        quick=args.quick,
+    )
+    print_report(settings)
+    if not args.dry_run:
+        # Keep the other role's tuned settings when only one is re-tuned.
+        from utils.threads import load_settings
+        previous = load_settings(args.out)
+        if args.role and previous.get("cpus") == settings["cpus"]:
+            settings[next(r for r in ROLES if r != args.role)] = previous.get(next(r for r in ROLES if r != args.role), {})
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(settings, indent=2))
+        logger.info(f"Thread settings written to {args.out} — applied at the next API / trainer start")
@@ -2,9 +2,16 @@ import numpy as np
 import pandas as pd
 import joblib
 from pathlib import Path
+from numpy.lib.stride_tricks import sliding_window_view
 from sklearn.preprocessing import StandardScaler
 
-from utils.config import LSTM_CONFIG, MODELS_DIR
+try:
+    from torch.utils.data import Dataset
+except ImportError:
+    Dataset = object
+
+from utils.config import LSTM_CONFIG
+from utils.model_store import SCALER_FILE, staging_dir
 from utils.logger import logger
 
 
@@ -27,36 +34,51 @@ class FireSequenceDataset:
             raise ValueError("DataFrame missing 'risk_score' target column")
         logger.info(f"Dataset: {len(self.df)} rows, {len(self.features)} features")
 
-    def build_sequences(self) -> tuple[np.ndarray, np.ndarray]:
-        feat_arr   = self.df[self.features].values.astype(np.float32)
-        target_arr = self.df["risk_score"].values.astype(np.float32)
-
-        n = len(feat_arr)
+    def _n_windows(self, n: int) -> int:
         max_i = n - self.seq_len - self.horizon + 1
-
         if max_i <= 0:
             raise ValueError(
                 f"Not enough rows to build sequences. "
                 f"Need > {self.seq_len + self.horizon}, got {n}"
             )
+        return max_i
 
-        X = np.stack([feat_arr[i : i + self.seq_len] for i in range(max_i)])
-        y = np.array([target_arr[i + self.seq_len + self.horizon - 1] for i in range(max_i)])
+    def build_sequences(self, feat_arr: np.ndarray = None) -> tuple[np.ndarray, np.ndarray]:
+        if feat_arr is None:
+            feat_arr = self.df[self.features].to_numpy(dtype=np.float32)
+        target_arr = self.df["risk_score"].to_numpy(dtype=np.float32)
+        self._n_windows(len(feat_arr))
 
+        X, y = window_view(feat_arr, target_arr, self.seq_len, self.horizon)
         logger.info(f"Sequences built: X={X.shape}, y={y.shape}")
         return X, y
 
-    def get_splits(
+    def scaled_features(
         self,
         train_ratio: float = 0.70,
         val_ratio:   float = 0.15,
-    ) -> tuple:
-        X, y = self.build_sequences()
-        n = len(X)
+    ) -> tuple[np.ndarray, int, int]:
+        feat_arr = self.df[self.features].to_numpy(dtype=np.float32)
+        n = self._n_windows(len(feat_arr))
 
         train_end = int(n * train_ratio)
         val_end   = int(n * (train_ratio + val_ratio))
 
+        # Fit on the rows the training windows cover, then scale the base array once;
+        # every split is a window view over the same scaled buffer.
+        self.scaler.fit(feat_arr[: train_end + self.seq_len - 1])
+        scaled = self.scaler.transform(feat_arr).astype(np.float32, copy=False)
+        return scaled, train_end, val_end
+
+    def get_splits(
+        self,
+        train_ratio: float = 0.70,
+        val_ratio:   float = 0.15,
+        save_scaler: bool  = True,
+    ) -> tuple:
+        scaled, train_end, val_end = self.scaled_features(train_ratio, val_ratio)
+        X, y = self.build_sequences(scaled)
+
         X_train, y_train = X[:train_end],       y[:train_end]
         X_val,   y_val   = X[train_end:val_end], y[train_end:val_end]
         X_test,  y_test  = X[val_end:],          y[val_end:]
@@ -66,18 +88,43 @@ class FireSequenceDataset:
             f"train: {len(X_train)}, val: {len(X_val)}, test: {len(X_test)}"
         )
 
-        n_tr, seq, n_feat = X_train.shape
-        self.scaler.fit(X_train.reshape(-1, n_feat))
+        if save_scaler:
+            # Staged; ml.train publishes it with the checkpoint.
+            scaler_path = staging_dir() / SCALER_FILE
+            joblib.dump(self.scaler, scaler_path)
+            logger.info(f"Scaler staged: {scaler_path}")
 
-        X_train = self.scaler.transform(X_train.reshape(-1, n_feat)).reshape(n_tr, seq, n_feat)
-        X_val   = self.scaler.transform(X_val.reshape(-1, n_feat)).reshape(len(X_val), seq, n_feat)
-        X_test  = self.scaler.transform(X_test.reshape(-1, n_feat)).reshape(len(X_test), seq, n_feat)
+        return X_train, y_train, X_val, y_val, X_test, y_test
 
-        scaler_path = MODELS_DIR / "scaler.joblib"
-        joblib.dump(self.scaler, scaler_path)
-        logger.info(f"Scaler saved: {scaler_path}")
 
-        return X_train, y_train, X_val, y_val, X_test, y_test
+def window_view(
+    feat_arr:   np.ndarray,
+    target_arr: np.ndarray,
+    seq_len:    int,
+    horizon:    int,
+) -> tuple[np.ndarray, np.ndarray]:
+    # Strided (n_windows, seq_len, n_feat) view over feat_arr — no per-window copies.
+    max_i = len(feat_arr) - seq_len - horizon + 1
+    X = sliding_window_view(feat_arr, seq_len, axis=0)[:max_i].transpose(0, 2, 1)
+    first = seq_len + horizon - 1
+    return X, target_arr[first : first + max_i]
+
+
+class WindowDataset(Dataset):
+
+    def __init__(self, X: np.ndarray, y: np.ndarray):
+        self.X = X
+        self.y = y
+
+    def __len__(self) -> int:
+        return len(self.y)
+
+    def __getitem__(self, i: int):
+        import torch
+        return (
+            torch.from_numpy(np.array(self.X[i], dtype=np.float32)),
+            torch.tensor([self.y[i]], dtype=torch.float32),
+        )
 
 
 def to_tensors(X, y):
@@ -89,8 +136,5 @@ def to_tensors(X, y):
 
 
 def make_dataloader(X, y, batch_size: int, shuffle: bool = False):
-    import torch
-    from torch.utils.data import TensorDataset, DataLoader
-    Xt, yt = to_tensors(X, y)
-    ds = TensorDataset(Xt, yt)
-    return DataLoader(ds, batch_size=batch_size, shuffle=shuffle)
\ No newline at end of file
+    from torch.utils.data import DataLoader
+    return DataLoader(WindowDataset(X, y), batch_size=batch_size, shuffle=shuffle)
\ No newline at end of file
@@ -0,0 +1,218 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import socket
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from utils.config import LSTM_CONFIG
+from utils.model_store import SCALER_FILE, staging_dir
+from utils.logger import logger
+
+
+def launch(world_size: int, shards_dir: Path = None) -> None:
+    import torch.multiprocessing as mp
+
+    port = _free_port()
+    logger.info(f"Launching DDP training: {world_size} processes, gloo backend, port {port}")
+    mp.spawn(_train_worker, args=(world_size, port, shards_dir), nprocs=world_size, join=True)
+
+
+def _train_worker(rank: int, world_size: int, port: int, shards_dir) -> None:
+    import torch.distributed as dist
+    _init_process(rank, world_size, port)
+    try:
+        if shards_dir is None:
+            _train_in_memory(rank, world_size)
+        else:
+            _train_streaming(rank, world_size, shards_dir)
+    finally:
+        dist.destroy_process_group()
+
+
+def _train_in_memory(rank: int, world_size: int) -> None:
+    from torch.utils.data import DataLoader, DistributedSampler, Subset
+    from utils.dataset_store import load_processed
+    from ml.dataset import FireSequenceDataset, WindowDataset
+    from ml.train import _fit
+
+    df = load_processed(columns=["timestamp", *LSTM_CONFIG["features"], "risk_score"])
+    ds = FireSequenceDataset(df)
+    X_train, y_train, X_val, y_val, X_test, y_test = ds.get_splits(save_scaler=(rank == 0))
+
+    batch_size = LSTM_CONFIG["batch_size"]
+    train_ds = WindowDataset(X_train, y_train)
+    sampler  = DistributedSampler(train_ds, num_replicas=world_size, rank=rank, shuffle=True)
+    train_loader = DataLoader(train_ds, batch_size=batch_size, sampler=sampler)
+
+    # Eval splits are strided without padding so the gathered set is exactly the split.
+    def eval_loader(X, y):
+        wds = WindowDataset(X, y)
+        return DataLoader(Subset(wds, range(rank, len(wds), world_size)), batch_size=batch_size)
+
+    _fit(
+        train_loader, eval_loader(X_val, y_val), eval_loader(X_test, y_test),
+        (y_train > 0.5).mean(), rank=rank, world_size=world_size,
+    )
+
+
+def _train_streaming(rank: int, world_size: int, shards_dir: Path) -> None:
+    import joblib
+    import torch.distributed as dist
+    from utils.dataset_store import load_manifest
+    from ml.streaming import fit_streaming_scaler, make_streaming_loader
+    from ml.train import _fit
+
+    manifest = load_manifest(shards_dir)
+    if not manifest:
+        raise FileNotFoundError(f"No shard manifest in {shards_dir}")
+
+    # Rank 0 fits the scaler; everyone else receives the same object.
+    payload = [fit_streaming_scaler(manifest, shards_dir) if rank == 0 else None]
+    dist.broadcast_object_list(payload, src=0)
+    scaler, fire_ratio = payload[0]
+    if rank == 0:
+        joblib.dump(scaler, staging_dir() / SCALER_FILE)
+
+    batch_size = LSTM_CONFIG["batch_size"]
+    loaders = [
+        make_streaming_loader(
+            manifest, split, scaler, batch_size, shuffle=(split == "train"),
+            shards_dir=shards_dir, rank=rank, world_size=world_size,
+        )
+        for split in ("train", "val", "test")
+    ]
+    _fit(*loaders, fire_ratio, rank=rank, world_size=world_size)
+
+
+def _init_process(rank: int, world_size: int, port: int) -> None:
+    import torch.distributed as dist
+
+    os.environ["MASTER_ADDR"] = "127.0.0.1"
+    os.environ["MASTER_PORT"] = str(port)
+    dist.init_process_group("gloo", rank=rank, world_size=world_size)
+
+    # Split the cores between ranks instead of letting every rank grab all of them.
+    from utils.threads import apply as apply_threads
+    apply_threads("train", processes=world_size, rank=rank)
+    if rank != 0:
+        logger.disable("ml")
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def benchmark(process_counts=(1, 2, 4, 8), n_samples: int = 8192, epochs: int = 2, out: Path = None) -> list[dict]:
+    import torch.multiprocessing as mp
+
+    results = []
+    for world_size in process_counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            result_path = Path(tmp) / "result.json"
+            mp.spawn(
+                _bench_worker,
+                args=(world_size, _free_port(), n_samples, epochs, str(result_path)),
+                nprocs=world_size,
+                join=True,
+            )
+            result = json.loads(result_path.read_text())
+        results.append(result)
+        logger.info(
+            f"  {world_size} proc | {result['samples_per_sec']:>10,.0f} samples/sec | "
+            f"{result['epoch_seconds']:.2f}s/epoch"
+        )
+
+    base = results[0]["samples_per_sec"]
+    for r in results:
+        r["speedup"] = round(r["samples_per_sec"] / base, 2)
+
+    print_benchmark(results)
+    # Numbers from one machine: written only where asked, never next to the model.
+    if out:
+        out.write_text(json.dumps({"cpu_count": os.cpu_count(), "results": results}, indent=2))
+        logger.info(f"Benchmark saved: {out}")
+    return results
+
+
+def print_benchmark(results: list[dict]) -> None:
+    print(f"\n{'procs':>6}{'threads':>9}{'samples/s':>12}{'s/epoch':>10}{'speedup':>9}")
+    print("─" * 46)
+    for r in results:
+        print(f"{r['processes']:>6}{r['threads_per_proc']:>9}{r['samples_per_sec']:>12,.0f}"
+              f"{r['epoch_seconds']:>10.2f}{r['speedup']:>9.2f}")
+    print("─" * 46 + "\n")
+
+
+def _bench_worker(rank, world_size, port, n_samples, epochs, out_path) -> None:
+    import torch
+    import torch.nn as nn
+    import torch.distributed as dist
+    from torch.nn.parallel import DistributedDataParallel
+    from torch.utils.data import DataLoader, DistributedSampler, TensorDataset
+    from ml.model import build_model
+
+    _init_process(rank, world_size, port)
+
+    g  = torch.Generator().manual_seed(0)
+    X  = torch.randn(n_samples, LSTM_CONFIG["sequence_length"], LSTM_CONFIG["n_features"], generator=g)
+    y  = torch.rand(n_samples, 1, generator=g)
+    ds = TensorDataset(X, y)
+    sampler = DistributedSampler(ds, num_replicas=world_size, rank=rank, shuffle=True)
+    loader  = DataLoader(ds, batch_size=LSTM_CONFIG["batch_size"], sampler=sampler)
+
+    model = DistributedDataParallel(build_model(LSTM_CONFIG))
+    optimizer = torch.optim.Adam(model.parameters(), lr=LSTM_CONFIG["learning_rate"])
+    criterion = nn.BCELoss()
+
+    timings = []
+    for epoch in range(epochs + 1):
+        sampler.set_epoch(epoch)
+        dist.barrier()
+        t0 = time.perf_counter()
+        for X_batch, y_batch in loader:
+            optimizer.zero_grad()
+            loss = criterion(model(X_batch), y_batch)
+            loss.backward()
+            optimizer.step()
+        dist.barrier()
+        if epoch > 0:  # epoch 0 is warm-up
+            timings.append(time.perf_counter() - t0)
+
+    if rank == 0:
+        epoch_s = float(np.median(timings))
+        Path(out_path).write_text(json.dumps({
+            "processes":       world_size,
+            "threads_per_proc": torch.get_num_threads(),
+            "samples":         n_samples,
+            "epoch_seconds":   round(epoch_s, 4),
+            "samples_per_sec": round(n_samples / epoch_s, 1),
+        }))
+    dist.destroy_process_group()
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="CPU data-parallel (DDP/gloo) training for PyroWatch LSTM")
+    parser.add_argument("--nproc", type=int, default=os.cpu_count() or 1, help="Number of training processes")
+    parser.add_argument("--shards", nargs="?", const="", default=None,
+                        help="Stream from columnar shards (default dir: data/processed/shards)")
+    parser.add_argument("--benchmark", action="store_true", help="Report samples/sec for 1, 2, 4 and 8 processes")
+    parser.add_argument("--out", type=Path, default=None, help="Also write the benchmark results as JSON")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(out=args.out)
+    else:
+        shards_dir = None
+        if args.shards is not None:
+            from utils.dataset_store import SHARDS_DIR
+            shards_dir = Path(args.shards) if args.shards else SHARDS_DIR
+        launch(args.nproc, shards_dir)
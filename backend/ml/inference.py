@@ -3,57 +3,100 @@ import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 import numpy as np
-import joblib
 import json
+import time
+import hashlib
+import threading
 from pathlib import Path
 
-from utils.config import LSTM_CONFIG, MODELS_DIR, RISK_THRESHOLDS, ALERT_TIERS
+from utils.config import LSTM_CONFIG, MODELS_DIR, RISK_THRESHOLDS, ALERT_TIERS, UNCERTAINTY_CONFIG
 from utils.logger import logger
+from utils.metrics import INFERENCE_CALLS, INFERENCE_BATCH, INFERENCE_LATENCY, LOAD_SECONDS
+from utils.model_store import MODEL_FILE, SCALER_FILE, read_marker
 
 
 _model  = None
 _scaler = None
+_model_meta    = None
+_model_version = None  # hash of the checkpoint + scaler bytes the in-memory model came from
+_model_marker  = None  # utils.model_store marker seen at that load
+_reload_lock   = threading.Lock()
+
+
+def _model_paths() -> list[Path]:
+    return [MODELS_DIR / MODEL_FILE, MODELS_DIR / SCALER_FILE]
 
 
 def _load_model():
-    global _model, _scaler
+    global _model_marker
 
-    if _model is not None:
+    # Trainers publish a new model by swapping the marker after both files are in place.
+    marker = read_marker(MODELS_DIR)
+    if _model is not None and marker == _model_marker:
         return _model, _scaler
 
-    try:
-        import torch
-        from ml.model import build_model
-
-        model_path  = MODELS_DIR / "pyrowatch_lstm_best.pt"
-        scaler_path = MODELS_DIR / "scaler.joblib"
+    with _reload_lock:
+        if _model is not None and marker == _model_marker:
+            return _model, _scaler
+        try:
+            return _read_model(marker)
+        except ImportError:
+            logger.warning("torch not installed — inference unavailable")
+            return None, None
+        except Exception as e:
+            if _model is None:
+                raise
+            # Not retried until the next publish; the old pair is still consistent.
+            _model_marker = marker
+            logger.error(f"Reloading model {marker} failed: {e} — still serving {_model_version}")
+            return _model, _scaler
+
+
+def _read_model(marker):
+    global _model, _scaler, _model_meta, _model_version, _model_marker
+
+    t0 = time.perf_counter()
+    import io
+    import torch
+    import joblib
+    from ml.model import build_model
 
-        if not model_path.exists():
-            raise FileNotFoundError(
-                f"No trained model at {model_path}. Run: python backend/ml/train.py"
-            )
+    model_path, scaler_path = _model_paths()
 
-        checkpoint = torch.load(model_path, map_location="cpu", weights_only=False)
-        model = build_model(checkpoint.get("config", LSTM_CONFIG))
-        model.load_state_dict(checkpoint["model_state"])
-        model.eval()
+    if not model_path.exists():
+        raise FileNotFoundError(
+            f"No trained model at {model_path}. Run: python backend/ml/train.py"
+        )
 
-        scaler = joblib.load(scaler_path)
+    # Read the bytes once, so the version hash describes exactly the weights loaded.
+    model_bytes  = model_path.read_bytes()
+    scaler_bytes = scaler_path.read_bytes()
+    checkpoint = torch.load(io.BytesIO(model_bytes), map_location="cpu", weights_only=False)
+    model = build_model(checkpoint.get("config", LSTM_CONFIG))
+    model.load_state_dict(checkpoint["model_state"])
+    model.eval()
 
-        _model  = model
-        _scaler = scaler
-        logger.info(f"Model loaded — best epoch: {checkpoint.get('epoch')}, val_AUC: {checkpoint.get('val_auc', '?'):.4f}")
-        return _model, _scaler
+    scaler = joblib.load(io.BytesIO(scaler_bytes))
 
-    except ImportError:
-        logger.warning("torch not installed — inference unavailable")
-        return None, None
+    if _model is not None:
+        logger.info(f"Model {marker} published — reloading")
+    _model  = model
+    _scaler = scaler
+    _model_meta    = {k: checkpoint.get(k) for k in ("epoch", "val_auc", "val_loss")}
+    _model_version = hashlib.md5(model_bytes + scaler_bytes).hexdigest()[:12]
+    _model_marker  = marker
+    LOAD_SECONDS.set(time.perf_counter() - t0, "model")
+    logger.info(f"Model loaded — best epoch: {checkpoint.get('epoch')}, val_AUC: {checkpoint.get('val_auc', '?'):.4f}")
+    return _model, _scaler
 
 
 def predict_risk(feature_sequence: np.ndarray) -> dict:
     import torch
 
     model, scaler = _load_model()
+    t0 = time.perf_counter()
+    INFERENCE_CALLS.inc("predict_risk")
+    INFERENCE_BATCH.observe(1, "predict_risk")
 
     if model is None:
         return _fallback_prediction(feature_sequence)
@@ -73,6 +116,7 @@ def predict_risk(feature_sequence: np.ndarray) -> dict:
     with torch.no_grad():
         risk_score = model(x).item()
 
+    INFERENCE_LATENCY.observe(time.perf_counter() - t0, "predict_risk")
     return _format_prediction(risk_score)
 
 
@@ -119,6 +163,9 @@ def predict_grid(
 
     model, scaler = _load_model()
     results = []
+    t0 = time.perf_counter()
+    INFERENCE_CALLS.inc("predict_grid")
+    INFERENCE_BATCH.observe(len(sequences), "predict_grid")
 
     if model is None:
         for lat, lon, seq in zip(lats, lons, sequences):
@@ -132,6 +179,7 @@ def predict_grid(
 
     with torch.no_grad():
         scores = model(X).cpu().numpy().flatten()
+    INFERENCE_LATENCY.observe(time.perf_counter() - t0, "predict_grid")
 
     for lat, lon, score in zip(lats, lons, scores):
         pred = _format_prediction(float(score))
@@ -140,6 +188,139 @@ def predict_grid(
     return results
 
 
+def predict_batch(sequences: np.ndarray, chunk_size: int = 1024) -> dict:
+    """Score (n, seq_len, n_features) windows; returns parallel risk_score/risk_level/alert_tier lists."""
+    return _format_batch(score_batch(sequences, chunk_size, caller="predict_batch"))
+
+
+def score_batch(sequences: np.ndarray, chunk_size: int = 1024, caller: str = "score_batch") -> np.ndarray:
+    """Raw risk scores for (n, seq_len, n_features) windows, chunk_size windows per forward pass."""
+    import torch
+
+    model, scaler = _load_model()
+    t0 = time.perf_counter()
+    INFERENCE_CALLS.inc(caller)
+    INFERENCE_BATCH.observe(len(sequences), caller)
+
+    n, seq_len, n_feat = sequences.shape
+    if model is None:
+        last = sequences[:, -1, :]
+        return np.minimum(1.0, (last[:, 0] / 200) * 0.6 + (1 - last[:, 4] / 100) * 0.4)
+
+    scores = np.empty(n, dtype=np.float32)
+    with torch.no_grad():
+        for lo in range(0, n, chunk_size):
+            chunk  = sequences[lo:lo + chunk_size]
+            scaled = scaler.transform(chunk.reshape(-1, n_feat)).reshape(len(chunk), seq_len, n_feat)
+            scores[lo:lo + len(chunk)] = model(torch.tensor(scaled, dtype=torch.float32)).numpy().ravel()
+
+    INFERENCE_LATENCY.observe(time.perf_counter() - t0, caller)
+    return scores
+
+
+def predict_uncertainty(
+    sequences:  np.ndarray,
+    budget_ms:  float = None,
+    k_min:      int = None,
+    k_max:      int = None,
+    chunk_size: int = 1024,
+) -> dict:
+    """MC dropout risk for (n, seq_len, n_features) windows: mean, std and central interval.
+
+    The LSTM runs once per window and only the dropout head is sampled, K replicas per window
+    in one batch, so cost grows with n rather than n * K. K starts at k_min and grows toward
+    k_max while the measured per-replica cost still fits in budget_ms.
+    """
+    import torch
+
+    cfg       = UNCERTAINTY_CONFIG
+    budget_ms = cfg["budget_ms"] if budget_ms is None else budget_ms
+    k_min     = cfg["k_min"] if k_min is None else k_min
+    k_max     = max(k_min, cfg["k_max"] if k_max is None else k_max)
+
+    model, scaler = _load_model()
+    t0 = time.perf_counter()
+    INFERENCE_CALLS.inc("predict_uncertainty")
+    INFERENCE_BATCH.observe(len(sequences), "predict_uncertainty")
+
+    n, seq_len, n_feat = sequences.shape
+    if model is None:
+        scores = score_batch(sequences, chunk_size)
+        return _uncertainty_result(scores, np.repeat(scores[None], 1, axis=0), 0, t0)
+
+    with torch.no_grad():
+        feats = []
+        for lo in range(0, n, chunk_size):
+            chunk  = sequences[lo:lo + chunk_size]
+            scaled = scaler.transform(chunk.reshape(-1, n_feat)).reshape(len(chunk), seq_len, n_feat)
+            feats.append(model.encode(torch.tensor(scaled, dtype=torch.float32)))
+        feats  = torch.cat(feats)
+        scores = model.head(feats).numpy().ravel()
+
+        t_head  = time.perf_counter()
+        samples = [_sample_head(model, feats, k_min)]
+        per_replica = (time.perf_counter() - t_head) / k_min
+        remaining   = budget_ms / 1000 - (time.perf_counter() - t0)
+        extra = min(k_max - k_min, int(remaining / per_replica)) if per_replica > 0 else k_max - k_min
+        if extra > 0:
+            samples.append(_sample_head(model, feats, extra))
+    samples = torch.cat(samples).numpy()
+
+    INFERENCE_LATENCY.observe(time.perf_counter() - t0, "predict_uncertainty")
+    return _uncertainty_result(scores, samples, len(samples), t0)
+
+
+def _sample_head(model, feats, k: int):
+    import torch
+    rows = max(1, UNCERTAINTY_CONFIG["max_rows"] // k)
+    return torch.cat([model.sample_head(feats[lo:lo + rows], k) for lo in range(0, len(feats), rows)], dim=1)
+
+
+def _uncertainty_result(scores: np.ndarray, samples: np.ndarray, k: int, t0: float) -> dict:
+    tail = (1 - UNCERTAINTY_CONFIG["interval"]) / 2
+    lo, hi = np.quantile(samples, [tail, 1 - tail], axis=0)
+    return {
+        "risk_score": np.asarray(scores, dtype=np.float64),
+        "mean":       samples.mean(axis=0, dtype=np.float64),
+        "std":        samples.std(axis=0, ddof=1, dtype=np.float64) if k > 1 else np.zeros(samples.shape[1]),
+        "lo":         lo.astype(np.float64),
+        "hi":         hi.astype(np.float64),
+        "k":          k,
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000, 2),
+    }
+
+
+def uncertainty_confidence(lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    # From the width of the MC interval: how much the model's own answer moves under dropout.
+    width = np.asarray(hi) - np.asarray(lo)
+    return np.where(width < 0.15, "high", np.where(width < 0.3, "medium", "low")).astype(object)
+
+
+def _format_batch(scores: np.ndarray) -> dict:
+    # Vectorized _format_prediction, laid out column-wise.
+    scores = np.asarray(scores, dtype=np.float64)
+    levels = np.full(len(scores), "low", dtype=object)
+    for level, (low, high) in RISK_THRESHOLDS.items():
+        levels[(scores >= low) & (scores < high)] = level
+    tiers = np.full(len(scores), "none", dtype=object)
+    for tier in ("watch", "warning", "emergency"):
+        tiers[scores >= ALERT_TIERS[tier]] = tier
+    return {
+        "risk_score": np.round(scores, 4).tolist(),
+        "risk_level": levels.tolist(),
+        "alert_tier": tiers.tolist(),
+    }
+
+
+def get_model_version() -> str:
+    """Version of the weights predictions are served from (reloading them if retrained)."""
+    try:
+        model, _ = _load_model()
+    except FileNotFoundError:
+        return "untrained"
+    return _model_version if model is not None else "untrained"
+
+
 def get_model_info() -> dict:
     model_path   = MODELS_DIR / "pyrowatch_lstm_best.pt"
     history_path = MODELS_DIR / "training_history.json"
@@ -148,13 +329,15 @@ def get_model_info() -> dict:
         return {"status": "not_trained", "message": "Run python backend/ml/train.py"}
 
     try:
-        import torch
-        checkpoint = torch.load(model_path, map_location="cpu", weights_only=False)
+        # Shares the inference load: the checkpoint is read once per process, not once per call.
+        model, _ = _load_model()
+        if model is None:
+            return {"status": "error", "message": "torch not installed"}
         info = {
             "status":       "ready",
-            "best_epoch":   checkpoint.get("epoch"),
-            "val_auc":      checkpoint.get("val_auc"),
-            "val_loss":     checkpoint.get("val_loss"),
+            "best_epoch":   _model_meta["epoch"],
+            "val_auc":      _model_meta["val_auc"],
+            "val_loss":     _model_meta["val_loss"],
         }
         if history_path.exists():
             with open(history_path) as f:
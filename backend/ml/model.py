@@ -2,6 +2,7 @@
 
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 
 
 class PyroWatchLSTM(nn.Module):
@@ -36,6 +37,9 @@ class PyroWatchLSTM(nn.Module):
         )
 
     def forward(self, x):
+        return self.head(self.encode(x))
+
+    def encode(self, x):
         batch_size = x.size(0)
 
         h0 = torch.zeros(self.num_layers, batch_size, self.hidden_size, device=x.device)
@@ -43,9 +47,18 @@ class PyroWatchLSTM(nn.Module):
 
         out, _ = self.lstm(x, (h0, c0))
 
-        last = out[:, -1, :]
+        return out[:, -1, :]
+
+    def sample_head(self, last, k: int):
+        """k Monte Carlo dropout passes of the head over encoded windows, as one (k, n) batch.
 
-        return self.head(last)
+        Dropout is applied functionally, so BatchNorm keeps its eval statistics and the module's
+        train/eval flags are never touched (other threads may be predicting with it).
+        """
+        x = last.repeat(k, 1)
+        for layer in self.head:
+            x = F.dropout(x, layer.p, training=True) if isinstance(layer, nn.Dropout) else layer(x)
+        return x.view(k, -1)
 
     def count_parameters(self) -> int:
         return sum(p.numel() for p in self.parameters() if p.requires_grad)
@@ -0,0 +1,53 @@
+import contextlib
+import resource
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Optional
+
+
+class PhaseTimer:
+
+    def __init__(self):
+        self.totals = defaultdict(float)
+
+    @contextlib.contextmanager
+    def __call__(self, phase: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.totals[phase] += time.perf_counter() - t0
+
+    def summary(self) -> dict:
+        return {phase: round(seconds, 4) for phase, seconds in self.totals.items()}
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def parse_epoch_window(spec: Optional[str]) -> Optional[tuple[int, int]]:
+    # "3" -> (3, 3), "3:5" -> (3, 5)
+    if not spec:
+        return None
+    first, _, last = spec.partition(":")
+    return int(first), int(last or first)
+
+
+@contextlib.contextmanager
+def torch_profile(epoch: int, window: Optional[tuple[int, int]], out_dir: Path):
+    if window is None or not (window[0] <= epoch <= window[1]):
+        yield None
+        return
+
+    from torch.profiler import profile, ProfilerActivity
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    path = out_dir / f"train_epoch{epoch:03d}.trace.json"
+    with profile(activities=[ProfilerActivity.CPU], record_shapes=True) as prof:
+        yield path
+    prof.export_chrome_trace(str(path))
@@ -0,0 +1,233 @@
+import numpy as np
+from pathlib import Path
+from typing import Optional
+from numpy.lib.stride_tricks import sliding_window_view
+from sklearn.preprocessing import StandardScaler
+
+try:
+    from torch.utils.data import IterableDataset
+except ImportError:
+    IterableDataset = object
+
+from utils.config import LSTM_CONFIG, STREAMING_CONFIG
+from utils.dataset_store import SHARDS_DIR, read_shard
+from utils.logger import logger
+
+
+SPLITS = ("train", "val", "test")
+
+
+def split_bounds(n_windows: int, train_ratio: float = 0.70, val_ratio: float = 0.15) -> dict:
+    train_end = int(n_windows * train_ratio)
+    val_end   = int(n_windows * (train_ratio + val_ratio))
+    return {
+        "train": (0, train_end),
+        "val":   (train_end, val_end),
+        "test":  (val_end, n_windows),
+    }
+
+
+def _window_span() -> int:
+    return LSTM_CONFIG["sequence_length"] + LSTM_CONFIG["forecast_horizon"] - 1
+
+
+def _n_windows(entries: list[dict]) -> int:
+    return max(0, sum(e["rows"] for e in entries) - _window_span())
+
+
+def _ordered(entries: list[dict]) -> list[dict]:
+    return sorted(entries, key=lambda e: e["part"])
+
+
+def _iter_blocks(entries: list[dict], row_lo: int, row_hi: int, shards_dir: Path):
+    # Yields (first_row, X, y) blocks covering rows [row_lo, row_hi) of one fire. The last
+    # `span` rows of each block are carried into the next, so windows cross shard boundaries
+    # inside a fire but never across fires.
+    span     = _window_span()
+    features = LSTM_CONFIG["features"]
+    tail     = None
+    start    = 0
+
+    for e in _ordered(entries):
+        end = start + e["rows"]
+        if end <= row_lo or start >= row_hi:
+            start = end
+            continue
+
+        df = read_shard(e["path"], columns=features + ["risk_score"], shards_dir=shards_dir)
+        a, b = max(row_lo - start, 0), min(row_hi - start, e["rows"])
+        X = df[features].to_numpy(dtype=np.float32)[a:b]
+        y = df["risk_score"].to_numpy(dtype=np.float32)[a:b]
+        first = start + a
+
+        if tail is not None:
+            first = tail[0]
+            X = np.concatenate([tail[1], X])
+            y = np.concatenate([tail[2], y])
+
+        if len(X) > span:
+            yield first, X, y
+
+        keep = min(span, len(X))
+        tail = (first + len(X) - keep, X[-keep:], y[-keep:])
+        start = end
+
+
+def _stream_pieces(ranges: list[tuple], stream: int, n_streams: int, offset: int = 0) -> list[tuple]:
+    # The `stream`-th of n_streams equal slices of the (key, lo, hi) window ranges laid end to
+    # end, as (key, lo, hi) pieces. `offset` rotates where the slices start; a slice may wrap.
+    total = sum(hi - lo for _, lo, hi in ranges)
+    if total == 0:
+        return []
+    a = offset + stream * total // n_streams
+    b = offset + (stream + 1) * total // n_streams
+    pieces = []
+    for start in (0, total):
+        for key, lo, hi in ranges:
+            n = max(0, hi - lo)
+            s, e = max(a - start, 0), min(b - start, n)
+            if s < e:
+                pieces.append((key, lo + s, lo + e))
+            start += n
+    return pieces
+
+
+def fit_streaming_scaler(manifest: dict, shards_dir: Optional[Path] = None) -> tuple:
+    shards_dir = shards_dir or SHARDS_DIR
+    seq_len = LSTM_CONFIG["sequence_length"]
+    span    = _window_span()
+    scaler  = StandardScaler()
+    n_pos = n_targets = 0
+
+    for fire_id, entries in sorted(manifest.items()):
+        lo, hi = split_bounds(_n_windows(entries))["train"]
+        if hi <= lo:
+            continue
+        # Train windows read rows [0, hi + seq_len - 1) and predict rows [span, span + hi).
+        for first, X, y in _iter_blocks(entries, 0, hi + span, shards_dir):
+            rows = np.arange(first, first + len(X))
+            feat_mask   = rows < hi + seq_len - 1
+            target_mask = (rows >= span) & (rows < span + hi)
+            if feat_mask.any():
+                scaler.partial_fit(X[feat_mask])
+            n_pos     += int((y[target_mask] > 0.5).sum())
+            n_targets += int(target_mask.sum())
+
+    if n_targets == 0:
+        raise ValueError("No training windows in shard manifest")
+
+    logger.info(f"Streaming scaler fitted on {scaler.n_samples_seen_:,} rows across {len(manifest)} fires")
+    return scaler, n_pos / n_targets
+
+
+class ShardWindowDataset(IterableDataset):
+
+    def __init__(
+        self,
+        manifest:    dict,
+        split:       str,
+        scaler:      StandardScaler,
+        shuffle:     bool = False,
+        buffer_size: int = STREAMING_CONFIG["shuffle_buffer"],
+        seed:        int = 0,
+        shards_dir:  Optional[Path] = None,
+        rank:        int = 0,
+        world_size:  int = 1,
+    ):
+        if split not in SPLITS:
+            raise ValueError(f"split must be one of {SPLITS}, got {split!r}")
+        self.manifest    = manifest
+        self.split       = split
+        self.mean        = scaler.mean_.astype(np.float32)
+        self.scale       = scaler.scale_.astype(np.float32)
+        self.shuffle     = shuffle
+        self.buffer_size = buffer_size
+        self.seed        = seed
+        self.epoch       = 0
+        self.shards_dir  = shards_dir or SHARDS_DIR
+        self.rank        = rank
+        self.world_size  = world_size
+
+    def set_epoch(self, epoch: int) -> None:
+        self.epoch = epoch
+
+    def __len__(self) -> int:
+        total = 0
+        for entries in self.manifest.values():
+            lo, hi = split_bounds(_n_windows(entries))[self.split]
+            total += max(0, hi - lo)
+        return total
+
+    def __iter__(self):
+        import torch
+        from torch.utils.data import get_worker_info
+
+        info    = get_worker_info()
+        workers = info.num_workers if info else 1
+        stream  = self.rank * workers + (info.id if info else 0)
+
+        # Every rank and worker gets an equal slice of the split's windows, cut across fires
+        # rather than by whole fires; shuffled epochs rotate where the slices start.
+        ranges = [(f, *split_bounds(_n_windows(self.manifest[f]))[self.split]) for f in sorted(self.manifest)]
+        total  = sum(max(0, hi - lo) for _, lo, hi in ranges)
+        offset = int(np.random.default_rng([self.seed, self.epoch]).integers(total)) if self.shuffle and total else 0
+        pieces = _stream_pieces(ranges, stream, self.world_size * workers, offset)
+
+        rng = np.random.default_rng([self.seed, self.epoch, stream])
+        if self.shuffle:
+            rng.shuffle(pieces)
+
+        seq_len = LSTM_CONFIG["sequence_length"]
+        span    = _window_span()
+        buffer  = []
+
+        for fire_id, lo, hi in pieces:
+            entries = self.manifest[fire_id]
+            for first, X, y in _iter_blocks(entries, lo, hi + span, self.shards_dir):
+                scaled  = (X - self.mean) / self.scale
+                windows = sliding_window_view(scaled, seq_len, axis=0).transpose(0, 2, 1)
+                a = max(lo - first, 0)
+                b = min(hi - first, len(X) - span)
+                order = rng.permutation(np.arange(a, b)) if self.shuffle else range(a, b)
+
+                for j in order:
+                    item = (
+                        torch.from_numpy(np.array(windows[j], dtype=np.float32)),
+                        torch.tensor([y[j + span]], dtype=torch.float32),
+                    )
+                    if not self.shuffle:
+                        yield item
+                    elif len(buffer) < self.buffer_size:
+                        buffer.append(item)
+                    else:
+                        k = rng.integers(len(buffer))
+                        yield buffer[k]
+                        buffer[k] = item
+
+        rng.shuffle(buffer)
+        yield from buffer
+
+
+def make_streaming_loader(
+    manifest:   dict,
+    split:      str,
+    scaler:     StandardScaler,
+    batch_size: int,
+    shuffle:    bool = False,
+    shards_dir: Optional[Path] = None,
+    rank:       int = 0,
+    world_size: int = 1,
+):
+    from torch.utils.data import DataLoader
+
+    ds = ShardWindowDataset(
+        manifest, split, scaler, shuffle=shuffle, shards_dir=shards_dir,
+        rank=rank, world_size=world_size,
+    )
+    workers = STREAMING_CONFIG["num_workers"]
+    return DataLoader(
+        ds,
+        batch_size=batch_size,
+        num_workers=workers,
+        prefetch_factor=STREAMING_CONFIG["prefetch_factor"] if workers > 0 else None,
+    )
@@ -0,0 +1,260 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import copy
+import itertools
+import json
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from multiprocessing import get_context, shared_memory
+from pathlib import Path
+
+import numpy as np
+
+from utils.config import LSTM_CONFIG, MODELS_DIR
+from utils.logger import logger
+
+
+DEFAULT_SPACE = {
+    "hidden_size":   [64, 128, 256],
+    "num_layers":    [1, 2, 3],
+    "dropout":       [0.1, 0.2, 0.3],
+    "learning_rate": [5e-5, 1e-4, 3e-4, 1e-3],
+    "batch_size":    [32, 64, 128],
+}
+
+SWEEPS_DIR = MODELS_DIR / "sweeps"
+
+# Per-worker state, populated once by _attach_shared().
+_shared = {}
+
+
+def grid_trials(space: dict) -> list[dict]:
+    keys = sorted(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+def random_trials(space: dict, n_trials: int, seed: int = 0) -> list[dict]:
+    # Lists are sampled uniformly; [lo, hi] pairs under a "loguniform" key are sampled on a log scale.
+    rng = random.Random(seed)
+    trials = []
+    for _ in range(n_trials):
+        params = {}
+        for key, values in sorted(space.items()):
+            if isinstance(values, dict) and "loguniform" in values:
+                lo, hi = values["loguniform"]
+                params[key] = float(math.exp(rng.uniform(math.log(lo), math.log(hi))))
+            else:
+                params[key] = rng.choice(values)
+        trials.append(params)
+    return trials
+
+
+def run_sweep(
+    trials:      list[dict],
+    workers:     int = 2,
+    epochs:      int = 20,
+    prune_after: int = 3,
+    name:        str = None,
+) -> list[dict]:
+    from utils.dataset_store import load_processed
+    from ml.dataset import FireSequenceDataset
+
+    name    = name or datetime.now().strftime("sweep_%Y%m%d_%H%M%S")
+    out_dir = SWEEPS_DIR / name
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    df = load_processed(columns=["timestamp", *LSTM_CONFIG["features"], "risk_score"])
+    ds = FireSequenceDataset(df)
+    scaled, train_end, val_end = ds.scaled_features()
+    target = ds.df["risk_score"].to_numpy(dtype=np.float32)
+
+    # Windows are views over these two buffers, so placing them in shared memory once is
+    # enough for every trial process to rebuild its splits without copying.
+    blocks = [_to_shared(scaled), _to_shared(target)]
+    spec   = [(b.name, a.shape, a.dtype.str) for b, a in zip(blocks, (scaled, target))]
+
+    ctx     = get_context("spawn")
+    manager = ctx.Manager()
+    reports = manager.dict()
+    lock    = manager.Lock()
+    threads = max(1, (os.cpu_count() or 1) // workers)
+
+    logger.info(f"═══ PyroWatch sweep: {name} ═══")
+    logger.info(f"  {len(trials)} trials, {workers} workers × {threads} threads, up to {epochs} epochs")
+
+    results = []
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=ctx,
+            initializer=_attach_shared,
+            initargs=(spec, train_end, val_end, reports, lock, threads),
+        ) as pool:
+            futures = {
+                pool.submit(_run_trial, i, params, epochs, prune_after): i
+                for i, params in enumerate(trials)
+            }
+            for fut in as_completed(futures):
+                r = fut.result()
+                results.append(r)
+                logger.info(
+                    f"  trial {r['trial']:3d} {r['status']:<8} | val_AUC: {r['val_auc']:.4f} | "
+                    f"test_AUC: {_fmt(r['test_auc'])} | {r['wall_time_s']:.1f}s | {r['params']}"
+                )
+    finally:
+        for b in blocks:
+            b.close()
+            b.unlink()
+        manager.shutdown()
+
+    results.sort(key=lambda r: (r["status"] != "complete", -r["val_auc"]))
+    leaderboard = out_dir / "leaderboard.json"
+    leaderboard.write_text(json.dumps({
+        "name":        name,
+        "epochs":      epochs,
+        "prune_after": prune_after,
+        "trials":      results,
+    }, indent=2))
+
+    logger.info("\n" + "═" * 50)
+    logger.info("  SWEEP LEADERBOARD (top 5)")
+    logger.info("═" * 50)
+    for r in results[:5]:
+        logger.info(
+            f"  #{r['trial']:<3d} val_AUC {r['val_auc']:.4f} | test_AUC {_fmt(r['test_auc'])} | "
+            f"{r['n_params']:,} params | {r['params']}"
+        )
+    logger.info(f"\n  Leaderboard saved: {leaderboard}")
+    return results
+
+
+def _to_shared(arr: np.ndarray) -> shared_memory.SharedMemory:
+    block = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=block.buf)[:] = arr
+    return block
+
+
+def _attach_shared(spec, train_end, val_end, reports, lock, threads) -> None:
+    import torch
+    from ml.dataset import window_view
+
+    torch.set_num_threads(threads)
+    arrays = []
+    for shm_name, shape, dtype in spec:
+        block = shared_memory.SharedMemory(name=shm_name)
+        _shared.setdefault("blocks", []).append(block)
+        arrays.append(np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf))
+
+    X, y = window_view(*arrays, LSTM_CONFIG["sequence_length"], LSTM_CONFIG["forecast_horizon"])
+    _shared["splits"] = {
+        "train": (X[:train_end],        y[:train_end]),
+        "val":   (X[train_end:val_end], y[train_end:val_end]),
+        "test":  (X[val_end:],          y[val_end:]),
+    }
+    _shared["reports"] = reports
+    _shared["lock"]    = lock
+
+
+def _run_trial(trial: int, params: dict, epochs: int, prune_after: int) -> dict:
+    import torch
+    import torch.nn as nn
+    from torch.optim import Adam
+    from ml.dataset import make_dataloader
+    from ml.model import build_model
+    from ml.train import _evaluate, _binary_auc
+
+    logger.disable("ml")
+    t0 = time.perf_counter()
+    config = {**LSTM_CONFIG, **params}
+    splits = _shared["splits"]
+
+    train_loader = make_dataloader(*splits["train"], config["batch_size"], shuffle=True)
+    val_loader   = make_dataloader(*splits["val"],   config["batch_size"])
+    test_loader  = make_dataloader(*splits["test"],  config["batch_size"])
+
+    torch.manual_seed(trial)
+    model     = build_model(config)
+    criterion = nn.BCELoss()
+    optimizer = Adam(model.parameters(), lr=config["learning_rate"], weight_decay=1e-5)
+
+    best_auc, best_state, best_epoch = -1.0, None, 0
+    status = "complete"
+    for epoch in range(1, epochs + 1):
+        model.train()
+        for X_batch, y_batch in train_loader:
+            optimizer.zero_grad()
+            loss = criterion(model(X_batch), y_batch)
+            loss.backward()
+            nn.utils.clip_grad_norm_(model.parameters(), max_norm=1.0)
+            optimizer.step()
+
+        _, val_preds, val_true = _evaluate(model, val_loader, criterion)
+        val_auc = _binary_auc(val_true, val_preds)
+        if val_auc is None:
+            val_auc = 0.5
+        if val_auc > best_auc:
+            best_auc, best_epoch = val_auc, epoch
+            best_state = copy.deepcopy(model.state_dict())
+
+        if _should_prune(epoch, best_auc, prune_after):
+            status = "pruned"
+            break
+        if epoch - best_epoch >= config["early_stop_patience"]:
+            break
+
+    test_auc = None
+    if status == "complete":
+        model.load_state_dict(best_state)
+        _, test_preds, test_true = _evaluate(model, test_loader)
+        test_auc = _binary_auc(test_true, test_preds)
+
+    return {
+        "trial":       trial,
+        "status":      status,
+        "params":      params,
+        "val_auc":     round(float(best_auc), 4),
+        "test_auc":    None if test_auc is None else round(float(test_auc), 4),
+        "best_epoch":  best_epoch,
+        "epochs_run":  epoch,
+        "n_params":    model.count_parameters(),
+        "wall_time_s": round(time.perf_counter() - t0, 2),
+    }
+
+
+def _should_prune(epoch: int, best_auc: float, prune_after: int) -> bool:
+    # Median pruning: after the warm-up epochs, stop a trial whose best val AUC so far is
+    # below the median of what other trials had reached by the same epoch.
+    reports, lock = _shared["reports"], _shared["lock"]
+    with lock:
+        seen = list(reports.get(epoch, []))
+        reports[epoch] = seen + [best_auc]
+    if epoch < prune_after or len(seen) < 2:
+        return False
+    return best_auc < float(np.median(seen))
+
+
+def _fmt(value) -> str:
+    return "  —   " if value is None else f"{value:.4f}"
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Parallel hyperparameter sweep for PyroWatch LSTM")
+    parser.add_argument("--mode", choices=["grid", "random"], default="random")
+    parser.add_argument("--trials", type=int, default=16, help="Number of random-search trials")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--epochs", type=int, default=LSTM_CONFIG["epochs"])
+    parser.add_argument("--prune-after", type=int, default=3, help="Epochs before median pruning starts")
+    parser.add_argument("--space", type=Path, default=None, help="JSON search space (defaults to DEFAULT_SPACE)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--name", default=None)
+    args = parser.parse_args()
+
+    space  = json.loads(args.space.read_text()) if args.space else DEFAULT_SPACE
+    trials = grid_trials(space) if args.mode == "grid" else random_trials(space, args.trials, args.seed)
+    run_sweep(trials, workers=args.workers, epochs=args.epochs, prune_after=args.prune_after, name=args.name)
@@ -2,32 +2,39 @@
 
 import sys
 import os
+import time
+import contextlib
+import functools
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 import numpy as np
-import torch
-import torch.nn as nn
-from torch.optim import Adam
-from torch.optim.lr_scheduler import ReduceLROnPlateau
-from sklearn.metrics import roc_auc_score
-import joblib
 from pathlib import Path
 
-from utils.config import LSTM_CONFIG, MODELS_DIR
+from utils.config import LSTM_CONFIG, MODELS_DIR, ensure_dirs
 from utils.logger import logger
-from data.feature_builder import load_dataset
-from ml.dataset import FireSequenceDataset, make_dataloader
-from ml.model import build_model
+from utils.dataset_store import load_processed
+from utils.model_store import MODEL_FILE, SCALER_FILE, staging_dir, publish
+from ml.profiling import PhaseTimer, peak_rss_mb, parse_epoch_window, torch_profile
 
 
-DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+# torch and sklearn are imported where they are used, so sweep/distributed workers and the
+# CLI's --help don't pay for them before they are needed.
+@functools.lru_cache(maxsize=None)
+def _device():
+    import torch
+    return torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
 
-def train():
+def train(profile_epochs: tuple = None):
+    from ml.dataset import FireSequenceDataset, make_dataloader
+    from utils.threads import apply as apply_threads
+
+    apply_threads("train")
+
     logger.info("═══ PyroWatch LSTM Training ═══")
-    logger.info(f"Device: {DEVICE}")
+    logger.info(f"Device: {_device()}")
 
-    df = load_dataset()
+    df = load_processed(columns=["timestamp", *LSTM_CONFIG["features"], "risk_score"])
     ds = FireSequenceDataset(df)
     X_train, y_train, X_val, y_val, X_test, y_test = ds.get_splits()
 
@@ -41,62 +48,137 @@ def train():
         f"val: {len(val_loader)}, test: {len(test_loader)}"
     )
 
-    model = build_model(LSTM_CONFIG).to(DEVICE)
+    fire_ratio = (y_train > 0.5).mean()
+    return _fit(train_loader, val_loader, test_loader, fire_ratio, profile_epochs=profile_epochs)
+
+
+def train_streaming(shards_dir: Path = None, profile_epochs: tuple = None):
+    from utils.dataset_store import SHARDS_DIR, load_manifest
+    from ml.streaming import fit_streaming_scaler, make_streaming_loader
+    from utils.threads import apply as apply_threads
+    import joblib
+
+    apply_threads("train")
+
+    shards_dir = shards_dir or SHARDS_DIR
+    logger.info("═══ PyroWatch LSTM Training (streaming) ═══")
+    logger.info(f"Device: {_device()}")
+
+    manifest = load_manifest(shards_dir)
+    if not manifest:
+        raise FileNotFoundError(f"No shard manifest in {shards_dir}")
+    logger.info(
+        f"Shards: {sum(len(v) for v in manifest.values())} files, "
+        f"{len(manifest)} fires, {sum(e['rows'] for v in manifest.values() for e in v):,} rows"
+    )
+
+    scaler, fire_ratio = fit_streaming_scaler(manifest, shards_dir)
+    ensure_dirs()
+    scaler_path = staging_dir() / SCALER_FILE
+    joblib.dump(scaler, scaler_path)
+    logger.info(f"Scaler staged: {scaler_path}")
+
+    batch_size = LSTM_CONFIG["batch_size"]
+    loaders = [
+        make_streaming_loader(manifest, split, scaler, batch_size, shuffle=(split == "train"), shards_dir=shards_dir)
+        for split in ("train", "val", "test")
+    ]
+    logger.info(
+        f"Windows — train: {len(loaders[0].dataset):,}, "
+        f"val: {len(loaders[1].dataset):,}, test: {len(loaders[2].dataset):,}"
+    )
+    return _fit(*loaders, fire_ratio, profile_epochs=profile_epochs)
+
+
+def _fit(
+    train_loader,
+    val_loader,
+    test_loader,
+    fire_ratio:     float,
+    rank:           int = 0,
+    world_size:     int = 1,
+    profile_epochs: tuple = None,
+):
+    import torch
+    import torch.nn as nn
+    from torch.optim import Adam
+    from torch.optim.lr_scheduler import ReduceLROnPlateau
+    from ml.model import build_model
+
+    device = _device()
+    if rank == 0:
+        ensure_dirs()
+    model = build_model(LSTM_CONFIG).to(device)
     logger.info(f"Model parameters: {model.count_parameters():,}")
 
-    fire_ratio = (y_train > 0.5).mean()
-    pos_weight = torch.tensor([(1 - fire_ratio) / (fire_ratio + 1e-6)], device=DEVICE)
+    # Under DDP `net` syncs gradients; `model` is the same module and is what gets saved.
+    net = model
+    if world_size > 1:
+        from torch.nn.parallel import DistributedDataParallel
+        net = DistributedDataParallel(model)
+
+    pos_weight = torch.tensor([(1 - fire_ratio) / (fire_ratio + 1e-6)], device=device)
     logger.info(f"Class balance — fire: {fire_ratio:.1%}, pos_weight: {pos_weight.item():.2f}")
 
     criterion = nn.BCELoss()
     optimizer = Adam(model.parameters(), lr=LSTM_CONFIG["learning_rate"], weight_decay=1e-5)
-    scheduler = ReduceLROnPlateau(optimizer, mode="min", patience=3, factor=0.5, verbose=True)
+    scheduler = ReduceLROnPlateau(optimizer, mode="min", patience=3, factor=0.5)
 
     best_val_loss = float("inf")
     patience_counter = 0
-    best_model_path = MODELS_DIR / "pyrowatch_lstm_best.pt"
-    history = {"train_loss": [], "val_loss": [], "val_auc": []}
+    best_model_path = staging_dir() / MODEL_FILE  # published with the scaler once training ends
+    history = {"train_loss": [], "val_loss": [], "val_auc": [], "perf": [], "profile_traces": []}
 
     logger.info(f"\nTraining for up to {LSTM_CONFIG['epochs']} epochs...")
     logger.info(f"Early stop patience: {LSTM_CONFIG['early_stop_patience']} epochs\n")
 
     for epoch in range(1, LSTM_CONFIG["epochs"] + 1):
-
-        model.train()
-        train_losses = []
-        for X_batch, y_batch in train_loader:
-            X_batch, y_batch = X_batch.to(DEVICE), y_batch.to(DEVICE)
-            optimizer.zero_grad()
-            preds = model(X_batch)
-            loss  = criterion(preds, y_batch)
-            loss.backward()
-            nn.utils.clip_grad_norm_(model.parameters(), max_norm=1.0)
-            optimizer.step()
-            train_losses.append(loss.item())
-
-        model.eval()
-        val_losses, val_preds, val_true = [], [], []
-        with torch.no_grad():
-            for X_batch, y_batch in val_loader:
-                X_batch, y_batch = X_batch.to(DEVICE), y_batch.to(DEVICE)
-                preds = model(X_batch)
-                loss  = criterion(preds, y_batch)
-                val_losses.append(loss.item())
-                val_preds.extend(preds.cpu().numpy().flatten())
-                val_true.extend(y_batch.cpu().numpy().flatten())
-
-        train_loss = np.mean(train_losses)
-        val_loss   = np.mean(val_losses)
-
-        val_arr    = np.array(val_true)
-        threshold  = np.median(val_arr)
-        val_binary = (val_arr > threshold).astype(int)
-        n_pos, n_neg = val_binary.sum(), (1 - val_binary).sum()
-        if n_pos > 0 and n_neg > 0:
-            val_auc = roc_auc_score(val_binary, val_preds)
-        else:
+        for reshuffled in (train_loader.dataset, train_loader.sampler):
+            if hasattr(reshuffled, "set_epoch"):
+                reshuffled.set_epoch(epoch)
+
+        timer = PhaseTimer()
+        epoch_start = time.perf_counter()
+        n_samples = 0
+
+        with torch_profile(epoch, profile_epochs, MODELS_DIR / "profiles") as trace_path:
+            net.train()
+            train_losses = []
+            batches = iter(train_loader)
+            # join() lets ranks with fewer streamed batches shadow the collectives of the others.
+            with net.join() if world_size > 1 else contextlib.nullcontext():
+                while True:
+                    with timer("data"):
+                        batch = next(batches, None)
+                    if batch is None:
+                        break
+                    X_batch, y_batch = batch[0].to(device), batch[1].to(device)
+                    n_samples += len(X_batch)
+                    with timer("forward"):
+                        optimizer.zero_grad()
+                        preds = net(X_batch)
+                        loss  = criterion(preds, y_batch)
+                    with timer("backward"):
+                        loss.backward()
+                    with timer("clip_grad"):
+                        nn.utils.clip_grad_norm_(model.parameters(), max_norm=1.0)
+                    with timer("optimizer"):
+                        optimizer.step()
+                        train_losses.append(loss.item())
+            train_seconds = time.perf_counter() - epoch_start
+
+            with timer("validate"):
+                val_loss, val_preds, val_true = _evaluate(model, val_loader, criterion, world_size)
+            train_loss = np.mean(_gather(train_losses, world_size))
+
+            with timer("val_auc"):
+                val_auc = _binary_auc(val_true, val_preds)
+        if trace_path is not None:
+            history["profile_traces"].append(str(trace_path))
+
+        if val_auc is None:
             val_auc = history["val_auc"][-1] if history["val_auc"] else 0.5
-            logger.debug(f"Epoch {epoch}: single-class val (pos={n_pos}, neg={n_neg}) — skipping AUC")
+            logger.debug(f"Epoch {epoch}: single-class val — skipping AUC")
 
         history["train_loss"].append(train_loss)
         history["val_loss"].append(val_loss)
@@ -108,18 +190,32 @@ def train():
         if val_loss < best_val_loss:
             best_val_loss = val_loss
             patience_counter = 0
-            torch.save({
-                "epoch":      epoch,
-                "model_state": model.state_dict(),
-                "optimizer_state": optimizer.state_dict(),
-                "val_loss":   val_loss,
-                "val_auc":    val_auc,
-                "config":     LSTM_CONFIG,
-            }, best_model_path)
+            if rank == 0:
+                with timer("checkpoint"):
+                    torch.save({
+                        "epoch":      epoch,
+                        "model_state": model.state_dict(),
+                        "optimizer_state": optimizer.state_dict(),
+                        "val_loss":   val_loss,
+                        "val_auc":    val_auc,
+                        "config":     LSTM_CONFIG,
+                    }, best_model_path)
             flag = " ← best"
         else:
             patience_counter += 1
 
+        epoch_seconds = time.perf_counter() - epoch_start
+        samples_per_sec = n_samples * world_size / train_seconds if train_seconds > 0 else 0.0
+        history["perf"].append({
+            "epoch":           epoch,
+            "epoch_seconds":   round(epoch_seconds, 4),
+            "train_seconds":   round(train_seconds, 4),
+            "phases":          timer.summary(),
+            "train_samples":   n_samples * world_size,
+            "samples_per_sec": round(samples_per_sec, 1),
+            "peak_rss_mb":     peak_rss_mb(),
+        })
+
         if epoch % 5 == 0 or epoch == 1 or flag:
             lr = optimizer.param_groups[0]["lr"]
             logger.info(
@@ -127,40 +223,34 @@ def train():
                 f"train_loss: {train_loss:.4f} | "
                 f"val_loss: {val_loss:.4f} | "
                 f"val_AUC: {val_auc:.4f} | "
-                f"lr: {lr:.2e}{flag}"
+                f"lr: {lr:.2e} | "
+                f"{samples_per_sec:,.0f} samples/s, {epoch_seconds:.1f}s{flag}"
             )
 
         if patience_counter >= LSTM_CONFIG["early_stop_patience"]:
             logger.info(f"\nEarly stopping at epoch {epoch} — val_loss stalled for {patience_counter} epochs")
             break
 
+    if world_size > 1:
+        import torch.distributed as dist
+        dist.barrier()
+
     logger.info(f"\nLoading best model from: {best_model_path}")
-    checkpoint = torch.load(best_model_path, map_location=DEVICE)
+    checkpoint = torch.load(best_model_path, map_location=device, weights_only=False)
     model.load_state_dict(checkpoint["model_state"])
-    model.eval()
 
-    test_preds, test_true = [], []
-    with torch.no_grad():
-        for X_batch, y_batch in test_loader:
-            X_batch = X_batch.to(DEVICE)
-            preds   = model(X_batch)
-            test_preds.extend(preds.cpu().numpy().flatten())
-            test_true.extend(y_batch.numpy().flatten())
-
-    test_arr    = np.array(test_true)
-    threshold   = np.median(test_arr)
-    test_binary = (test_arr > threshold).astype(int)
-    n_pos, n_neg = test_binary.sum(), (1 - test_binary).sum()
-    if n_pos > 0 and n_neg > 0:
-        test_auc = roc_auc_score(test_binary, test_preds)
-    else:
+    _, test_preds, test_true = _evaluate(model, test_loader, world_size=world_size)
+    test_auc = _binary_auc(test_true, test_preds)
+    if test_auc is None:
         test_auc = 0.5
         logger.warning("Test set has only one class — AUC not meaningful. Need more diverse data.")
 
     import json
     history_path = MODELS_DIR / "training_history.json"
-    with open(history_path, "w") as f:
-        json.dump({**history, "test_auc": test_auc, "best_val_loss": best_val_loss}, f, indent=2)
+    if rank == 0:
+        with open(history_path, "w") as f:
+            json.dump({**history, "test_auc": test_auc, "best_val_loss": best_val_loss}, f, indent=2)
+        publish()
 
     best_epoch = checkpoint["epoch"]
     best_auc   = checkpoint["val_auc"]
@@ -182,14 +272,58 @@ def train():
         logger.info(f"  ⚠️  AUC {test_auc:.4f} < {target} — see troubleshooting below")
         _print_troubleshooting(test_auc)
 
-    logger.info(f"\n  Model saved: {best_model_path}")
-    logger.info(f"  Scaler saved: {MODELS_DIR / 'scaler.joblib'}")
+    logger.info(f"\n  Model saved: {MODELS_DIR / MODEL_FILE}")
+    logger.info(f"  Scaler saved: {MODELS_DIR / SCALER_FILE}")
     logger.info(f"  History saved: {history_path}")
     logger.info("═" * 50 + "\n")
 
     return test_auc, history
 
 
+def _evaluate(model, loader, criterion=None, world_size: int = 1) -> tuple:
+    import torch
+
+    device = _device()
+    model.eval()
+    losses, preds_all, true_all = [], [], []
+    with torch.no_grad():
+        for X_batch, y_batch in loader:
+            X_batch, y_batch = X_batch.to(device), y_batch.to(device)
+            preds = model(X_batch)
+            if criterion is not None:
+                losses.append(criterion(preds, y_batch).item())
+            preds_all.extend(preds.cpu().numpy().flatten())
+            true_all.extend(y_batch.cpu().numpy().flatten())
+
+    # Every rank scores the full gathered split, so AUC and early stopping agree everywhere.
+    losses    = _gather(losses, world_size)
+    preds_all = _gather(preds_all, world_size)
+    true_all  = _gather(true_all, world_size)
+    loss = float(np.mean(losses)) if losses else None
+    return loss, np.array(preds_all), np.array(true_all)
+
+
+def _gather(values: list, world_size: int) -> list:
+    if world_size <= 1:
+        return values
+    import torch.distributed as dist
+    parts = [None] * world_size
+    dist.all_gather_object(parts, values)
+    return [v for part in parts for v in part]
+
+
+def _binary_auc(y_true: np.ndarray, y_pred: np.ndarray):
+    if len(y_true) == 0:
+        return None
+    threshold = np.median(y_true)
+    binary    = (y_true > threshold).astype(int)
+    n_pos, n_neg = binary.sum(), (1 - binary).sum()
+    if n_pos == 0 or n_neg == 0:
+        return None
+    from sklearn.metrics import roc_auc_score
+    return roc_auc_score(binary, y_pred)
+
+
 def _print_troubleshooting(auc: float):
     logger.info("\n  Troubleshooting guide:")
     if auc < 0.6:
@@ -206,7 +340,20 @@ def _print_troubleshooting(auc: float):
         logger.info("    1. Reduce LR to 5e-5")
         logger.info("    2. Add BatchNorm after LSTM")
         logger.info("    3. Increase hidden_size to 256")
+    logger.info("  → Or search configs in parallel: python backend/ml/sweep.py --mode random --trials 16")
 
 
 if __name__ == "__main__":
-    train()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Train the PyroWatch LSTM")
+    parser.add_argument("--shards", nargs="?", const="", default=None,
+                        help="Stream from columnar shards (default dir: data/processed/shards)")
+    parser.add_argument("--profile-epochs", default=None,
+                        help="Record a torch profiler trace for epoch N or N:M into saved_models/profiles")
+    args = parser.parse_args()
+
+    window = parse_epoch_window(args.profile_epochs)
+    if args.shards is None:
+        train(profile_epochs=window)
+    else:
+        train_streaming(Path(args.shards) if args.shards else None, profile_epochs=window)
\ No newline at end of file
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.alert_index import THRESHOLD, AlertIndex, decode_cursor, encode_cursor
+
+HOUR = 3_600_000_000_000
+T0   = pd.Timestamp("2021-07-14").value
+
+
+def _extend(index: AlertIndex, first_hour: int, risks: list[float]) -> None:
+    ts = T0 + (first_hour + np.arange(len(risks))) * HOUR
+    risk = np.array(risks, dtype=np.float64)
+    index.extend(ts, risk, fire_pixels=risk * 100, temperature=np.full(len(risks), 30.0))
+
+
+def _all_events(index: AlertIndex, limit: int) -> list[dict]:
+    events, cursor = [], None
+    while True:
+        page, cursor = index.query(cursor=cursor, limit=limit)
+        events.extend(page)
+        if cursor is None:
+            return events
+
+
+HI, LO = THRESHOLD + 0.1, THRESHOLD - 0.1
+
+
+def test_runs_above_threshold_become_events():
+    index = AlertIndex("test")
+    _extend(index, 0, [LO, HI, HI, LO, LO, HI, LO])
+    assert len(index) == 2
+    newest, oldest = index.query(limit=10)[0]
+    assert (oldest["hours"], newest["hours"]) == (2, 1)
+    assert oldest["start"] == pd.Timestamp(T0 + HOUR).isoformat()
+    assert oldest["end"] == pd.Timestamp(T0 + 2 * HOUR).isoformat()
+
+
+def test_run_still_open_at_batch_end_is_merged_with_the_next_batch():
+    index = AlertIndex("test")
+    _extend(index, 0, [LO, HI, HI])
+    _extend(index, 3, [HI, 0.95, LO])
+    assert len(index) == 1
+    event = index.query()[0][0]
+    assert event["hours"] == 4
+    assert event["end"] == pd.Timestamp(T0 + 4 * HOUR).isoformat()
+    assert event["risk_score"] == 0.95
+    assert event["timestamp"] == pd.Timestamp(T0 + 4 * HOUR).isoformat()
+
+
+def test_run_closed_at_batch_end_is_not_merged():
+    index = AlertIndex("test")
+    _extend(index, 0, [HI, HI, LO])
+    _extend(index, 3, [HI, LO])
+    assert len(index) == 2
+
+
+def test_merge_keeps_the_earlier_peak_when_it_is_higher():
+    index = AlertIndex("test")
+    _extend(index, 0, [0.99, HI])
+    _extend(index, 2, [HI])
+    event = index.query()[0][0]
+    assert (event["hours"], event["risk_score"]) == (3, 0.99)
+    assert event["timestamp"] == pd.Timestamp(T0).isoformat()
+
+
+def test_rows_not_newer_than_the_last_indexed_are_ignored():
+    index = AlertIndex("test")
+    _extend(index, 0, [HI, LO])
+    _extend(index, 0, [HI, HI, LO])  # hours 0-1 again, then hour 2
+    assert len(index) == 1
+    assert index.query()[0][0]["hours"] == 1
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7, 50])
+def test_cursor_pages_cover_every_event_once_newest_first(limit):
+    index = AlertIndex("test")
+    _extend(index, 0, [HI, LO] * 7)
+    events = _all_events(index, limit)
+    starts = [e["start"] for e in events]
+    assert len(events) == 7
+    assert starts == sorted(set(starts), reverse=True)
+
+
+def test_time_range_returns_overlapping_events():
+    index = AlertIndex("test")
+    _extend(index, 0, [HI, HI, LO, HI, LO, HI, HI])
+    page, cursor = index.query(start_ns=T0 + HOUR, end_ns=T0 + 3 * HOUR)
+    assert cursor is None
+    assert [e["start"] for e in page] == [pd.Timestamp(T0 + h * HOUR).isoformat() for h in (3, 0)]
+
+
+def test_cursor_round_trip():
+    for start_ns in (0, T0, 2**62):
+        cursor = encode_cursor(start_ns)
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == start_ns
+
+
+def test_invalid_cursor_raises_value_error():
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor!")
@@ -0,0 +1,131 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from api.batch import BatchError, decode
+from utils.config import BATCH_PREDICT_CONFIG, LSTM_CONFIG
+
+SHAPE = (LSTM_CONFIG["sequence_length"], LSTM_CONFIG["n_features"])
+
+
+def _windows(n: int) -> np.ndarray:
+    return np.random.default_rng(0).uniform(0, 1, (n, *SHAPE)).astype(np.float32)
+
+
+def _npy(arr: np.ndarray) -> bytes:
+    buf = io.BytesIO()
+    np.save(buf, arr)
+    return buf.getvalue()
+
+
+def _status(body: bytes, content_type: str) -> int:
+    with pytest.raises(BatchError) as e:
+        decode(body, content_type)
+    return e.value.status_code
+
+
+def test_json_body():
+    arr = _windows(3)
+    for payload in ({"sequences": arr.tolist()}, arr.tolist()):
+        out = decode(json.dumps(payload).encode(), "application/json; charset=utf-8")
+        assert out.dtype == np.float32
+        np.testing.assert_allclose(out, arr)
+
+
+def test_missing_content_type_means_json():
+    arr = _windows(1)
+    np.testing.assert_allclose(decode(json.dumps(arr.tolist()).encode(), None), arr)
+
+
+def test_npy_body():
+    arr = _windows(4)
+    for content_type in ("application/x-npy", "application/octet-stream"):
+        np.testing.assert_array_equal(decode(_npy(arr), content_type), arr)
+    np.testing.assert_array_equal(decode(_npy(arr.astype(np.float64)), "application/x-npy"), arr)
+
+
+def test_arrow_body():
+    pa = pytest.importorskip("pyarrow")
+    arr   = _windows(5)
+    width = SHAPE[0] * SHAPE[1]
+    column = pa.FixedSizeListArray.from_arrays(pa.array(arr.ravel()), width)
+    sink = pa.BufferOutputStream()
+    table = pa.table({"sequence": column})
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    out = decode(sink.getvalue().to_pybytes(), "application/vnd.apache.arrow.stream")
+    np.testing.assert_array_equal(out, arr)
+
+
+def test_unsupported_content_type_is_415():
+    assert _status(b"a,b,c", "text/csv") == 415
+
+
+@pytest.mark.parametrize("shape", [(2, SHAPE[0], SHAPE[1] + 1), (2, SHAPE[0] - 1, SHAPE[1]), SHAPE, (0,)])
+def test_wrong_shape_is_422(shape):
+    assert _status(_npy(np.zeros(shape, dtype=np.float32)), "application/x-npy") == 422
+
+
+def test_empty_batch_is_422():
+    with pytest.raises(BatchError, match="Empty batch") as e:
+        decode(_npy(np.zeros((0, *SHAPE), dtype=np.float32)), "application/x-npy")
+    assert e.value.status_code == 422
+
+
+def test_too_many_windows_is_413(monkeypatch):
+    monkeypatch.setitem(BATCH_PREDICT_CONFIG, "max_windows", 2)
+    assert len(decode(_npy(_windows(2)), "application/x-npy")) == 2
+    assert _status(_npy(_windows(3)), "application/x-npy") == 413
+
+
+def test_non_finite_values_are_422():
+    arr = _windows(4)
+    arr[1, 0, 0], arr[3, 5, 2] = np.nan, np.inf
+    with pytest.raises(BatchError, match=r"windows \[1, 3\]") as e:
+        decode(_npy(arr), "application/x-npy")
+    assert e.value.status_code == 422
+
+
+@pytest.mark.parametrize("body, content_type", [
+    (b"{not json", "application/json"),
+    (b'{"windows": []}', "application/json"),
+    (b"not an npy file", "application/x-npy"),
+    (_npy(np.full((1, *SHAPE), "a")), "application/x-npy"),
+])
+def test_malformed_bodies_are_422(body, content_type):
+    assert _status(body, content_type) == 422
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("PYROWATCH_SNAPSHOTS", "0")
+    from fastapi.testclient import TestClient
+    from api.main import app
+    return TestClient(app)  # no startup: the limit is enforced before any model is touched
+
+
+def test_streamed_body_over_the_limit_is_413(client, monkeypatch):
+    monkeypatch.setitem(BATCH_PREDICT_CONFIG, "max_body_mb", 1)
+
+    def chunks():
+        for _ in range(64):
+            yield b"\0" * (64 << 10)  # 4 MB in all, with no Content-Length
+
+    r = client.post("/predict/batch", content=chunks(), headers={"content-type": "application/x-npy"})
+    assert r.status_code == 413
+    assert r.json()["detail"] == "Body over 1 MB"
+
+
+def test_declared_content_length_over_the_limit_is_413(client, monkeypatch):
+    monkeypatch.setitem(BATCH_PREDICT_CONFIG, "max_body_mb", 1)
+    r = client.post("/predict/batch", content=b"\0" * ((1 << 20) + 1),
+                    headers={"content-type": "application/x-npy"})
+    assert r.status_code == 413
+
+
+def test_body_under_the_limit_reaches_the_decoder(client, monkeypatch):
+    monkeypatch.setitem(BATCH_PREDICT_CONFIG, "max_body_mb", 1)
+    r = client.post("/predict/batch", content=iter([b"a,b", b",c"]), headers={"content-type": "text/csv"})
+    assert r.status_code == 415
@@ -0,0 +1,79 @@
+import pytest
+
+from utils import circuit_breaker
+from utils.circuit_breaker import CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _open(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failures - 1):
+        assert breaker.record_failure() is False
+    assert breaker.record_failure() is True
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("test", failures=3, cooldown_s=10)
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+    _open(breaker)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker("test", failures=3, cooldown_s=10)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    assert breaker.record_failure() is False
+    assert breaker.record_failure() is False
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_single_trial_after_cooldown(clock):
+    breaker = CircuitBreaker("test", failures=2, cooldown_s=10)
+    _open(breaker)
+    clock[0] += 9.9
+    assert not breaker.allow()
+    clock[0] += 0.1
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()  # everyone else waits for the trial
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_trial_success_closes(clock):
+    breaker = CircuitBreaker("test", failures=2, cooldown_s=10)
+    _open(breaker)
+    clock[0] += 10
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() and breaker.allow()
+
+
+def test_trial_failure_reopens_for_another_cooldown(clock):
+    breaker = CircuitBreaker("test", failures=2, cooldown_s=10)
+    _open(breaker)
+    clock[0] += 10
+    assert breaker.allow()
+    assert breaker.record_failure() is True
+    assert breaker.state == CircuitBreaker.OPEN
+    clock[0] += 9
+    assert not breaker.allow()
+    clock[0] += 1
+    assert breaker.allow()
+
+
+def test_failures_while_open_do_not_extend_the_cooldown(clock):
+    breaker = CircuitBreaker("test", failures=2, cooldown_s=10)
+    _open(breaker)
+    clock[0] += 5
+    assert breaker.record_failure() is False
+    clock[0] += 5
+    assert breaker.allow()
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from api.featherless import _keep_band, quantize, report_key
+from utils.config import ALERT_TIERS, REPORT_KEY_BUCKETS, RISK_THRESHOLDS
+
+STEP = REPORT_KEY_BUCKETS["risk_score"]
+
+
+def _level(score: float) -> str:
+    return next(name for name, (lo, hi) in RISK_THRESHOLDS.items() if lo <= score < hi)
+
+
+def _tier(score: float) -> str:
+    return max((t for t, lo in ALERT_TIERS.items() if score >= lo), key=ALERT_TIERS.get, default="none")
+
+
+def test_inputs_snap_to_their_buckets():
+    out = quantize({
+        "region": "CA", "risk_score": 0.42, "wind_speed": 6.9, "wind_direction": 100.0,
+        "temperature": 31.2, "humidity": 12.4, "fire_pixels": 137,
+    })
+    assert out == {
+        "region": "CA", "risk_score": 0.4, "wind_speed": 6.0, "wind_direction": 90.0,
+        "temperature": 32.0, "humidity": 10.0, "fire_pixels": 140,
+    }
+    assert isinstance(out["fire_pixels"], int)
+
+
+def test_missing_fields_are_left_out():
+    assert quantize({"county": "Plumas"}) == {"county": "Plumas"}
+
+
+def test_wind_direction_wraps():
+    assert quantize({"wind_direction": 350.0})["wind_direction"] == 0.0
+    assert quantize({"wind_direction": 337.0})["wind_direction"] == 315.0
+
+
+def test_nearby_inputs_share_a_report_key():
+    a = {"risk_score": 0.81, "wind_speed": 6.1, "humidity": 20.4, "alert_tier": "emergency"}
+    b = {"risk_score": 0.79, "wind_speed": 5.9, "humidity": 19.6, "alert_tier": "emergency"}
+    assert report_key(a) == report_key(b)
+    assert report_key(a) != report_key({**a, "humidity": 40.0})
+
+
+@pytest.mark.parametrize("score, expected", [
+    (0.7499, 0.70),  # would round up to the emergency edge
+    (0.75,   0.75),
+    (0.5999, 0.55),  # would round up to the warning edge
+    (0.3999, 0.35),  # would round up to the watch edge
+    (0.6,    0.6),
+    (0.99,   1.0),   # no edge above extreme/emergency
+    (0.01,   0.0),
+])
+def test_risk_score_stays_below_the_next_edge(score, expected):
+    assert quantize({"risk_score": score})["risk_score"] == pytest.approx(expected)
+
+
+def test_keep_band_never_drops_below_the_lower_edge():
+    assert _keep_band(0.56, 0.55, STEP) == 0.55
+    assert _keep_band(0.61, 0.6, STEP) == 0.6
+    assert _keep_band(0.36, 0.35, STEP) == 0.35
+
+
+def test_snapped_score_keeps_level_and_tier():
+    scores = np.random.default_rng(0).uniform(0, 1, 20_000)
+    edges  = np.array([lo for lo, _ in RISK_THRESHOLDS.values()] + list(ALERT_TIERS.values()))
+    scores = np.clip(np.concatenate([scores, edges, edges - 1e-4, edges + 1e-4]), 0, 1)
+    for score in scores:
+        snapped = quantize({"risk_score": float(score)})["risk_score"]
+        assert abs(snapped - score) <= STEP
+        assert (_level(snapped), _tier(snapped)) == (_level(score), _tier(score)), score
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from utils.ring_buffer import FeatureRing
+
+
+def _rows(ts: np.ndarray) -> np.ndarray:
+    return np.stack([ts, -ts], axis=1).astype(np.float32)
+
+
+def _append(ring: FeatureRing, first: int, n: int) -> int:
+    ts = np.arange(first, first + n, dtype=np.int64)
+    return ring.extend(ts, _rows(ts))
+
+
+def test_empty_ring():
+    ring = FeatureRing(["a", "b"], capacity=4)
+    ts, rows = ring.window(3)
+    assert len(ring) == 0 and ring.version == 0
+    assert ring.last_timestamp() is None and ring.last_row() is None
+    assert ts.shape == (0,) and rows.shape == (0, 2)
+
+
+@pytest.mark.parametrize("batches", [[10], [3, 3, 3, 3], [1] * 11, [5, 9]])
+def test_wraparound_keeps_the_newest_rows_contiguous(batches):
+    ring, first, written = FeatureRing(["a", "b"], capacity=8), 0, 0
+    for n in batches:
+        written += _append(ring, first, n)
+        first += n
+    expected = np.arange(max(0, first - 8), first)
+
+    ts, rows = ring.window(8)
+    assert len(ring) == len(expected)
+    assert written == sum(min(n, 8) for n in batches)
+    assert ring.version == written
+    np.testing.assert_array_equal(ts, expected)
+    np.testing.assert_array_equal(rows, _rows(expected))
+    assert ring.last_timestamp() == first - 1
+    np.testing.assert_array_equal(ring.last_row(), _rows(expected[-1:])[0])
+
+
+def test_stale_and_out_of_order_rows_are_skipped():
+    ring = FeatureRing(["a", "b"], capacity=8)
+    assert _append(ring, 0, 3) == 3
+    ts = np.array([1, 2, 5, 4, 5, 6], dtype=np.int64)
+    assert ring.extend(ts, _rows(ts)) == 2
+    np.testing.assert_array_equal(ring.window(8)[0], [0, 1, 2, 5, 6])
+    assert ring.version == 5
+
+
+def test_window_until_excludes_rows_at_or_after_the_cutoff():
+    ring = FeatureRing(["a", "b"], capacity=8)
+    _append(ring, 0, 12)
+    np.testing.assert_array_equal(ring.window(3, until_ns=9)[0], [6, 7, 8])
+    np.testing.assert_array_equal(ring.window(10, until_ns=6)[0], [4, 5])
+
+
+def test_since_returns_rows_newer_than_the_timestamp():
+    ring = FeatureRing(["a", "b"], capacity=8)
+    _append(ring, 0, 12)
+    np.testing.assert_array_equal(ring.since(9)[0], [10, 11])
+    np.testing.assert_array_equal(ring.since(11)[0], [])
+    # Capped at capacity - 1 rows however old the timestamp is.
+    np.testing.assert_array_equal(ring.since(-1)[0], np.arange(5, 12))
+
+
+def test_views_are_read_only():
+    ring = FeatureRing(["a", "b"], capacity=4)
+    _append(ring, 0, 2)
+    for view in (*ring.window(2), *ring.since(-1)):
+        assert not view.flags.writeable
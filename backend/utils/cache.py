@@ -5,13 +5,14 @@ import hashlib
 from pathlib import Path
 from datetime import datetime, timedelta
 from utils.logger import logger
+from utils.metrics import CACHE_REQUESTS, CACHE_EVICTIONS
 
 
 class Cache:
     def __init__(self, namespace: str, ttl_hours: int = 720):
         from utils.config import CACHE_DIR
+        self.namespace = namespace
         self.dir = CACHE_DIR / namespace
-        self.dir.mkdir(parents=True, exist_ok=True)
         self.ttl = timedelta(hours=ttl_hours)
 
     def _path(self, key: str) -> Path:
@@ -21,6 +22,7 @@ class Cache:
     def get(self, key: str):
         path = self._path(key)
         if not path.exists():
+            CACHE_REQUESTS.inc(self.namespace, "miss")
             return None
         try:
             data = json.loads(path.read_text())
@@ -28,16 +30,21 @@ class Cache:
             if datetime.now() - cached_at > self.ttl:
                 logger.debug(f"Cache expired: {key[:60]}")
                 path.unlink()
+                CACHE_REQUESTS.inc(self.namespace, "expired")
+                CACHE_EVICTIONS.inc(self.namespace)
                 return None
+            CACHE_REQUESTS.inc(self.namespace, "hit")
             logger.debug(f"Cache HIT: {key[:60]}")
             return data["value"]
         except Exception as e:
             logger.warning(f"Cache read error for {key[:60]}: {e}")
+            CACHE_REQUESTS.inc(self.namespace, "error")
             return None
 
     def set(self, key: str, value) -> None:
         path = self._path(key)
         try:
+            self.dir.mkdir(parents=True, exist_ok=True)
             path.write_text(json.dumps({
                 "cached_at": datetime.now().isoformat(),
                 "key": key[:200],
@@ -52,9 +59,11 @@ class Cache:
             p = self._path(key)
             if p.exists():
                 p.unlink()
+                CACHE_EVICTIONS.inc(self.namespace)
         else:
             for f in self.dir.glob("*.json"):
                 f.unlink()
+                CACHE_EVICTIONS.inc(self.namespace)
             logger.info(f"Cache cleared: {self.dir.name}")
 
 
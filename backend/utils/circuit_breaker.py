@@ -0,0 +1,52 @@
+import threading
+import time
+
+
+class CircuitBreaker:
+    """Stops calling an upstream after `failures` consecutive failures.
+
+    While open, allow() is False for `cooldown_s`; then a single trial call is let through
+    (half-open). Its success closes the circuit, its failure opens it for another cooldown.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failures: int = 5, cooldown_s: float = 30.0):
+        self.name       = name
+        self.failures   = failures
+        self.cooldown_s = cooldown_s
+        self._state     = self.CLOSED
+        self._count     = 0
+        self._opened_at = 0.0
+        self._lock      = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown_s:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown_s:
+                self._state = self.HALF_OPEN  # this caller is the trial; others wait for its result
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._count = 0
+
+    def record_failure(self) -> bool:
+        """Returns True if this failure opened the circuit."""
+        with self._lock:
+            self._count += 1
+            if self._state == self.HALF_OPEN or (self._state == self.CLOSED and self._count >= self.failures):
+                self._state     = self.OPEN
+                self._opened_at = time.monotonic()
+                return True
+            return False
@@ -1,11 +1,14 @@
 
 
 import os
+import re
+import json
 from pathlib import Path
-from dotenv import load_dotenv
 
 ROOT_DIR = Path(__file__).resolve().parent.parent.parent
-load_dotenv(ROOT_DIR / ".env")
+if (ROOT_DIR / ".env").exists():
+    from dotenv import load_dotenv
+    load_dotenv(ROOT_DIR / ".env")
 
 DATA_DIR        = ROOT_DIR / "data"
 RAW_DIR         = DATA_DIR / "raw"
@@ -13,8 +16,11 @@ PROCESSED_DIR   = DATA_DIR / "processed"
 CACHE_DIR       = DATA_DIR / "cache"
 MODELS_DIR      = ROOT_DIR / "backend" / "ml" / "saved_models"
 
-for d in [RAW_DIR, PROCESSED_DIR, CACHE_DIR, MODELS_DIR]:
-    d.mkdir(parents=True, exist_ok=True)
+
+def ensure_dirs() -> None:
+    # Called by writers, not at import, so importing config never touches the filesystem.
+    for d in [RAW_DIR, PROCESSED_DIR, CACHE_DIR, MODELS_DIR]:
+        d.mkdir(parents=True, exist_ok=True)
 
 NASA_FIRMS_API_KEY   = os.getenv("NASA_FIRMS_API_KEY", "")
 NOAA_CDO_TOKEN       = os.getenv("NOAA_CDO_TOKEN", "")
@@ -41,7 +47,7 @@ DEMO_FIRE = {
     "noaa_station_id": "GHCND:USC00046646",
 }
 
-FIRMS_BASE_URL  = "https://firms.modaps.eosdis.nasa.gov/api/area/csv"
+FIRMS_BASE_URL  = os.getenv("FIRMS_BASE_URL", "https://firms.modaps.eosdis.nasa.gov/api/area/csv")
 FIRMS_SATELLITE = "VIIRS_SNPP_NRT"
 FIRMS_DAY_RANGE = 7
 
@@ -73,6 +79,111 @@ LSTM_CONFIG = {
     "early_stop_patience": 8,
 }
 
+STREAMING_CONFIG = {
+    "rows_per_shard":  50_000,
+    "shuffle_buffer":  8192,
+    "num_workers":     4,
+    "prefetch_factor": 4,
+}
+
+# Background precompute of the latest risk maps, county alerts and forecast (api/snapshots.py).
+# Rebuilt when the dataset, model or incident changes (checked every poll_s) or every interval_s.
+SNAPSHOT_CONFIG = {
+    "enabled":        os.getenv("PYROWATCH_SNAPSHOTS", "1") != "0",
+    "interval_s":     float(os.getenv("PYROWATCH_SNAPSHOT_INTERVAL_S", "300")),
+    "poll_s":         30.0,
+    "regions":        ["CA"],
+    "grid_steps":     [0.08],
+    "risk_map_dates": ["2021-07-15"],  # /risk-map's default date; the latest date in the data is added
+    "follow_poll_s":  1.0,             # how often non-leader workers look for the leader's snapshots
+}
+
+
+def is_leader_worker() -> bool:
+    # api/serve.py makes one pre-fork worker the leader: it alone polls the drop dir and builds
+    # snapshots, which the others load from PYROWATCH_SNAPSHOT_DIR. Any other process leads itself.
+    return os.getenv("PYROWATCH_WORKER_ROLE", "leader") == "leader"
+
+# Incremental ingestion into per-incident ring buffers (api/ingest.py). Files dropped into
+# drop_dir (CSV or JSON lines) are picked up every poll_s. POST /ingest needs this token in
+# an X-Ingest-Token header; empty disables the endpoint (the drop dir still works).
+INGEST_CONFIG = {
+    "capacity": 24 * 365,
+    "drop_dir": DATA_DIR / "incoming",
+    "poll_s":   10.0,
+    "token":    os.getenv("PYROWATCH_INGEST_TOKEN", ""),
+}
+
+# Push channel for county alert changes (api/alert_stream.py, /ws/alerts). A county is sent
+# when its tier changes or its score moves by min_delta since it was last sent; a subscriber
+# more than queue_size messages behind is disconnected and resyncs on reconnect.
+ALERT_STREAM_CONFIG = {
+    "min_delta":  float(os.getenv("PYROWATCH_ALERT_MIN_DELTA", "0.05")),
+    "queue_size": 32,
+}
+
+# POST /predict/batch: windows are scored chunk_size at a time to bound peak memory.
+BATCH_PREDICT_CONFIG = {
+    "chunk_size":  1024,
+    "max_windows": 100_000,
+    "max_body_mb": 128,
+}
+
+# Monte Carlo dropout uncertainty (ml.inference.predict_uncertainty). Each request samples
+# k_min dropout passes, then as many more (up to k_max) as fit in its budget_ms.
+UNCERTAINTY_CONFIG = {
+    "budget_ms": 50.0,
+    "k_min":     8,
+    "k_max":     64,
+    "interval":  0.9,     # central interval reported as (lo, hi)
+    "max_rows":  65_536,  # replicated head rows per pass, bounds peak memory
+}
+
+# Situation report cache keys use bucketed inputs (api/featherless.py), so nearby readings
+# share one LLM report. Steps are in each field's own unit; wind direction is in degrees.
+REPORT_KEY_BUCKETS = {
+    "risk_score":     0.05,
+    "wind_speed":     2.0,
+    "wind_direction": 45.0,
+    "temperature":    2.0,
+    "humidity":       5.0,
+    "fire_pixels":    10,
+}
+
+# Background generation of reports for counties at watch tier or above whenever county
+# alerts are computed (api/report_prefetch.py). At most `concurrency` LLM calls at a time.
+REPORT_PREFETCH_CONFIG = {
+    "enabled":     os.getenv("PYROWATCH_REPORT_PREFETCH", "1") != "0",
+    "concurrency": 4,
+    "max_pending": 64,
+    "min_tier":    "watch",
+}
+
+# Latency SLO for Featherless calls (api/featherless.py). A report request waits at most
+# deadline_s and then gets the template report; the upstream call carries on and its report
+# is cached when it lands. Each attempt is cut off at request_timeout_s. With hedge_after_s
+# set, a second attempt starts if the first is still out by then (or failed). After
+# breaker_failures consecutive failures the upstream is skipped for breaker_cooldown_s.
+LLM_SLO_CONFIG = {
+    "enabled":            os.getenv("PYROWATCH_LLM_SLO", "1") != "0",
+    "deadline_s":         float(os.getenv("PYROWATCH_LLM_DEADLINE_S", "3.0")),
+    "request_timeout_s":  float(os.getenv("PYROWATCH_LLM_TIMEOUT_S", "30.0")),
+    "hedge_after_s":      float(os.getenv("PYROWATCH_LLM_HEDGE_AFTER_S", "0")) or None,
+    "max_in_flight":      8,
+    "breaker_failures":   5,
+    "breaker_cooldown_s": 30.0,
+}
+
+# torch CPU threads per process (utils/threads.py). Unset values come from the file written
+# by `python backend/ml/autotune.py`, else intra_op = cpus / processes and inter_op = 1.
+# pin_cores gives each pre-fork worker or DDP rank its own slice of the allowed cores.
+THREAD_CONFIG = {
+    "settings_file": Path(os.getenv("PYROWATCH_THREADS_FILE", MODELS_DIR / "thread_settings.json")),
+    "intra_op":      int(os.getenv("PYROWATCH_TORCH_THREADS", "0")) or None,
+    "inter_op":      int(os.getenv("PYROWATCH_TORCH_INTEROP_THREADS", "0")) or None,
+    "pin_cores":     {"1": True, "0": False}.get(os.getenv("PYROWATCH_PIN_CORES", "")),
+}
+
 RISK_THRESHOLDS = {
     "low":      (0.0,  0.35),
     "moderate": (0.35, 0.55),
@@ -90,6 +201,22 @@ APP_ENV   = os.getenv("APP_ENV", "development")
 LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG")
 IS_DEV    = APP_ENV == "development"
 
+# Below WARNING, each call site may log `burst` messages per `window_s`; the rest are
+# dropped and counted, and the next message that gets through reports how many.
+LOG_RATE_LIMIT = {
+    "burst":    int(os.getenv("LOG_RATE_BURST", "20")),
+    "window_s": float(os.getenv("LOG_RATE_WINDOW_S", "10")),
+}
+
+# Requests carrying this token in an X-Profile header are run under cProfile.
+# Empty disables per-request profiling entirely.
+PROFILE_TOKEN = os.getenv("PYROWATCH_PROFILE_TOKEN", "")
+PROFILES_DIR  = DATA_DIR / "profiles"
+
+# Multi-incident mode: a JSON list of incidents shaped like DEMO_FIRE (name, center_lat/lon,
+# bbox, ...) to track side by side. Without the file, only the active incident is tracked.
+INCIDENTS_FILE = Path(os.getenv("PYROWATCH_INCIDENTS_FILE", str(DATA_DIR / "incidents.json")))
+
 def validate_keys():
     missing = []
     if not NASA_FIRMS_API_KEY:
@@ -115,3 +242,39 @@ def get_active_incident() -> dict:
         print(f"Error fetching active fire: {e}")
         
     return DEMO_FIRE
+
+
+def incident_id(incident: dict) -> str:
+    return incident.get("id") or re.sub(r"[^a-z0-9]+", "-", incident["name"].lower()).strip("-")
+
+
+_tracked = None
+
+
+def get_tracked_incidents() -> list[dict]:
+    """Every incident being monitored: the INCIDENTS_FILE entries, else just the active incident."""
+    global _tracked
+    try:
+        stamp = INCIDENTS_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return [get_active_incident()]
+    if _tracked is None or _tracked[0] != stamp:
+        with open(INCIDENTS_FILE) as f:
+            incidents = json.load(f)
+        for i in incidents:
+            missing = {"name", "center_lat", "center_lon", "bbox"} - i.keys()
+            if missing:
+                raise ValueError(f"{INCIDENTS_FILE}: incident {i.get('name', '?')} is missing {sorted(missing)}")
+        _tracked = (stamp, incidents)
+    return _tracked[1]
+
+
+def get_incident(incident_ref: str = None) -> dict:
+    """Looks up a tracked incident by id or name; None means the first (by default the active) one."""
+    tracked = get_tracked_incidents()
+    if incident_ref is None:
+        return tracked[0]
+    for incident in tracked:
+        if incident_ref in (incident_id(incident), incident["name"]):
+            return incident
+    raise KeyError(f"Unknown incident: {incident_ref}")
@@ -0,0 +1,132 @@
+import sys
+import os
+import json
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.config import PROCESSED_DIR, LSTM_CONFIG
+from utils.logger import logger
+
+
+DATASET_CSV     = PROCESSED_DIR / "dataset.csv"
+DATASET_FEATHER = PROCESSED_DIR / "dataset.feather"
+SHARDS_DIR      = PROCESSED_DIR / "shards"
+
+FLOAT_COLUMNS = LSTM_CONFIG["features"] + ["risk_score"]
+
+
+def dataset_ready() -> bool:
+    return DATASET_FEATHER.exists() or DATASET_CSV.exists()
+
+
+def to_columnar(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    if "timestamp" in df.columns:
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
+    for col in FLOAT_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(np.float32)
+    return df.reset_index(drop=True)
+
+
+def save_processed(df: pd.DataFrame, path: Optional[Path] = None) -> Path:
+    import pyarrow as pa
+    from pyarrow import feather
+
+    path = path or DATASET_FEATHER
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(to_columnar(df), preserve_index=False)
+    tmp = path.with_suffix(".feather.tmp")
+    # Uncompressed Feather v2 so readers can memory-map the buffers directly.
+    feather.write_feather(table, tmp, compression="uncompressed")
+    tmp.replace(path)
+    logger.info(f"Columnar dataset saved: {path} ({table.num_rows} rows)")
+    return path
+
+
+def load_processed(
+    columns: Optional[list[str]] = None,
+    memory_map: bool = True,
+) -> pd.DataFrame:
+    try:
+        from pyarrow import feather
+    except ImportError:
+        logger.warning("pyarrow not installed — reading CSV dataset. Run: pip install pyarrow")
+        from data.feature_builder import load_dataset
+        df = to_columnar(load_dataset())
+        return df[columns] if columns else df
+
+    if _is_stale():
+        from data.feature_builder import load_dataset
+        save_processed(load_dataset())
+
+    table = feather.read_table(DATASET_FEATHER, columns=columns, memory_map=memory_map)
+    # split_blocks keeps each null-free numeric column as a zero-copy view of the mapped buffer.
+    df = table.to_pandas(split_blocks=True)
+    logger.info(f"Dataset loaded: {DATASET_FEATHER.name}, {len(df)} rows, {len(df.columns)} columns")
+    return df
+
+
+def write_shards(
+    df: pd.DataFrame,
+    fire_id: str,
+    rows_per_shard: int = 50_000,
+    shards_dir: Optional[Path] = None,
+) -> list[dict]:
+    shards_dir = shards_dir or SHARDS_DIR
+    shards_dir.mkdir(parents=True, exist_ok=True)
+
+    df = to_columnar(df).sort_values("timestamp").reset_index(drop=True)
+    entries = []
+    for part, start in enumerate(range(0, len(df), rows_per_shard)):
+        chunk = df.iloc[start : start + rows_per_shard]
+        path  = save_processed(chunk, shards_dir / f"{fire_id}-{part:05d}.feather")
+        entries.append({
+            "fire_id": fire_id,
+            "path":    path.name,
+            "part":    part,
+            "rows":    len(chunk),
+            "start":   chunk["timestamp"].iloc[0].isoformat(),
+            "end":     chunk["timestamp"].iloc[-1].isoformat(),
+        })
+
+    manifest = load_manifest(shards_dir)
+    manifest[fire_id] = entries
+    (shards_dir / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    logger.info(f"Shards written: {fire_id}, {len(entries)} shards, {len(df)} rows")
+    return entries
+
+
+def load_manifest(shards_dir: Optional[Path] = None) -> dict:
+    path = (shards_dir or SHARDS_DIR) / "manifest.json"
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def read_shard(
+    name: str,
+    columns: Optional[list[str]] = None,
+    shards_dir: Optional[Path] = None,
+) -> pd.DataFrame:
+    from pyarrow import feather
+    table = feather.read_table((shards_dir or SHARDS_DIR) / name, columns=columns, memory_map=True)
+    return table.to_pandas(split_blocks=True)
+
+
+def _is_stale() -> bool:
+    if not DATASET_FEATHER.exists():
+        return True
+    if DATASET_CSV.exists():
+        return DATASET_CSV.stat().st_mtime > DATASET_FEATHER.stat().st_mtime
+    return False
+
+
+if __name__ == "__main__":
+    from data.feature_builder import load_dataset
+    save_processed(load_dataset())
@@ -1,29 +1,202 @@
 
 
+import os
 import sys
+import time
+import atexit
 import logging
+import threading
+from logging.handlers import RotatingFileHandler
 from pathlib import Path
+from queue import SimpleQueue
+
+from utils.config import APP_ENV, LOG_LEVEL, LOG_RATE_LIMIT
 
 LOG_DIR = Path(__file__).resolve().parent.parent.parent / "logs"
-LOG_DIR.mkdir(exist_ok=True)
+
+LOG_FILE_MAX_BYTES = 10 * 1024 * 1024
+LOG_FILE_BACKUPS   = 5
+
+CONSOLE_FORMAT = "<green>{time:HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan> — <level>{message}</level>"
+
+
+class RateLimitFilter:
+    """Per-call-site window for sub-WARNING records; warnings and errors always pass."""
+
+    def __init__(self, burst: int, window_s: float, min_level: int = 30):
+        self.burst     = burst
+        self.window_s  = window_s
+        self.min_level = min_level
+        self._sites    = {}
+        self._lock     = threading.Lock()
+        # Sinks run in the logging thread, so the last decision is kept per thread.
+        self._local    = threading.local()
+
+    def __call__(self, record) -> bool:
+        if self.burst <= 0 or record["level"].no >= self.min_level:
+            return True
+        # Every sink sees the same record; decide once so all sinks agree and counts aren't doubled.
+        last_record, decision = getattr(self._local, "last", (None, True))
+        if record is last_record:
+            return decision
+        with self._lock:
+            decision = self._decide(record)
+        self._local.last = (record, decision)
+        return decision
+
+    def _decide(self, record) -> bool:
+        key = (record["name"], record["line"])
+        now = time.monotonic()
+        state = self._sites.get(key)
+        if state is None or now - state[0] >= self.window_s:
+            suppressed = state[2] if state else 0
+            self._sites[key] = [now, 1, 0]
+            if suppressed:
+                record["message"] += f" [+{suppressed} similar suppressed]"
+                record["extra"]["suppressed"] = suppressed
+            return True
+        if state[1] < self.burst:
+            state[1] += 1
+            return True
+        state[2] += 1
+        return False
+
+
+class QueueSink:
+    """loguru sink that hands formatted lines to a writer thread so callers never wait on I/O.
+
+    loguru's own enqueue=True pickles every record through a multiprocessing pipe, which
+    costs the caller several times more than the write it is meant to hide.
+    """
+
+    def __init__(self, write, flush=None):
+        self._write  = write
+        self._flush  = flush
+        self._queue  = None
+        self._thread = None
+        self.start()
+
+    def start(self, fresh_queue: bool = False) -> None:
+        if fresh_queue or self._queue is None:
+            self._queue = SimpleQueue()
+        self._thread = threading.Thread(target=self._drain, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def __call__(self, message) -> None:
+        self._queue.put(message)
+
+    def _drain(self) -> None:
+        while True:
+            message = self._queue.get()
+            if message is None:
+                break
+            try:
+                self._write(message)
+                if self._flush is not None and self._queue.empty():
+                    self._flush()
+            except Exception as e:
+                sys.stderr.write(f"log writer error: {e}\n")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+
+def _rotating_file_writer(path: Path):
+    handler = None
+
+    def write(message) -> None:
+        # Opened on the writer thread at the first record, so importing the logger creates no files.
+        nonlocal handler
+        if handler is None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(path, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUPS,
+                                          encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+        handler.emit(logging.makeLogRecord({"msg": str(message).rstrip("\n")}))
+
+    return write
+
+
+_queue_sinks = []
+
+
+def shutdown_logging() -> None:
+    # Drains and stops the writer threads; anything still queued is written first.
+    while _queue_sinks:
+        _queue_sinks.pop().stop()
+
+
+def configure_logging(
+    level:      str  = LOG_LEVEL,
+    serialize:  bool = APP_ENV == "production",
+    enqueue:    bool = True,
+    rate_limit: dict = LOG_RATE_LIMIT,
+    stream           = sys.stdout,
+    log_file: Path   = LOG_DIR / "pyrowatch.log",
+):
+    # Production gets one JSON object per line for log shippers; dev keeps the coloured console.
+    if not _HAS_LOGURU:
+        return logger
+    logger.remove()
+    shutdown_logging()
+    limiter = RateLimitFilter(**rate_limit) if rate_limit else None
+
+    if stream is not None:
+        sink = stream
+        if enqueue:
+            sink = QueueSink(stream.write, getattr(stream, "flush", None))
+            _queue_sinks.append(sink)
+        logger.add(sink, format=CONSOLE_FORMAT, level=level, colorize=not serialize,
+                   serialize=serialize, filter=limiter)
+    if log_file is not None:
+        if enqueue:
+            sink = QueueSink(_rotating_file_writer(log_file))
+            _queue_sinks.append(sink)
+            logger.add(sink, level=level, serialize=serialize, filter=limiter)
+        else:
+            logger.add(log_file, level=level, rotation=LOG_FILE_MAX_BYTES, serialize=serialize, filter=limiter,
+                       delay=True)
+    return logger
+
+
+atexit.register(shutdown_logging)
+
+# Threads don't survive fork(). Park the writers so no lock is held mid-write at the fork,
+# then restart them: the parent keeps its queue, each child starts with an empty one.
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(
+        before=lambda: [sink.stop() for sink in _queue_sinks],
+        after_in_parent=lambda: [sink.start() for sink in _queue_sinks],
+        after_in_child=lambda: [sink.start(fresh_queue=True) for sink in _queue_sinks],
+    )
+
 
 try:
     from loguru import logger
-    logger.remove()
-    logger.add(sys.stdout, format="<green>{time:HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan> — <level>{message}</level>", level="DEBUG", colorize=True)
-    logger.add(LOG_DIR / "pyrowatch.log", level="DEBUG", rotation="10 MB", retention="7 days")
+    _HAS_LOGURU = True
+    configure_logging()
 
 except ImportError:
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format="%(asctime)s | %(levelname)-8s | %(name)s — %(message)s",
-        datefmt="%H:%M:%S",
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-            logging.FileHandler(LOG_DIR / "pyrowatch.log"),
-        ]
-    )
+    _HAS_LOGURU = False
+    from logging.handlers import QueueHandler, QueueListener
+
+    LOG_DIR.mkdir(exist_ok=True)
+
+    _queue = SimpleQueue()
+    _handlers = [
+        logging.StreamHandler(sys.stdout),
+        RotatingFileHandler(LOG_DIR / "pyrowatch.log", maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUPS,
+                            delay=True),
+    ]
+    for h in _handlers:
+        h.setFormatter(logging.Formatter("%(asctime)s | %(levelname)-8s | %(name)s — %(message)s", "%H:%M:%S"))
+    QueueListener(_queue, *_handlers).start()
+
     logger = logging.getLogger("pyrowatch")
+    logger.setLevel(LOG_LEVEL)
+    logger.addHandler(QueueHandler(_queue))
     logger.warning("loguru not installed — using stdlib logging. Run: pip install loguru")
 
-__all__ = ["logger"]
\ No newline at end of file
+__all__ = ["logger", "configure_logging", "shutdown_logging"]
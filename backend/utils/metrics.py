@@ -0,0 +1,179 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Minimal Prometheus text-format metrics. Hot-path cost is one lock plus a dict update per
+# call; label values are passed positionally in the order of `labelnames`.
+
+_REGISTRY = []
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS    = (1, 4, 16, 64, 256, 1024, 4096, 16384)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name       = name
+        self.help       = help
+        self.labelnames = labelnames
+        self._lock      = threading.Lock()
+        _REGISTRY.append(self)
+
+    def _labels(self, values: tuple) -> str:
+        if not values:
+            return ""
+        pairs = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labelnames, values))
+        return "{" + pairs + "}"
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self._values = {}
+
+    def inc(self, *labels, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self):
+        lines = super().render()
+        for labels, v in sorted(self._values.items()):
+            lines.append(f"{self.name}{self._labels(labels)} {_fmt(v)}")
+        return lines
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, help, labelnames=(), fn=None):
+        super().__init__(name, help, labelnames)
+        self._values = {}
+        self._fn     = fn  # evaluated at scrape time, so nothing is paid on the request path
+
+    def set(self, value: float, *labels) -> None:
+        self._values[labels] = value
+
+    def render(self):
+        lines = super().render()
+        values = dict(self._values)
+        if self._fn is not None:
+            values[()] = self._fn()
+        for labels, v in sorted(values.items()):
+            lines.append(f"{self.name}{self._labels(labels)} {_fmt(v)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+
+    def observe(self, value: float, *labels) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, *labels)
+
+    def render(self):
+        lines = super().render()
+        for labels, (counts, total, n) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                cumulative += c
+                le = "+Inf" if bound == float("inf") else _fmt(bound)
+                pairs = list(zip(self.labelnames, labels)) + [("le", le)]
+                label_str = "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+                lines.append(f"{self.name}_bucket{label_str} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(labels)} {_fmt(total)}")
+            lines.append(f"{self.name}_count{self._labels(labels)} {n}")
+        return lines
+
+
+def render_all() -> str:
+    lines = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def _fmt(v: float) -> str:
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+def _escape(v) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+HTTP_LATENCY = Histogram(
+    "pyrowatch_http_request_duration_seconds", "HTTP request latency by route",
+    ("route", "method", "status"),
+)
+INFERENCE_CALLS = Counter(
+    "pyrowatch_inference_calls_total", "Model inference calls", ("fn",),
+)
+INFERENCE_BATCH = Histogram(
+    "pyrowatch_inference_batch_size", "Sequences per inference call", ("fn",), buckets=SIZE_BUCKETS,
+)
+INFERENCE_LATENCY = Histogram(
+    "pyrowatch_inference_duration_seconds", "Inference call duration", ("fn",),
+)
+GEOJSON_BUILD = Histogram(
+    "pyrowatch_geojson_build_seconds", "GeoJSON build time", ("kind",),
+)
+GEOJSON_CELLS = Histogram(
+    "pyrowatch_geojson_cells", "Grid cells per GeoJSON build", ("kind",), buckets=SIZE_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    "pyrowatch_cache_requests_total", "Cache lookups by result", ("namespace", "result"),
+)
+CACHE_EVICTIONS = Counter(
+    "pyrowatch_cache_evictions_total", "Cache entries removed (expired or cleared)", ("namespace",),
+)
+LOAD_SECONDS = Gauge(
+    "pyrowatch_load_seconds", "Time taken to load a startup resource", ("resource",),
+)
+INGEST_ROWS = Counter(
+    "pyrowatch_ingest_rows_total", "Observation rows received for the ring buffers", ("result",),
+)
+SNAPSHOT_BUILD = Histogram(
+    "pyrowatch_snapshot_build_seconds", "Time to precompute one snapshot", ("outcome",),
+)
+LLM_LATENCY = Histogram(
+    "pyrowatch_llm_request_duration_seconds", "Featherless LLM upstream latency", ("outcome",),
+)
+LLM_FALLBACKS = Counter(
+    "pyrowatch_llm_fallbacks_total", "Template reports served instead of the LLM", ("reason",),
+)
+LLM_HEDGES = Counter(
+    "pyrowatch_llm_hedges_total", "Extra Featherless attempts started by hedging", ("reason",),
+)
+REPORT_PREFETCH = Counter(
+    "pyrowatch_report_prefetch_total", "Situation reports considered for prefetch by result", ("result",),
+)
@@ -0,0 +1,54 @@
+import sys
+import os
+import hashlib
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pathlib import Path
+from typing import Optional
+
+from utils.config import MODELS_DIR
+from utils.logger import logger
+
+
+# Trainers write the checkpoint and scaler to staging/ as they go, and publish() moves the
+# finished pair into place: both files by os.replace, then the version marker. The API
+# reloads only when the marker changes, so it never reads a half-written file or pairs a
+# new scaler with an old checkpoint.
+
+MODEL_FILE  = "pyrowatch_lstm_best.pt"
+SCALER_FILE = "scaler.joblib"
+MARKER_FILE = "model.version"
+
+
+def staging_dir(models_dir: Optional[Path] = None) -> Path:
+    path = (models_dir or MODELS_DIR) / "staging"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def read_marker(models_dir: Optional[Path] = None) -> Optional[str]:
+    try:
+        return ((models_dir or MODELS_DIR) / MARKER_FILE).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def publish(models_dir: Optional[Path] = None) -> str:
+    """Move the staged checkpoint and scaler into place; returns the new version."""
+    models_dir = models_dir or MODELS_DIR
+    staged  = staging_dir(models_dir)
+    digest  = hashlib.md5()
+    for name in (MODEL_FILE, SCALER_FILE):
+        path = staged / name
+        if not path.exists():
+            raise FileNotFoundError(f"Nothing to publish: {path} is missing")
+        digest.update(path.read_bytes())
+    version = digest.hexdigest()[:12]
+
+    for name in (MODEL_FILE, SCALER_FILE):
+        os.replace(staged / name, models_dir / name)
+    tmp = models_dir / f"{MARKER_FILE}.tmp"
+    tmp.write_text(version + "\n")
+    os.replace(tmp, models_dir / MARKER_FILE)
+    logger.info(f"Model {version} published to {models_dir}")
+    return version
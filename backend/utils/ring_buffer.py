@@ -0,0 +1,101 @@
+import mmap
+import multiprocessing
+
+import numpy as np
+
+
+class FeatureRing:
+    """Fixed-capacity, append-only ring of timestamped float32 feature rows.
+
+    Every row is written twice, at slot i and i + capacity, so the newest `count` rows are
+    always one contiguous slice and windows come back as zero-copy views. The arrays live in
+    an anonymous shared mapping, so workers forked after the ring is created all see appends.
+    """
+
+    _META = 3  # count, head, version
+
+    def __init__(self, columns: list[str], capacity: int):
+        self.columns  = list(columns)
+        self.capacity = capacity
+        n_cols = len(self.columns)
+
+        ts_off   = 8 * self._META
+        rows_off = ts_off + 8 * 2 * capacity
+        self._mem  = mmap.mmap(-1, rows_off + 4 * 2 * capacity * n_cols)
+        self._meta = np.frombuffer(self._mem, np.int64, self._META, 0)
+        self._ts   = np.frombuffer(self._mem, np.int64, 2 * capacity, ts_off)
+        self._rows = np.frombuffer(self._mem, np.float32, 2 * capacity * n_cols, rows_off).reshape(2 * capacity, n_cols)
+        self._lock = multiprocessing.Lock()
+
+    def __len__(self) -> int:
+        return int(self._meta[0])
+
+    @property
+    def version(self) -> int:
+        return int(self._meta[2])
+
+    def last_timestamp(self):
+        start, end = self._bounds()
+        return int(self._ts[end - 1]) if end > start else None
+
+    def last_row(self):
+        start, end = self._bounds()
+        return self._rows[end - 1] if end > start else None
+
+    def extend(self, ts_ns: np.ndarray, rows: np.ndarray) -> int:
+        """Append rows in timestamp order; rows not newer than the last one are skipped."""
+        ts_ns = np.asarray(ts_ns, dtype=np.int64)
+        rows  = np.asarray(rows, dtype=np.float32).reshape(len(ts_ns), len(self.columns))
+        with self._lock:
+            count, head, version = (int(v) for v in self._meta)
+            last = int(self._ts[head - 1 + self.capacity]) if count else None
+
+            keep = np.ones(len(ts_ns), dtype=bool)
+            if len(ts_ns):
+                prev = np.maximum.accumulate(ts_ns)
+                keep[1:] = ts_ns[1:] > prev[:-1]
+                if last is not None:
+                    keep &= ts_ns > last
+            ts_ns, rows = ts_ns[keep][-self.capacity:], rows[keep][-self.capacity:]
+
+            slots = (head + np.arange(len(ts_ns))) % self.capacity
+            for offset in (0, self.capacity):
+                self._ts[slots + offset]   = ts_ns
+                self._rows[slots + offset] = rows
+            # Publish the new bounds only after the data is in place.
+            self._meta[:] = (
+                min(count + len(ts_ns), self.capacity),
+                (head + len(ts_ns)) % self.capacity,
+                version + len(ts_ns),
+            )
+        return len(ts_ns)
+
+    def window(self, n: int, until_ns: int = None) -> tuple[np.ndarray, np.ndarray]:
+        """Views of the last `n` rows (optionally only rows before `until_ns`).
+
+        Keep n below capacity: a concurrent append overwrites the oldest slot, which only a
+        full-capacity window can see.
+        """
+        start, end = self._bounds()
+        if until_ns is not None:
+            end = start + int(np.searchsorted(self._ts[start:end], until_ns, side="left"))
+        lo = max(start, end - n)
+        ts, rows = self._ts[lo:end], self._rows[lo:end]
+        ts.flags.writeable   = False
+        rows.flags.writeable = False
+        return ts, rows
+
+    def since(self, ts_ns: int) -> tuple[np.ndarray, np.ndarray]:
+        """Views of the rows newer than `ts_ns` (at most capacity - 1 of them)."""
+        start, end = self._bounds()
+        start = max(start, end - (self.capacity - 1))
+        lo = start + int(np.searchsorted(self._ts[start:end], ts_ns, side="right"))
+        ts, rows = self._ts[lo:end], self._rows[lo:end]
+        ts.flags.writeable   = False
+        rows.flags.writeable = False
+        return ts, rows
+
+    def _bounds(self) -> tuple[int, int]:
+        count, head = int(self._meta[0]), int(self._meta[1])
+        end = head + self.capacity
+        return end - count, end
@@ -0,0 +1,97 @@
+import os
+import json
+import threading
+from pathlib import Path
+
+from utils.config import THREAD_CONFIG
+from utils.logger import logger
+
+
+# torch CPU thread settings per process. Each API worker, trainer or DDP rank calls apply()
+# once at startup; left alone, every process's torch sizes its pool to all the cores, and a
+# few workers doing single-window LSTM calls oversubscribe the machine.
+
+ROLES = ("serve", "train")
+
+_applied = {}  # pid -> settings, so a forked child applies its own
+_lock    = threading.Lock()
+
+
+def cpu_count() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def load_settings(path: Path = None) -> dict:
+    path = Path(path or THREAD_CONFIG["settings_file"])
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring thread settings in {path}: {e}")
+        return {}
+
+
+def settings_for(role: str, processes: int = 1) -> dict:
+    """intra_op, inter_op and pin_cores for each of `processes` processes of this role."""
+    settings = {
+        "intra_op":  max(1, cpu_count() // max(1, processes)),
+        "inter_op":  1,
+        "pin_cores": False,
+    }
+    saved = load_settings()
+    if saved and saved.get("cpus") != cpu_count():
+        logger.warning(f"Thread settings were tuned for {saved.get('cpus')} cpus, this process has "
+                       f"{cpu_count()} — using defaults. Re-run: python backend/ml/autotune.py")
+    else:
+        tuned = saved.get(role, {}).get(str(processes), {})
+        settings.update((k, v) for k, v in tuned.items() if k in settings)
+    settings.update((k, v) for k, v in THREAD_CONFIG.items() if k in settings and v is not None)
+    return settings
+
+
+def apply(role: str, processes: int = 1, rank: int = 0, **overrides) -> dict:
+    """Set this process's torch threads, once; returns the settings in effect.
+
+    `rank` picks this process's slice of cores when pinning. Keyword overrides (intra_op,
+    inter_op, pin_cores) beat both the environment and the tuned file.
+    """
+    pid = os.getpid()
+    with _lock:
+        if pid in _applied:
+            return _applied[pid]
+        settings = settings_for(role, processes)
+        settings.update((k, v) for k, v in overrides.items() if k in settings and v is not None)
+        try:
+            import torch
+        except ImportError:
+            _applied[pid] = settings
+            return settings
+
+        cores = _pin(rank, processes) if settings["pin_cores"] else None
+        torch.set_num_threads(settings["intra_op"])
+        try:
+            torch.set_num_interop_threads(settings["inter_op"])
+        except RuntimeError:
+            # Only settable before the process's first inter-op parallel work.
+            settings["inter_op"] = torch.get_num_interop_threads()
+            logger.debug(f"torch inter-op threads already fixed at {settings['inter_op']}")
+        _applied[pid] = settings
+        logger.info(f"torch threads ({role}, {processes} process(es)): intra_op={settings['intra_op']}, "
+                    f"inter_op={settings['inter_op']}" + (f", cores {cores}" if cores else ""))
+        return settings
+
+
+def _pin(rank: int, processes: int) -> list[int]:
+    if not hasattr(os, "sched_setaffinity"):
+        return None
+    cores = sorted(os.sched_getaffinity(0))
+    per   = max(1, len(cores) // max(1, processes))
+    start = (rank * per) % len(cores)
+    mine  = cores[start:start + per]
+    # Threads started after this (torch's pools included) inherit the mask.
+    os.sched_setaffinity(0, mine)
+    return mine
@@ -0,0 +1,45 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+
+# Per-request span collection. Outside a traced request `span()` costs one ContextVar lookup.
+
+_spans: ContextVar[Optional[dict]] = ContextVar("pyrowatch_spans", default=None)
+
+
+def start_trace():
+    return _spans.set({})
+
+
+def end_trace(token) -> dict:
+    spans = _spans.get() or {}
+    _spans.reset(token)
+    return spans
+
+
+@contextmanager
+def span(name: str):
+    spans = _spans.get()
+    if spans is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        # Repeated spans (e.g. one inference per grid cell) aggregate into total + count.
+        total, count = spans.get(name, (0.0, 0))
+        spans[name] = (total + time.perf_counter() - t0, count + 1)
+
+
+def server_timing(spans: dict, total_s: float) -> str:
+    parts = []
+    for name, (seconds, count) in spans.items():
+        entry = f"{name};dur={seconds * 1000:.2f}"
+        if count > 1:
+            entry += f';desc="{count} calls"'
+        parts.append(entry)
+    parts.append(f"total;dur={total_s * 1000:.2f}")
+    return ", ".join(parts)